@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+ARTIFACT_CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", ".artifact_cache")
+ARTIFACT_CACHE_MAX_MB = float(os.getenv("ARTIFACT_CACHE_MAX_MB", "512"))
+ARTIFACT_CACHE_MAX_ENTRIES = int(os.getenv("ARTIFACT_CACHE_MAX_ENTRIES", "100000"))
+ARTIFACT_CACHE_TTL_DAYS = float(os.getenv("ARTIFACT_CACHE_TTL_DAYS", "30"))
+
+
+def file_hash(file_content: bytes) -> str:
+    """
+    Yüklenen dosya baytlarının SHA-256 özeti
+    """
+    return hashlib.sha256(file_content).hexdigest()
+
+
+def artifact_key(*parts: str) -> str:
+    """
+    İçerik özeti ve model/sürüm bilgisinden önbellek anahtarı üret
+    """
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    def __init__(
+        self,
+        directory: Optional[str] = ARTIFACT_CACHE_DIR,
+        max_bytes: int = int(ARTIFACT_CACHE_MAX_MB * 1024 * 1024),
+        max_entries: int = ARTIFACT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ARTIFACT_CACHE_TTL_DAYS * 86400,
+    ):
+        """
+        Ara ürünleri (metin, ayrıştırma sonucu, özet, gömme) JSON dosyaları olarak diskte sakla.
+        Boyut veya kayıt sınırı aşıldığında en uzun süredir kullanılmayan kayıtlar silinir.
+        directory boşsa önbellek devre dışıdır.
+        """
+        self.directory = directory or None
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Tuple[int, float]]] = None  # yol -> (boyut, son erişim)
+        self._total_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.directory, namespace, key[:2], key + ".json")
+
+    def _load_entries(self):
+        """
+        Mevcut önbellek dosyalarını ilk kullanımda bir kez tara
+        """
+        if self._entries is not None:
+            return
+        self._entries = {}
+        self._total_bytes = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                self._entries[path] = (stat.st_size, stat.st_mtime)
+                self._total_bytes += stat.st_size
+
+    def _forget(self, path: str):
+        size, _ = self._entries.pop(path, (0, 0.0))
+        self._total_bytes -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Kaydı döndür; yoksa, süresi dolmuşsa veya okunamıyorsa None
+        """
+        if not self.enabled:
+            return None
+        path = self._path(namespace, key)
+        with self._lock:
+            self._load_entries()
+            if path not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                with open(path, encoding="utf-8") as f:
+                    record = json.load(f)
+                if self.ttl_seconds and time.time() - record["created_at"] > self.ttl_seconds:
+                    raise ValueError("süresi doldu")
+                value = record["value"]
+            except (OSError, ValueError, KeyError):
+                self._forget(path)
+                self.misses += 1
+                return None
+            # Son erişim zamanı LRU tahliyesi için güncellenir
+            now = time.time()
+            self._entries[path] = (self._entries[path][0], now)
+            self.hits += 1
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return value
+
+    def set(self, namespace: str, key: str, value: Any):
+        """
+        Kaydı atomik olarak yaz ve gerekirse sınırlara inene kadar tahliye et
+        """
+        if not self.enabled:
+            return
+        path = self._path(namespace, key)
+        data = json.dumps({"created_at": time.time(), "value": value}, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._load_entries()
+            if path in self._entries:
+                self._total_bytes -= self._entries[path][0]
+            self._entries[path] = (len(data), time.time())
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """
+        En eski erişilen kayıtları sınırların %90'ına inene kadar sil
+        """
+        target_bytes = self.max_bytes * 0.9
+        target_entries = int(self.max_entries * 0.9)
+        for path, _ in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= target_bytes and len(self._entries) <= target_entries:
+                break
+            self._forget(path)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            if self.enabled:
+                self._load_entries()
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries or {}),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache: Optional[ArtifactCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ArtifactCache:
+    """
+    Süreç genelinde paylaşılan disk önbelleğini döndür
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ArtifactCache()
+    return _cache
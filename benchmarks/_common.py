@@ -0,0 +1,240 @@
+"""
+Benchmark betiklerinin ortak yardımcıları: sentetik CV üretimi, zamanlama, JSON çıktı ve
+temel (baseline) sonuçlarla karşılaştırarak gerilemeleri işaretleme.
+"""
+import glob
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIRST_NAMES = ["Duygu", "Ahmet", "Elif", "Mehmet", "Zeynep", "Can", "Ayşe", "Emre", "Selin", "Burak", "Maria", "John"]
+LAST_NAMES = ["Er", "Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Aydın", "Öztürk", "Smith", "Garcia"]
+UNIVERSITIES = ["Pamukkale Üniversitesi", "Ege University", "İTÜ Bilgisayar Fakültesi", "ODTÜ", "Boğaziçi University"]
+DEPARTMENTS = ["Bilgisayar Mühendisliği", "Computer Science", "Yazılım Mühendisliği", "Endüstri Mühendisliği"]
+COMPANIES = ["XYZ Şirketi", "Acme Company", "Globex Firm", "Initech", "Umbrella Company"]
+ROLES = ["Software Developer", "Backend Engineer", "Data Scientist", "Stajyer", "DevOps Engineer", "ML Engineer"]
+JOB_TITLES = ["Python Developer", "Java Backend Engineer", "Data Scientist", "DevOps Engineer", "Frontend Developer"]
+
+
+def taxonomy_skills() -> List[str]:
+    from keyword_extractor import load_taxonomy
+    return list(load_taxonomy().get("skills", {}).get("terms", []))
+
+
+def sample_pdfs() -> List[str]:
+    """
+    Depodaki örnek PDF'ler (ingilizcecv*.pdf ve cvler/)
+    """
+    return sorted(glob.glob(os.path.join(ROOT, "ingilizcecv*.pdf"))) + sorted(
+        glob.glob(os.path.join(ROOT, "cvler", "**", "*.pdf"), recursive=True)
+    )
+
+
+def sample_texts() -> List[str]:
+    from document_processor import process_document
+    texts = []
+    for path in sample_pdfs():
+        with open(path, "rb") as f:
+            texts.append(process_document(f.read(), ".pdf"))
+    return texts
+
+
+def synthetic_cv(rng: random.Random, skills: List[str], paragraphs: List[str]) -> Dict:
+    """
+    Şablonlardan ve örnek CV paragraflarından rastgele bir CV metni ve beceri listesi üret
+    """
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    chosen = rng.sample(skills, k=min(len(skills), rng.randint(3, 8)))
+    start = rng.randint(2012, 2022)
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}{rng.randint(1, 9999)}@example.com",
+        f"+90 5{rng.randint(10, 59)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "",
+        "Eğitim:",
+        f"{rng.choice(UNIVERSITIES)}, {rng.choice(DEPARTMENTS)}, {start - 4}-{start}",
+        "",
+        "Tecrübe:",
+        f"{rng.choice(ROLES)}, {rng.choice(COMPANIES)}, {start}-{start + rng.randint(1, 4)}",
+        f"{rng.choice(ROLES)}, {rng.choice(COMPANIES)}, {start + 4}-present",
+        "",
+        "Beceriler:",
+        ", ".join(chosen),
+    ]
+    if paragraphs:
+        lines += ["", rng.choice(paragraphs)]
+    return {"text": "\n".join(lines), "name": name, "skills": chosen}
+
+
+def synthetic_cvs(count: int, seed: int = 0, paragraphs: Optional[List[str]] = None) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    skills = taxonomy_skills()
+    for _ in range(count):
+        yield synthetic_cv(rng, skills, paragraphs or [])
+
+
+def paragraphs_from(texts: List[str], max_chars: int = 600) -> List[str]:
+    """
+    Örnek CV metinlerini şablonlara eklenecek kısa paragraflara böl
+    """
+    paragraphs = []
+    for text in texts:
+        for block in text.split("\n\n"):
+            block = " ".join(block.split())
+            if len(block) > 80:
+                paragraphs.append(block[:max_chars])
+    return paragraphs
+
+
+def synthetic_job(rng: random.Random, skills: List[str]) -> Dict:
+    required = rng.sample(skills, k=min(len(skills), 3))
+    return {
+        "title": rng.choice(JOB_TITLES),
+        "description": f"We are looking for an engineer experienced in {', '.join(required)}.",
+        "requirements": required,
+        "location": "İstanbul",
+        "company": rng.choice(COMPANIES),
+        "matching_parameters": {"min_match_percentage": 0, "required_skills": [], "preferred_skills": required[:1]},
+    }
+
+
+def docx_bytes(text: str) -> bytes:
+    """
+    Metinden bellekte bir DOCX dosyası oluştur (yükleme testleri için benzersiz belgeler)
+    """
+    from docx import Document
+    document = Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def summarize_ms(samples: List[float]) -> Dict:
+    """
+    Saniye cinsinden örneklerden milisaniye yüzdelikleri
+    """
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def time_each(fn: Callable, items: List, repeat: int = 1) -> List[float]:
+    """
+    fn'i her öğe için çalıştır ve çağrı başına süreleri (saniye) döndür
+    """
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            started = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def time_once(fn: Callable, *args, **kwargs) -> Tuple[float, object]:
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def use_mongomock():
+    """
+    Database'i mongomock üzerinde çalıştır (yerel MongoDB gerektirmeyen ölçümler için)
+    """
+    try:
+        import mongomock
+        import mongomock.gridfs
+    except ImportError:
+        raise SystemExit("mongomock kurulu değil: pip install mongomock (veya --mongo-uri ile yerel MongoDB kullanın)")
+    mongomock.gridfs.enable_gridfs_integration()
+    import pymongo
+    pymongo.MongoClient = mongomock.MongoClient
+    import database
+    database.MongoClient = mongomock.MongoClient
+
+
+def add_output_arguments(parser):
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası (varsayılan: stdout)")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Gerileme sayılacak göreli fark (0.2 = %%20)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Gerileme varsa 1 ile çık")
+
+
+def metric(value: float, unit: str, better: str = "lower") -> Dict:
+    """
+    Karşılaştırılabilir tek ölçüm: değer, birim ve hangi yönün iyi olduğu
+    """
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+
+def compare(metrics: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[Dict]:
+    """
+    Temeldeki her ölçüm için tolerans dışında kötüleşenleri döndür
+    """
+    regressions = []
+    for name, previous in baseline.items():
+        current = metrics.get(name)
+        if current is None or not previous.get("value"):
+            continue
+        change = (current["value"] - previous["value"]) / previous["value"]
+        worse = change > tolerance if previous.get("better", "lower") == "lower" else change < -tolerance
+        if worse:
+            regressions.append({
+                "metric": name,
+                "baseline": previous["value"],
+                "current": current["value"],
+                "change": round(change, 4),
+            })
+    return regressions
+
+
+def finish(args, suite: str, metrics: Dict[str, Dict], details: Dict):
+    """
+    Sonuçları makine tarafından okunabilir JSON olarak yaz; temel verilmişse gerilemeleri işaretle
+    """
+    result = {
+        "suite": suite,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "metrics": metrics,
+        "details": details,
+        "regressions": [],
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["regressions"] = compare(metrics, json.load(f)["metrics"], args.tolerance)
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    for regression in result["regressions"]:
+        print(
+            f"GERİLEME {regression['metric']}: {regression['baseline']} -> {regression['current']} "
+            f"({regression['change']:+.0%})",
+            file=sys.stderr,
+        )
+    if args.fail_on_regression and result["regressions"]:
+        raise SystemExit(1)
@@ -0,0 +1,58 @@
+"""
+Yaklaşık en yakın komşu indeks modlarını tam taramalı temele karşı karşılaştırır.
+
+    python benchmarks/ann_recall.py --source db --queries 200 --k 10
+    python benchmarks/ann_recall.py --source synthetic --size 100000 --dimension 384
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_matcher import recall_report  # noqa: E402
+
+
+def load_vectors(args) -> np.ndarray:
+    if args.source == "synthetic":
+        rng = np.random.default_rng(args.seed)
+        # Kümelenmiş veri gerçek gömme dağılımına rastgele gürültüden daha yakındır
+        centers = rng.standard_normal((max(1, args.size // 100), args.dimension))
+        vectors = centers[rng.integers(0, len(centers), args.size)]
+        vectors += 0.3 * rng.standard_normal((args.size, args.dimension))
+        return vectors.astype("float32")
+
+    from database import Database
+    vectors = [
+        candidate["embedding"]["vector"]
+        for candidate in Database().iter_candidates(["embedding.vector"])
+        if candidate.get("embedding")
+    ]
+    if not vectors:
+        raise SystemExit("Veritabanında kayıtlı gömme bulunamadı")
+    return np.asarray(vectors, dtype="float32")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İndeks modları için recall / gecikme raporu")
+    parser.add_argument("--source", choices=["db", "synthetic"], default="synthetic")
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype("float32")
+
+    print(json.dumps(recall_report(vectors, queries, args.k), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+MATCH_SCORE_FLOOR / MATCH_SCORE_CEILING değerlerini etiketli CV/ilan çiftlerinden türetir.
+
+Girdi her satırı bir çift olan JSONL dosyasıdır; "job" düz metin ya da title/description/requirements
+alanlı ilan olabilir, "label" 1 (uygun aday) veya 0'dır:
+
+    {"cv": "Ayşe Kaya ... Python, Django ...", "job": {"title": "...", "description": "...", "requirements": ["python"]}, "label": 1}
+
+    python benchmarks/calibrate_scores.py pairs.jsonl
+    python benchmarks/calibrate_scores.py pairs.jsonl --floor-quantile 0.5 --ceiling-quantile 0.9 --output calibration.json
+
+Benzerlikler üretimdeki skorla aynı yoldan (bölüm gömmeleri ve MATCH_AGGREGATION) hesaplanır. Taban,
+uygun olmayan çiftlerin benzerlik dağılımının floor-quantile yüzdeliği (varsayılan medyan: sıradan bir
+uyumsuz aday %0 alır), tavan ise uygun çiftlerin ceiling-quantile yüzdeliğidir (uygun adayların en iyi
+%10'u %100 alır). Ayrıca iki sınıfın ayrışması (AUC) ve F1'i en yüksek yapan min_match_percentage raporlanır.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_pairs(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        pairs = [json.loads(line) for line in f if line.strip()]
+    if not pairs:
+        raise SystemExit(f"{path} içinde çift bulunamadı")
+    return pairs
+
+
+def pair_similarities(matcher, pairs: List[Dict]) -> List[float]:
+    """
+    Her çift için adayın ilana benzerliğini eşleştirmedeki gibi (bölüm vektörleri birleştirilerek) hesapla
+    """
+    from cv_parser import split_sections
+    from skill_index import ids_to_bitmap
+    from vector_matcher import job_query
+
+    cv_texts = list(dict.fromkeys(pair["cv"] for pair in pairs))
+    cv_ids = {text: str(i) for i, text in enumerate(cv_texts)}
+    records = matcher.embedding_records(cv_texts, [split_sections(text) for text in cv_texts])
+    matcher.create_index(
+        {"_id": cv_ids[text], "text": text, "embedding": record} for text, record in zip(cv_texts, records)
+    )
+    queries = [pair["job"] if isinstance(pair["job"], str) else job_query(pair["job"]) for pair in pairs]
+    vectors = matcher.encode(queries)
+
+    similarities = []
+    for pair, vector in zip(pairs, vectors):
+        keys = matcher.candidate_vectors[cv_ids[pair["cv"]]]
+        allowed = ids_to_bitmap(matcher.index.key_to_id[key] for key in keys)
+        found = matcher.index.search(vector[None, :], len(keys), allowed=allowed)[0]
+        similarities.append(matcher._aggregate(found, None)[0][1])
+    return similarities
+
+
+def auc(positive: np.ndarray, negative: np.ndarray) -> float:
+    """
+    Rastgele bir uygun çiftin rastgele bir uygun olmayan çiftten yüksek skor alma olasılığı
+    """
+    greater = (positive[:, None] > negative[None, :]).sum()
+    ties = (positive[:, None] == negative[None, :]).sum()
+    return float((greater + 0.5 * ties) / (len(positive) * len(negative)))
+
+
+def calibrate(
+    similarities: List[float],
+    labels: List[int],
+    floor_quantile: float = 0.5,
+    ceiling_quantile: float = 0.9,
+) -> Dict:
+    """
+    Etiketli benzerliklerden taban/tavan değerlerini ve bunlarla önerilen eşleşme eşiğini hesapla
+    """
+    scores = np.asarray(similarities, dtype="float64")
+    labels = np.asarray(labels, dtype=bool)
+    positive, negative = scores[labels], scores[~labels]
+    if not len(positive) or not len(negative):
+        raise ValueError("Kalibrasyon için hem uygun (label=1) hem uygun olmayan (label=0) çiftler gerekir")
+    floor = float(np.quantile(negative, floor_quantile))
+    ceiling = float(np.quantile(positive, ceiling_quantile))
+    if ceiling <= floor:
+        raise ValueError(
+            f"Uygun çiftlerin benzerliği ({ceiling:.3f}) uygun olmayanlarınkini ({floor:.3f}) aşmıyor; "
+            "model ya da etiketler ayrışmıyor"
+        )
+    percentages = 100 * np.clip((scores - floor) / (ceiling - floor), 0.0, 1.0)
+
+    # F1'i en yüksek yapan eşik (aynı F1'de daha düşük eşik tercih edilir)
+    best = {"f1": -1.0}
+    for threshold in range(0, 101, 5):
+        predicted = percentages >= threshold
+        true_positive = int((predicted & labels).sum())
+        precision = true_positive / max(1, int(predicted.sum()))
+        recall = true_positive / len(positive)
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        if f1 > best["f1"]:
+            best = {"min_match_percentage": threshold, "precision": round(precision, 4), "recall": round(recall, 4), "f1": f1}
+    best["f1"] = round(best["f1"], 4)
+
+    return {
+        "MATCH_SCORE_FLOOR": round(floor, 4),
+        "MATCH_SCORE_CEILING": round(ceiling, 4),
+        "auc": round(auc(positive, negative), 4),
+        "pairs": {"positive": int(len(positive)), "negative": int(len(negative))},
+        "similarity": {
+            "positive_median": round(float(np.median(positive)), 4),
+            "negative_median": round(float(np.median(negative)), 4),
+        },
+        "suggested_threshold": best,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eşleşme yüzdesi taban/tavan kalibrasyonu")
+    parser.add_argument("pairs", help="Etiketli CV/ilan çiftleri (JSONL)")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--floor-quantile", type=float, default=0.5, help="Uygun olmayan çiftlerde %%0'a denk gelen yüzdelik")
+    parser.add_argument("--ceiling-quantile", type=float, default=0.9, help="Uygun çiftlerde %%100'e denk gelen yüzdelik")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası (varsayılan: stdout)")
+    args = parser.parse_args()
+
+    from vector_matcher import VectorMatcher
+
+    pairs = load_pairs(args.pairs)
+    matcher = VectorMatcher(args.model, index_type="flat")
+    similarities = pair_similarities(matcher, pairs)
+    result = calibrate(similarities, [int(pair["label"]) for pair in pairs], args.floor_quantile, args.ceiling_quantile)
+    result["model"] = matcher.model_name
+    result["aggregation"] = matcher.match_aggregation
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+PyTorch ve nicemlenmiş ONNX Runtime çıkarım arka uçlarını aynı metinler üzerinde karşılaştırır:
+gömme kosinüs sapması ve en yakın komşu örtüşmesi, özet örtüşmesi (ROUGE-1 / ROUGE-L F1) ve
+her iki arka ucun hızı. ONNX arka ucu için `pip install optimum[onnxruntime]` gerekir.
+
+    python benchmarks/inference_parity.py --texts 300 --summary-samples 10
+    python benchmarks/inference_parity.py --skip-summary --baseline parity.json --fail-on-regression
+"""
+import argparse
+import os
+import random
+import re
+from typing import Dict, List
+
+import numpy as np
+
+from _common import (
+    add_output_arguments, finish, metric, paragraphs_from, sample_texts, synthetic_cvs, synthetic_job,
+    taxonomy_skills, time_once,
+)
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def rouge_f1(candidate: str, reference: str) -> Dict[str, float]:
+    """
+    Kelime düzeyinde ROUGE-1 ve ROUGE-L (en uzun ortak alt dizi) F1 skorları
+    """
+    a, b = WORD.findall(candidate.lower()), WORD.findall(reference.lower())
+    if not a or not b:
+        return {"rouge1": float(a == b), "rougeL": float(a == b)}
+    counts: Dict[str, int] = {}
+    for word in b:
+        counts[word] = counts.get(word, 0) + 1
+    overlap = 0
+    for word in a:
+        if counts.get(word):
+            counts[word] -= 1
+            overlap += 1
+    previous = [0] * (len(b) + 1)
+    for word in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if word == other else max(previous[j + 1], current[j]))
+        previous = current
+
+    def f1(hits: int) -> float:
+        return 2 * hits / (len(a) + len(b))
+
+    return {"rouge1": f1(overlap), "rougeL": f1(previous[-1])}
+
+
+def bench_embeddings(args, metrics, details, cv_texts: List[str], queries: List[str]):
+    from inference_backend import load_embedder
+
+    vectors = {}
+    for backend in ("torch", "onnx"):
+        model = load_embedder(args.embedding_model, backend)
+        model.encode(cv_texts[:8], normalize_embeddings=True)  # Isınma
+        elapsed, encoded = time_once(model.encode, cv_texts, normalize_embeddings=True)
+        metrics[f"embedding.{backend}.texts_per_second"] = metric(len(cv_texts) / elapsed, "texts/s", "higher")
+        vectors[backend] = (np.asarray(encoded, dtype="float32"), np.asarray(model.encode(queries, normalize_embeddings=True)))
+
+    (torch_docs, torch_queries), (onnx_docs, onnx_queries) = vectors["torch"], vectors["onnx"]
+    cosine = np.sum(torch_docs * onnx_docs, axis=1)
+    metrics["embedding.cosine_mean"] = metric(float(cosine.mean()), "cosine", "higher")
+    metrics["embedding.cosine_p05"] = metric(float(np.percentile(cosine, 5)), "cosine", "higher")
+    metrics["embedding.cosine_min"] = metric(float(cosine.min()), "cosine", "higher")
+
+    # Sıralamaya etkisi: ilan sorgularının en yakın k CV'si iki arka uçta ne kadar örtüşüyor
+    k = min(args.k, len(cv_texts))
+    torch_top = np.argsort(-(torch_queries @ torch_docs.T), axis=1)[:, :k]
+    onnx_top = np.argsort(-(onnx_queries @ onnx_docs.T), axis=1)[:, :k]
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(torch_top.tolist(), onnx_top.tolist())])
+    metrics[f"embedding.neighbors_overlap_at_{k}"] = metric(float(overlap), "ratio", "higher")
+
+
+def bench_summaries(args, metrics, details, texts: List[str]):
+    from summarizer import Summarizer
+
+    outputs = {}
+    for backend in ("torch", "onnx"):
+        summarizer = Summarizer(args.summary_model, backend=backend)
+        summarizer.warmup()
+        elapsed, outputs[backend] = time_once(lambda: [summarizer.summarize(text) for text in texts])
+        metrics[f"summary.{backend}.seconds_per_text"] = metric(elapsed / len(texts), "s")
+
+    scores = [rouge_f1(onnx, torch) for torch, onnx in zip(outputs["torch"], outputs["onnx"])]
+    metrics["summary.rouge1_f1"] = metric(float(np.mean([s["rouge1"] for s in scores])), "f1", "higher")
+    metrics["summary.rougeL_f1"] = metric(float(np.mean([s["rougeL"] for s in scores])), "f1", "higher")
+    metrics["summary.exact_match_rate"] = metric(
+        float(np.mean([a == b for a, b in zip(outputs["torch"], outputs["onnx"])])), "ratio", "higher"
+    )
+    details["summary_examples"] = [
+        {"torch": torch, "onnx": onnx} for torch, onnx in list(zip(outputs["torch"], outputs["onnx"]))[:3]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyTorch / ONNX int8 çıkarım doğruluğu ve hız karşılaştırması")
+    parser.add_argument("--texts", type=int, default=200, help="Gömme karşılaştırmasında sentetik CV sayısı")
+    parser.add_argument("--queries", type=int, default=50, help="Komşu örtüşmesi için sentetik ilan sayısı")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--summary-samples", type=int, default=5)
+    parser.add_argument("--embedding-model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--summary-model", default=os.getenv("SUMMARY_MODEL", "sshleifer/distilbart-cnn-12-6"))
+    parser.add_argument("--skip-summary", action="store_true", help="Özetleme karşılaştırmasını atla")
+    parser.add_argument("--seed", type=int, default=0)
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    from inference_backend import INFERENCE_INTRA_OP_THREADS, ONNX_CACHE_DIR, resolve_quantization
+    from vector_matcher import job_query
+
+    samples = sample_texts()
+    cv_texts = [cv["text"] for cv in synthetic_cvs(args.texts, args.seed, paragraphs_from(samples))] + samples
+    rng = random.Random(args.seed)
+    skills = taxonomy_skills()
+    queries = [job_query(synthetic_job(rng, skills)) for _ in range(args.queries)]
+    metrics, details = {}, {
+        "quantization": resolve_quantization(),
+        "intra_op_threads": INFERENCE_INTRA_OP_THREADS or "default",
+        "texts": len(cv_texts),
+    }
+
+    bench_embeddings(args, metrics, details, cv_texts, queries)
+    if not args.skip_summary:
+        bench_summaries(args, metrics, details, (samples + cv_texts)[:args.summary_samples])
+    if os.path.isdir(ONNX_CACHE_DIR):
+        details["onnx_cache_bytes"] = _directory_bytes(ONNX_CACHE_DIR)
+
+    finish(args, "inference_parity", metrics, details)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+API yük testi: benzersiz CV yüklemeleri, ilan oluşturma ve eşzamanlı eşleştirme istekleri.
+Varsayılan olarak uygulama süreç içinde mongomock üzerinde çalıştırılır (bildirimler gönderilmez);
+--url ile çalışan bir sunucuya karşı da koşulabilir.
+
+    python benchmarks/load_test.py --uploads 100 --jobs 20 --requests 2000 --concurrency 16
+    python benchmarks/load_test.py --url http://localhost:8000 --output load.json
+
+Yüklemeden sonra adaylar /cv/{id}/status ile hazır olana kadar (en çok --ready-timeout saniye)
+beklenir; yüklemeden hazır olmaya kadar geçen süre ayrı bir "enrichment" metriği olarak raporlanır.
+Eşleştirme aşamasında hâlâ işlenen adaylar için dönen 409 yanıtları hata sayılmaz, "not_ready_rate"
+olarak ayrıca raporlanır.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from _common import (
+    add_output_arguments, docx_bytes, finish, metric, paragraphs_from, sample_pdfs, sample_texts,
+    summarize_ms, synthetic_cvs, synthetic_job, taxonomy_skills, use_mongomock,
+)
+
+
+class _NullSMTP:
+    """
+    Süreç içi çalıştırmada gerçek e-posta gönderilmemesi için SMTP yerine geçer
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _NullSMS:
+    class messages:
+        @staticmethod
+        def create(**kwargs):
+            return None
+
+
+def in_process_client(workdir: str):
+    """
+    Uygulamayı geçici bir çalışma dizininde, mongomock ve sahte bildirim istemcileriyle başlat
+    """
+    use_mongomock()
+    os.environ.setdefault("ARTIFACT_CACHE_DIR", os.path.join(workdir, "artifact_cache"))
+    os.environ.setdefault("INDEX_PATH", os.path.join(workdir, "candidate_index.faiss"))
+    os.environ.setdefault("JOB_INDEX_PATH", os.path.join(workdir, "job_index.faiss"))
+    from fastapi.testclient import TestClient
+    import main
+
+    main.notification_service.smtp_factory = _NullSMTP
+    main.notification_service.smtp_use_tls = False
+    main.notification_service.twilio_client = _NullSMS()
+    return TestClient(main.app)
+
+
+class Recorder:
+    def __init__(self):
+        """
+        Uç nokta başına gecikmeler ve durum kodları
+        """
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.enrichment = []
+
+    def call(self, client, endpoint: str, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = client.request(method, path, **kwargs)
+            status = response.status_code
+        except Exception:
+            response, status = None, 0
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        self.statuses[endpoint][status] += 1
+        return response if status == 200 else None
+
+    def report(self, metrics, details):
+        for endpoint, samples in self.latencies.items():
+            summary = summarize_ms(samples)
+            statuses = self.statuses[endpoint]
+            total = sum(statuses.values())
+            errors = sum(count for status, count in statuses.items() if status not in (200, 409, 429))
+            details[endpoint] = {**summary, "statuses": {str(k): v for k, v in statuses.items()}}
+            metrics[f"{endpoint}.p50_ms"] = metric(summary["p50_ms"], "ms")
+            metrics[f"{endpoint}.p95_ms"] = metric(summary["p95_ms"], "ms")
+            metrics[f"{endpoint}.p99_ms"] = metric(summary["p99_ms"], "ms")
+            metrics[f"{endpoint}.error_rate"] = metric(errors / total, "ratio")
+            metrics[f"{endpoint}.rejected_rate"] = metric(statuses.get(429, 0) / total, "ratio")
+            if statuses.get(409):
+                metrics[f"{endpoint}.not_ready_rate"] = metric(statuses[409] / total, "ratio")
+        if self.enrichment:
+            summary = summarize_ms(self.enrichment)
+            details["enrichment"] = summary
+            metrics["enrichment.p50_ms"] = metric(summary["p50_ms"], "ms")
+            metrics["enrichment.p95_ms"] = metric(summary["p95_ms"], "ms")
+            metrics["enrichment.p99_ms"] = metric(summary["p99_ms"], "ms")
+
+
+def wait_until_ready(client, uploaded: Dict[str, float], recorder: Recorder, timeout: float,
+                     interval: float = 0.2) -> Dict[str, int]:
+    """
+    Yüklenen adayların durumunu ready/failed olana kadar yokla; hazır olanların yüklemeden bu yana
+    geçen süresini zenginleştirme gecikmesi olarak kaydet
+    """
+    pending = dict(uploaded)
+    counts = {"ready": 0, "failed": 0, "timeout": 0}
+    deadline = time.perf_counter() + timeout
+    while pending and time.perf_counter() < deadline:
+        for cv_id, uploaded_at in list(pending.items()):
+            try:
+                response = client.get(f"/cv/{cv_id}/status")
+            except Exception:
+                continue
+            if response.status_code != 200:
+                continue
+            status = response.json().get("status")
+            if status == "ready":
+                recorder.enrichment.append(time.perf_counter() - uploaded_at)
+            elif status != "failed":
+                continue
+            counts[status] += 1
+            del pending[cv_id]
+        if pending:
+            time.sleep(interval)
+    counts["timeout"] = len(pending)
+    return counts
+
+
+def run_concurrent(fn, items, concurrency: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fn, items))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentMatch API yük testi")
+    parser.add_argument("--url", help="Çalışan sunucunun adresi (verilmezse uygulama süreç içinde başlatılır)")
+    parser.add_argument("--uploads", type=int, default=50, help="Yüklenecek benzersiz sentetik CV sayısı")
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500, help="Karışık okuma/eşleştirme isteği sayısı")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ready-timeout", type=float, default=300,
+                        help="Yüklenen adayların hazır olması için en fazla beklenecek süre (sn)")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="talentmatch-load-")
+    try:
+        if args.url:
+            import httpx
+            client = httpx.Client(base_url=args.url, timeout=120)
+        else:
+            client = in_process_client(workdir)
+        with client:
+            metrics, details = {}, {"concurrency": args.concurrency, "target": args.url or "in-process"}
+            recorder = Recorder()
+
+            # 1) Yüklemeler: sentetik DOCX'ler (her biri benzersiz) ve depodaki örnek PDF'ler
+            samples = sample_texts()
+            uploads = [
+                (f"synthetic_{i}.docx", docx_bytes(cv["text"]))
+                for i, cv in enumerate(synthetic_cvs(args.uploads, args.seed, paragraphs_from(samples)))
+            ]
+            for path in sample_pdfs():
+                with open(path, "rb") as f:
+                    uploads.append((os.path.basename(path), f.read()))
+            uploaded = {}
+
+            def upload(item):
+                name, content = item
+                response = recorder.call(client, "upload_cv", "POST", "/upload-cv", files={"file": (name, content)})
+                if response is not None:
+                    uploaded[response.json()["cv_id"]] = time.perf_counter()
+
+            elapsed = run_concurrent(upload, uploads, args.concurrency)
+            metrics["upload_cv.uploads_per_second"] = metric(len(uploads) / elapsed, "uploads/s", "higher")
+
+            # Eşleştirme ölçümleri işlenmekte olan adayların 409 yanıtlarıyla karışmasın diye hazır olmalarını bekle
+            readiness = wait_until_ready(client, uploaded, recorder, args.ready_timeout)
+            details["readiness"] = readiness
+            if readiness["timeout"]:
+                print(f"Uyarı: {readiness['timeout']} aday {args.ready_timeout:.0f} sn içinde hazır olmadı")
+            cv_ids = list(uploaded)
+
+            # 2) İlanlar
+            rng = random.Random(args.seed)
+            skills = taxonomy_skills()
+            job_ids = []
+
+            def create_job(job):
+                response = recorder.call(client, "create_job_posting", "POST", "/job-posting", json=job)
+                if response is not None:
+                    job_ids.append(response.json()["job_id"])
+
+            run_concurrent(create_job, [synthetic_job(rng, skills) for _ in range(args.jobs)], args.concurrency)
+            if not job_ids or not cv_ids:
+                raise SystemExit("Yükleme veya ilan oluşturma başarısız oldu; yük testi sürdürülemiyor")
+
+            # 3) Karışık eşzamanlı istekler: ilan -> aday eşleştirme, aday -> ilan, sayfalı sonuçlar, CV okuma
+            mix = [
+                ("match_candidates", lambda: ("GET", f"/match-candidates/{rng.choice(job_ids)}")),
+                ("match_jobs_for_candidate", lambda: ("GET", f"/cv/{rng.choice(cv_ids)}/jobs?k=5")),
+                ("get_job_matches", lambda: ("GET", f"/job-posting/{rng.choice(job_ids)}/matches?limit=20")),
+                ("get_cv", lambda: ("GET", f"/cv/{rng.choice(cv_ids)}")),
+            ]
+            plan = [(endpoint, *build()) for endpoint, build in (rng.choice(mix) for _ in range(args.requests))]
+
+            def request(item):
+                endpoint, method, path = item
+                recorder.call(client, endpoint, method, path)
+
+            elapsed = run_concurrent(request, plan, args.concurrency)
+            recorder.report(metrics, details)
+            metrics["throughput.requests_per_second"] = metric(len(plan) / elapsed, "req/s", "higher")
+            details["uploaded"] = len(cv_ids)
+            details["jobs"] = len(job_ids)
+        finish(args, "load_test", metrics, details)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+PDF metin çıkarma arka uçlarını örnek CV'ler üzerinde hız ve metin kalitesi açısından karşılaştırır.
+
+    python benchmarks/pdf_extraction.py
+    python benchmarks/pdf_extraction.py --repeat 5 --reference pdfplumber cvler/ ingilizcecv.pdf
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from document_processor import available_pdf_backends, extract_text_from_pdf  # noqa: E402
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def sample_files(paths: List[str]) -> List[str]:
+    """
+    Verilen dosya/dizinlerdeki PDF'ler; verilmezse depodaki ingilizcecv*.pdf ve cvler/ örnekleri
+    """
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(ROOT, "ingilizcecv*.pdf"))) + [os.path.join(ROOT, "cvler")]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", "*.pdf"), recursive=True)))
+        elif path.lower().endswith(".pdf"):
+            files.append(path)
+    return files
+
+
+def quality(text: str, reference: str) -> Dict:
+    """
+    Basit metin kalitesi ölçütleri: kelime sayısı, okunabilir karakter oranı ve
+    referans arka ucun kelime kümesiyle Jaccard benzerliği
+    """
+    words = WORD.findall(text.lower())
+    reference_words = set(WORD.findall(reference.lower()))
+    readable = sum(1 for ch in text if ch.isprintable() or ch in "\n\t")
+    union = set(words) | reference_words
+    return {
+        "chars": len(text),
+        "words": len(words),
+        "readable_ratio": round(readable / len(text), 4) if text else 0.0,
+        "jaccard_vs_reference": round(len(set(words) & reference_words) / len(union), 4) if union else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF arka uçları için hız / kalite raporu")
+    parser.add_argument("paths", nargs="*", help="PDF dosyaları veya dizinler")
+    parser.add_argument("--backends", nargs="*", default=None, help="Varsayılan: kurulu tüm arka uçlar")
+    parser.add_argument("--reference", default="pdfplumber", help="Kalite karşılaştırması için referans arka uç")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = args.backends or list(available_pdf_backends())
+    files = sample_files(args.paths)
+    if not files:
+        raise SystemExit("Örnek PDF bulunamadı")
+    reference_backend = args.reference if args.reference in available_pdf_backends() else backends[0]
+
+    report = {"reference": reference_backend, "files": {}, "summary": {}}
+    totals: Dict[str, List[float]] = {backend: [] for backend in backends}
+    for path in files:
+        with open(path, "rb") as f:
+            content = f.read()
+        reference = extract_text_from_pdf(content, reference_backend)
+        entry = {}
+        for backend in backends:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                text = extract_text_from_pdf(content, backend)
+                timings.append(time.perf_counter() - started)
+            seconds = statistics.median(timings)
+            totals[backend].append(seconds)
+            entry[backend] = {"median_ms": round(seconds * 1000, 2), **quality(text, reference)}
+        report["files"][os.path.relpath(path, ROOT)] = entry
+
+    for backend, timings in totals.items():
+        jaccards = [entry[backend]["jaccard_vs_reference"] for entry in report["files"].values()]
+        report["summary"][backend] = {
+            "total_ms": round(sum(timings) * 1000, 2),
+            "mean_jaccard_vs_reference": round(statistics.mean(jaccards), 4),
+        }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Yükleme ve eşleştirme hattının aşamalarını ayrı ayrı ölçer: process_document, cv_parser
+çıkarıcıları, generate_summary, VectorMatcher.create_index / find_matches ve Database çağrıları.
+Aday havuzları şablonlardan ve depodaki örnek PDF'lerden sentetik olarak üretilir.
+
+    python benchmarks/pipeline.py --sizes 1000 10000 100000 --output results.json
+    python benchmarks/pipeline.py --sizes 1000 --skip-summary --baseline results.json --fail-on-regression
+"""
+import argparse
+import itertools
+import os
+import random
+
+import numpy as np
+
+from _common import (
+    add_output_arguments, docx_bytes, finish, metric, paragraphs_from, sample_pdfs, sample_texts,
+    summarize_ms, synthetic_cvs, synthetic_job, taxonomy_skills, time_each, time_once, use_mongomock,
+)
+
+
+def record(metrics, details, name: str, samples):
+    """
+    Çağrı başına sürelerden p50/p95 ölçümlerini ekle
+    """
+    summary = summarize_ms(samples)
+    details[name] = summary
+    metrics[f"{name}.p50_ms"] = metric(summary["p50_ms"], "ms")
+    metrics[f"{name}.p95_ms"] = metric(summary["p95_ms"], "ms")
+
+
+def bench_documents(args, metrics, details, texts):
+    from document_processor import process_document, resolve_pdf_backend
+    details["pdf_backend"] = resolve_pdf_backend()
+    for path in sample_pdfs():
+        with open(path, "rb") as f:
+            content = f.read()
+        samples = time_each(lambda c: process_document(c, ".pdf"), [content], args.repeat)
+        record(metrics, details, f"process_document.{os.path.basename(path)}", samples)
+    docx = [docx_bytes(cv["text"]) for cv in synthetic_cvs(20, args.seed, paragraphs_from(texts))]
+    record(metrics, details, "process_document.synthetic_docx", time_each(lambda c: process_document(c, ".docx"), docx))
+
+
+def bench_extractors(args, metrics, details, cv_texts):
+    import cv_parser
+    from keyword_extractor import get_extractor
+
+    get_extractor()  # Otomat derleme süresi ölçüme katılmasın
+    for name, fn in (
+        ("extract_email", cv_parser.extract_email),
+        ("extract_phone", cv_parser.extract_phone),
+        ("extract_skills", cv_parser.extract_skills),
+        ("extract_education", cv_parser.extract_education),
+        ("extract_experience", cv_parser.extract_experience),
+        ("keyword_extractor.extract", get_extractor().extract),
+    ):
+        record(metrics, details, f"cv_parser.{name}", time_each(fn, cv_texts))
+
+    if args.skip_ner:
+        return
+    nlp = cv_parser.get_nlp()
+    ner_texts = cv_texts[:args.ner_samples]
+    docs = []
+    record(metrics, details, "cv_parser.spacy_ner", time_each(lambda text: docs.append(nlp(text)), ner_texts))
+    pairs = list(zip(ner_texts, docs))
+    record(metrics, details, "cv_parser.extract_name", time_each(lambda pair: cv_parser.extract_name(*pair), pairs))
+    # Özetleme ayrıca ölçüldüğü için parse_cv'ye hazır özet verilir
+    record(
+        metrics, details, "cv_parser.parse_cv_without_summary",
+        time_each(lambda pair: cv_parser.parse_cv(pair[0], pair[1], summary=""), pairs)
+    )
+    elapsed, _ = time_once(lambda: list(cv_parser.get_nlp().pipe(ner_texts, batch_size=32)))
+    metrics["cv_parser.nlp_pipe.docs_per_second"] = metric(len(ner_texts) / elapsed, "docs/s", "higher")
+
+
+def bench_summary(args, metrics, details, texts):
+    from cv_parser import generate_summary
+    from summarizer import get_summarizer
+
+    get_summarizer().warmup()
+    record(metrics, details, "cv_parser.generate_summary", time_each(generate_summary, texts[:args.summary_samples]))
+
+
+def _synthetic_vectors(base: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Şablon gömmelerinin etrafında gürültüyle gerçekçi (kümelenmiş) birim vektörler üret
+    """
+    vectors = base[rng.integers(0, len(base), count)] + 0.05 * rng.standard_normal((count, base.shape[1]))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype("float32")
+
+
+def bench_matcher(args, metrics, details, cv_texts):
+    from vector_matcher import VectorMatcher, job_query
+
+    matcher = VectorMatcher(index_type=args.index_type)
+    encode_texts = cv_texts[:args.encode_samples]
+    matcher.encode(encode_texts[:8])  # Isınma
+    elapsed, base = time_once(matcher.encode, encode_texts)
+    metrics["vector_matcher.encode.texts_per_second"] = metric(len(encode_texts) / elapsed, "texts/s", "higher")
+
+    rng = random.Random(args.seed)
+    skills = taxonomy_skills()
+    jobs = [synthetic_job(rng, skills) for _ in range(args.queries)]
+    record(metrics, details, "vector_matcher.encode_job_query", time_each(lambda job: matcher.encode([job_query(job)]), jobs[:50]))
+    job_vectors = matcher.encode([job_query(job) for job in jobs])
+
+    np_rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        vectors = _synthetic_vectors(base, size, np_rng)
+        candidates = (
+            {
+                "_id": f"c{i}",
+                "embedding": {"vector": vector, "model": matcher.model_name, "dimension": matcher.dimension},
+                "skills": cv["skills"],
+            }
+            for i, (vector, cv) in enumerate(zip(vectors, synthetic_cvs(size, args.seed)))
+        )
+        elapsed, _ = time_once(matcher.create_index, candidates)
+        metrics[f"vector_matcher.create_index.{size}.seconds"] = metric(elapsed, "s")
+        details[f"vector_matcher.index_bytes.{size}"] = matcher.index.memory_bytes()
+
+        record(
+            metrics, details, f"vector_matcher.find_matches.{size}",
+            time_each(lambda vector: matcher.find_matches("", query_vector=vector), list(job_vectors))
+        )
+        record(
+            metrics, details, f"vector_matcher.find_matches_required_skills.{size}",
+            time_each(
+                lambda pair: matcher.find_matches(
+                    "", query_vector=pair[0], required_skills=pair[1]["requirements"][:1],
+                    preferred_skills=pair[1]["requirements"][1:]
+                ),
+                list(zip(job_vectors, jobs))
+            )
+        )
+        queries = [{"vector": vector} for vector in job_vectors]
+        elapsed, _ = time_once(matcher.find_matches_batch, queries)
+        metrics[f"vector_matcher.find_matches_batch.{size}.queries_per_second"] = metric(
+            len(queries) / elapsed, "queries/s", "higher"
+        )
+
+
+def bench_database(args, metrics, details, cv_texts):
+    if not args.mongo_uri:
+        use_mongomock()
+    else:
+        os.environ["MONGODB_URI"] = args.mongo_uri
+    from database import Database
+
+    db = Database()
+    if args.mongo_uri and args.drop:
+        db.client.drop_database(db.db.name)
+    db.ensure_indexes()
+    rng = np.random.default_rng(args.seed)
+    size = min(max(args.sizes), args.db_max)
+    texts = itertools.cycle(cv_texts)
+
+    ids = []
+    samples = []
+    for start in range(0, size, args.db_batch):
+        records = []
+        for i in range(start, min(start + args.db_batch, size)):
+            text = next(texts)
+            embedding = {"vector": rng.standard_normal(384).astype("float32").tolist(), "model": "bench", "dimension": 384}
+            cv_data = {"name": f"Aday {i}", "email": f"aday{i}@example.com", "skills": [], "text": text,
+                       "file_hash": f"file-{i}", "text_hash": f"text-{i}"}
+            records.append((cv_data, b"%PDF-1.4 bench", f"cv{i}.pdf", embedding))
+        elapsed, stored = time_once(db.store_cvs, records)
+        samples.append(elapsed / len(records))
+        ids.extend(cv_id for cv_id in stored if cv_id is not None)
+    record(metrics, details, f"database.store_cvs_per_cv.{size}", samples)
+
+    lookups = [rng.choice(ids, 100).tolist() for _ in range(20)]
+    record(metrics, details, f"database.get_cvs_100.{size}", time_each(lambda batch: db.get_cvs(batch, ["email", "phone"]), lookups))
+    record(metrics, details, f"database.get_cv_metadata.{size}", time_each(db.get_cv_metadata, ids[:200]))
+    record(
+        metrics, details, f"database.find_cv_by_hash.{size}",
+        time_each(lambda i: db.find_cv_by_hash(file_hash=f"file-{i}"), list(range(0, size, max(1, size // 200))))
+    )
+    elapsed, count = time_once(lambda: sum(1 for _ in db.iter_candidates(["embedding", "skills"])))
+    metrics[f"database.iter_candidates.{size}.docs_per_second"] = metric(count / elapsed, "docs/s", "higher")
+
+    matches = [
+        {"candidate_id": candidate_id, "match_percentage": float(rng.uniform(0, 100)), "missing_skills": [], "explanation": ""}
+        for candidate_id in ids[:200]
+    ]
+    record(metrics, details, "database.store_matches_200", time_each(lambda job: db.store_matches(job, matches), [f"job{j}" for j in range(10)]))
+
+    def page_through(job_id):
+        cursor = None
+        while True:
+            _, cursor = db.get_matches_for_job(job_id, 50, cursor)
+            if cursor is None:
+                break
+
+    record(metrics, details, "database.get_matches_for_job_all_pages_200", time_each(page_through, [f"job{j}" for j in range(10)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yükleme ve eşleştirme hattı aşama ölçümleri")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Aday havuzu boyutları")
+    parser.add_argument("--stages", nargs="+", default=["documents", "extractors", "summary", "matcher", "database"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--texts", type=int, default=500, help="Çıkarıcı ölçümlerinde kullanılan sentetik CV sayısı")
+    parser.add_argument("--ner-samples", type=int, default=100)
+    parser.add_argument("--summary-samples", type=int, default=5)
+    parser.add_argument("--encode-samples", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--index-type", default=None, help="Varsayılan: INDEX_TYPE")
+    parser.add_argument("--inference-backend", choices=["torch", "onnx"], help="Varsayılan: INFERENCE_BACKEND")
+    parser.add_argument("--skip-ner", action="store_true", help="spaCy ölçümlerini atla")
+    parser.add_argument("--skip-summary", action="store_true", help="Özetleme ölçümünü atla")
+    parser.add_argument("--mongo-uri", help="mongomock yerine yerel MongoDB kullan")
+    parser.add_argument("--drop", action="store_true", help="--mongo-uri ile başlamadan önce veritabanını sil")
+    parser.add_argument("--db-max", type=int, default=10000, help="Veritabanı aşamasında en fazla aday sayısı")
+    parser.add_argument("--db-batch", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    if args.inference_backend:
+        # Gömme ve özetleme modelleri ilk kullanımda bu ayarla yüklenir
+        os.environ["INFERENCE_BACKEND"] = args.inference_backend
+
+    samples = sample_texts()
+    cv_texts = [cv["text"] for cv in synthetic_cvs(args.texts, args.seed, paragraphs_from(samples))] + samples
+    metrics, details = {}, {"sizes": args.sizes, "stages": args.stages}
+
+    if "documents" in args.stages:
+        bench_documents(args, metrics, details, samples)
+    if "extractors" in args.stages:
+        bench_extractors(args, metrics, details, cv_texts)
+    if "summary" in args.stages and not args.skip_summary:
+        bench_summary(args, metrics, details, samples + cv_texts)
+    if "matcher" in args.stages:
+        bench_matcher(args, metrics, details, cv_texts)
+    if "database" in args.stages:
+        bench_database(args, metrics, details, cv_texts)
+
+    finish(args, "pipeline", metrics, details)
+
+
+if __name__ == "__main__":
+    main()
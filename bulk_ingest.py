@@ -0,0 +1,333 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from document_processor import process_document_info
+from cv_parser import parse_cv_fast
+from instrumentation import STAGE_ERRORS, STAGE_SECONDS
+from vector_matcher import content_hash
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+# Zip arşivi sınırları (zip bombalarına karşı): üye sayısı, üye başına ve arşiv başına açılmış boyut.
+# Toplam sınır varsayılan olarak toplu yükleme istek sınırını (BULK_UPLOAD_MAX_MB) aşmaz
+ZIP_MAX_MEMBERS = int(os.getenv("ZIP_MAX_MEMBERS", "1000"))
+ZIP_MAX_MEMBER_BYTES = int(float(os.getenv("ZIP_MAX_MEMBER_MB", "20")) * 1024 * 1024)
+ZIP_MAX_TOTAL_BYTES = int(float(os.getenv("ZIP_MAX_TOTAL_MB", "200")) * 1024 * 1024)
+ZIP_READ_CHUNK = 1024 * 1024
+# Zip üyelerinin işlenirken açıldığı geçici dizinin konumu (boşsa sistem geçici dizini)
+ZIP_EXTRACT_DIR = os.getenv("ZIP_EXTRACT_DIR") or None
+
+# Toplu yüklenen dosya: diskteki yol, açık dosya nesnesi veya (testlerde) bayt içerik
+Source = Union[str, BinaryIO, bytes]
+
+
+def is_supported(filename: str) -> bool:
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+class ZipLimitError(ValueError):
+    """
+    Zip arşivi üye sayısı veya açılmış boyut sınırlarını aştığında fırlatılır
+    """
+
+
+def extract_zip(
+    source: Union[bytes, BinaryIO],
+    directory: str,
+    max_members: int = ZIP_MAX_MEMBERS,
+    max_member_bytes: int = ZIP_MAX_MEMBER_BYTES,
+    max_total_bytes: int = ZIP_MAX_TOTAL_BYTES,
+) -> List[Tuple[str, str]]:
+    """
+    Zip arşivindeki (bayt veya dosya nesnesi) PDF/DOCX dosyalarını verilen dizine parça parça aç;
+    (ad, yol) listesi döndür. Bellekte en fazla bir parça tutulur. Zip bombalarına karşı üye sayısı,
+    üye başına ve toplam açılmış boyut sınırlanır; başlıktaki boyut bilgisine güvenilmez, üyeler
+    açılırken gerçek bayt sayısı da denetlenir. Dizinin temizlenmesi çağırana bırakılır.
+    """
+    extracted = []
+    with zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source) as archive:
+        members = archive.infolist()
+        if len(members) > max_members:
+            raise ZipLimitError(f"Zip arşivinde çok fazla dosya var ({len(members)}); sınır {max_members}")
+        total = 0
+        for info in members:
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or not is_supported(name):
+                continue
+            if info.file_size > max_member_bytes:
+                raise ZipLimitError(f"Zip içindeki {name} dosyası çok büyük; sınır {max_member_bytes // (1024 * 1024)} MB")
+            # Arşivdeki ad yalnızca uzantı için kullanılır; yol dizinin dışına çıkamaz
+            path = os.path.join(directory, f"{len(extracted)}{os.path.splitext(name)[1].lower()}")
+            size = 0
+            with archive.open(info) as member, open(path, "wb") as target:
+                while True:
+                    chunk = member.read(ZIP_READ_CHUNK)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    total += len(chunk)
+                    if size > max_member_bytes:
+                        raise ZipLimitError(f"Zip içindeki {name} dosyası çok büyük; sınır {max_member_bytes // (1024 * 1024)} MB")
+                    if total > max_total_bytes:
+                        raise ZipLimitError(f"Zip arşivinin açılmış boyutu sınırı aşıyor ({max_total_bytes // (1024 * 1024)} MB)")
+                    target.write(chunk)
+            extracted.append((os.path.basename(name), path))
+    return extracted
+
+
+def iter_directory(path: str) -> Iterable[Tuple[str, str]]:
+    """
+    Dizindeki (alt dizinler dahil) PDF/DOCX dosyalarını (ad, yol) olarak döndür; içerikler ancak
+    işlenirken okunur
+    """
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            if is_supported(name):
+                yield name, os.path.join(root, name)
+
+
+@contextmanager
+def open_source(source: Source) -> Iterator[BinaryIO]:
+    """
+    Kaynağı baştan okunacak bir dosya nesnesi olarak aç; yol ise dosya açılır ve kapatılır, dosya
+    nesnesi ise (ör. yüklenen dosya) başa sarılır ve açık bırakılır
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield f
+    elif isinstance(source, bytes):
+        yield io.BytesIO(source)
+    else:
+        source.seek(0)
+        yield source
+
+
+def source_hash(source: Source) -> str:
+    """
+    Kaynağın SHA-256 özetini parça parça hesapla
+    """
+    digest = hashlib.sha256()
+    with open_source(source) as f:
+        while True:
+            chunk = f.read(ZIP_READ_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_source(source: Source) -> Union[str, bytes]:
+    """
+    Metin çıkarma için işçi sürece gönderilecek değer: yollar olduğu gibi gönderilir (dosyayı işçi
+    süreç okur), dosya nesneleri okunur
+    """
+    if isinstance(source, (str, bytes)):
+        return source
+    with open_source(source) as f:
+        return f.read()
+
+
+def extract_document(item: Tuple[str, Union[str, bytes]]) -> Tuple[Optional[Dict], Optional[str], float]:
+    """
+    İşçi süreçte metni (dosya yolundan veya baytlardan) çıkar; ({"text", "truncated"}, hata, süre)
+    döndür. Ölçümler işçi süreçte tutulamayacağı için süre ana sürece döndürülür.
+    """
+    filename, source = item
+    started = time.perf_counter()
+    try:
+        return process_document_info(source, os.path.splitext(filename)[1]), None, time.perf_counter() - started
+    except Exception as e:
+        return None, str(e), time.perf_counter() - started
+
+
+class BulkIngest:
+    def __init__(self, items: List[Tuple[str, Source]], db):
+        """
+        Toplu yükleme: dosya özetiyle yinelenenleri ayıkla, metni çıkarılmış dosyaların hızlı alanlarını
+        tek insert_many ile "processing" durumuyla kaydet ve zenginleştirme kuyruğuna al. NER, özet,
+        gömme ve indeksleme tekli yüklemelerle aynı kuyruk işçilerinde yapılır. Dosyalar (yol veya dosya nesnesi) belleğe alınmaz;
+        özet ve GridFS kaydı için parça parça okunur. Metin çıkarma çağırana bırakılır (CLI'da süreç
+        havuzu, API'de paylaşılan extraction yürütücüsü).
+        """
+        self.items = items
+        self.db = db
+        self.started = time.perf_counter()
+        self.report = [{"filename": filename, "status": "pending"} for filename, _ in items]
+        self.file_hashes: List[str] = []
+        self.requeued = 0
+
+    def _mark_duplicate(self, i: int, existing: Dict):
+        """
+        Dosyayı mevcut adayın yinelenen kopyası olarak işaretle; zenginleştirmesi başarısız olmuş aday
+        yeniden kuyruğa alınır
+        """
+        cv_id = str(existing["_id"])
+        self.report[i].update(status="duplicate", cv_id=cv_id)
+        if existing.get("status") == "failed" and self.db.requeue_failed_enrichment(cv_id):
+            existing["status"] = "processing"
+            self.requeued += 1
+
+    def pending(self) -> List[int]:
+        """
+        Aynı baytlarla daha önce (veya bu toplu işte) yüklenmiş dosyaları işaretle; metni çıkarılacak
+        dosyaların sıralarını döndür
+        """
+        self.file_hashes = [source_hash(source) for _, source in self.items]
+        known = self.db.find_cvs_by_hashes(file_hashes=self.file_hashes)
+        seen: Dict[str, int] = {}
+        pending = []
+        for i, digest in enumerate(self.file_hashes):
+            if digest in known:
+                self._mark_duplicate(i, known[digest])
+            elif digest in seen:
+                self.report[i].update(status="duplicate", duplicate_of=self.items[seen[digest]][0])
+            else:
+                seen[digest] = i
+                pending.append(i)
+        return pending
+
+    def complete(self, extracted: Dict[int, Tuple[Optional[Dict], Optional[str], float]]) -> Dict:
+        """
+        Metni çıkarılmış dosyaları (sıra -> (belge, hata, süre)) kaydedip kuyruğa al; raporu döndür.
+        Sayfa sınırı nedeniyle kısaltılan belgeler raporda truncated ile işaretlenir.
+        """
+        ok = []
+        truncated = set()
+        for i, (document, error, seconds) in extracted.items():
+            STAGE_SECONDS.observe(seconds, stage="document_extraction")
+            if error is not None:
+                STAGE_ERRORS.inc(stage="document_extraction")
+            text = document["text"] if document else None
+            if error is not None or not text or not text.strip():
+                self.report[i].update(status="failed", error=error or "Belgeden metin çıkarılamadı")
+                continue
+            if document["truncated"]:
+                truncated.add(i)
+                self.report[i]["truncated"] = True
+            ok.append((i, text))
+
+        # Farklı baytlarla aynı metni üreten dosyalar da aynı adaydır
+        text_hashes = {i: content_hash(text) for i, text in ok}
+        known = self.db.find_cvs_by_hashes(text_hashes=list(text_hashes.values())) if ok else {}
+        seen: Dict[str, int] = {}
+        unique = []
+        for i, text in ok:
+            digest = text_hashes[i]
+            if digest in known:
+                self._mark_duplicate(i, known[digest])
+            elif digest in seen:
+                self.report[i].update(status="duplicate", duplicate_of=self.items[seen[digest]][0])
+            else:
+                seen[digest] = i
+                unique.append((i, text))
+        ok = unique
+
+        # Yalnızca hızlı alanları çıkar; ağır aşamalar zenginleştirme kuyruğuna bırakılır
+        parsed = {}
+        for i, text in ok:
+            try:
+                parsed[i] = parse_cv_fast(text)
+            except Exception as e:
+                self.report[i].update(status="failed", error=str(e))
+        ok = [(i, text) for i, text in ok if i in parsed]
+
+        if ok:
+            records = []
+            with ExitStack() as files:
+                for i, text in ok:
+                    filename, source = self.items[i]
+                    cv_data = {
+                        **parsed[i].__dict__,
+                        "text": text,
+                        "truncated": i in truncated,
+                        "file_hash": self.file_hashes[i],
+                        "text_hash": text_hashes[i],
+                        "status": "processing",
+                    }
+                    records.append((cv_data, files.enter_context(open_source(source)), filename, None))
+                cv_ids = self.db.store_cvs(records)
+            self.db.enqueue_enrichments([cv_id for cv_id in cv_ids if cv_id is not None])
+            for (i, _), cv_id in zip(ok, cv_ids):
+                # Eşzamanlı bir yükleme aynı CV'yi bu arada kaydettiyse benzersiz indeks kaydı reddeder
+                if cv_id is None:
+                    self.report[i].update(status="duplicate")
+                else:
+                    self.report[i].update(status="stored", cv_id=cv_id)
+
+        elapsed = time.perf_counter() - self.started
+        succeeded = sum(1 for entry in self.report if entry["status"] == "stored")
+        duplicates = sum(1 for entry in self.report if entry["status"] == "duplicate")
+        return {
+            "files": self.report,
+            "total": len(self.items),
+            "succeeded": succeeded,
+            "duplicates": duplicates,
+            "failed": len(self.items) - succeeded - duplicates,
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(len(self.items) / elapsed, 2) if elapsed > 0 else None,
+        }
+
+
+def ingest(items: List[Tuple[str, Source]], db, workers: Optional[int] = None) -> Dict:
+    """
+    Dosyaları toplu olarak işle: yinelenenleri ayıkla, metni süreç havuzunda çıkar, hızlı alanlarla
+    kaydet ve zenginleştirme kuyruğuna al. Dosya bazında durum ve hız raporu döndürür.
+    """
+    batch = BulkIngest(items, db)
+    pending = batch.pending()
+    if workers == 1 or len(pending) <= 1:
+        extracted = [extract_document((items[i][0], read_source(items[i][1]))) for i in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            extracted = list(pool.map(
+                extract_document, [(items[i][0], read_source(items[i][1])) for i in pending], chunksize=4
+            ))
+    return batch.complete(dict(zip(pending, extracted)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bir dizindeki CV'leri toplu olarak yükle")
+    parser.add_argument("directory", help="PDF/DOCX dosyalarını içeren dizin")
+    parser.add_argument("--workers", type=int, default=None, help="Metin çıkarma süreç sayısı")
+    parser.add_argument("--batch-size", type=int, default=64, help="Her turda işlenecek dosya sayısı")
+    args = parser.parse_args()
+
+    from database import Database
+
+    # Adaylar "processing" durumuyla kaydedilir; NER, özet, gömme ve indeksleme API sunucusunun
+    # zenginleştirme işçileri tarafından kuyruktan tamamlanır
+    db = Database()
+    db.ensure_indexes()
+
+    batch: List[Tuple[str, str]] = []
+    totals = {"total": 0, "succeeded": 0, "duplicates": 0, "failed": 0, "elapsed_seconds": 0.0}
+
+    def flush():
+        result = ingest(batch, db, args.workers)
+        for entry in result["files"]:
+            print(json.dumps(entry, ensure_ascii=False))
+        for key in totals:
+            totals[key] += result[key]
+        batch.clear()
+
+    for item in iter_directory(args.directory):
+        batch.append(item)
+        if len(batch) >= args.batch_size:
+            flush()
+    if batch:
+        flush()
+
+    elapsed = totals["elapsed_seconds"]
+    totals["files_per_second"] = round(totals["total"] / elapsed, 2) if elapsed > 0 else None
+    print(json.dumps(totals, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
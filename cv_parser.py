@@ -1,12 +1,40 @@
 from langdetect import detect
-import spacy
+import os
 import re
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, Iterable, List, Optional
 from dataclasses import dataclass
-from transformers import pipeline
+from instrumentation import instrumented, timed
+from keyword_extractor import KeywordMatches, get_extractor
+from summarizer import get_summarizer
 
-# spaCy modelini yükle
-nlp = spacy.load("en_core_web_lg")
+# CV analizi yalnızca varlık tanıma (NER) kullanır; diğer bileşenler yüklenmez
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_lg")
+_UNUSED_SPACY_COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+# Gömme bölümlerinde bir eğitim/deneyim satırından sonra aynı bölüme sayılan en fazla satır
+SECTION_CONTEXT_LINES = int(os.getenv("SECTION_CONTEXT_LINES", "6"))
+NON_ENGLISH_SUMMARY = "Özetleme yalnızca İngilizce CV'ler için kullanılabilir."
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """
+    Kırpılmış spaCy boru hattını ilk kullanımda bir kez yükle
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load(SPACY_MODEL, exclude=_UNUSED_SPACY_COMPONENTS)
+    return _nlp
+
+def parser_version() -> str:
+    """
+    Ayrıştırma sonucunu etkileyen model ve taksonomi sürümleri (önbellek anahtarı için)
+    """
+    return f"{SPACY_MODEL}|{get_summarizer().model_tag}|{get_extractor().version}"
 
 @dataclass
 class CVInfo:
@@ -18,8 +46,10 @@ class CVInfo:
     skills: List[str]  # Beceriler
     summary: str  # Özet
 
-def extract_name(text: str) -> str:
-    email = extract_email(text)
+def _name_near_email(text: str, email: str) -> str:
+    """
+    E-postanın bir üst satırındaki ad-soyadı bul (NER gerektirmez)
+    """
     if email:
         lines = text.splitlines()
         for i, line in enumerate(lines):
@@ -28,12 +58,24 @@ def extract_name(text: str) -> str:
                     name_candidate = lines[i - 1].strip()
                     if 2 <= len(name_candidate.split()) <= 4:  # örn: "Duygu Er"
                         return name_candidate
+    return ""
+
+@instrumented("cv_parser.extract_name")
+def extract_name(text: str, doc=None, email: Optional[str] = None) -> str:
+    if email is None:
+        email = extract_email(text)
+    name = _name_near_email(text, email)
+    if name:
+        return name
     # Fallback: spaCy
-    doc = nlp(text)
+    if doc is None:
+        with timed("cv_parser.ner"):
+            doc = get_nlp()(text)
     for ent in doc.ents:
         if ent.label_ == "PERSON" and "dil" not in ent.text.lower():
             return ent.text
     return ""
+@instrumented("cv_parser.extract_email")
 def extract_email(text: str) -> str:
     text = text.replace("LANGUAGES", "").replace("Languages", "")
 
@@ -41,85 +83,157 @@ def extract_email(text: str) -> str:
     return emails[0] if emails else ""
 
 
+@instrumented("cv_parser.extract_phone")
 def extract_phone(text: str) -> Optional[str]:
     phone_pattern = r'(\+90\s*\d{3}\s*\d{3}\s*\d{4})|(\d{10,11})'
     match = re.search(phone_pattern, text.replace('-', '').replace(' ', ''))
     return match.group(0) if match else None
 
 
-def extract_education(text: str) -> List[Dict]:
-    education = []
-    lines = text.lower().split('\n')
-    keywords = ["üniversite", "university", "fakülte", "bölüm", "yüksekokul", "yüksek lisans", "lisans", "lise"]
-    
-    for line in lines:
-        if any(keyword in line for keyword in keywords):
-            education.append({"institution": line.strip(), "date": ""})
-    return education
+@instrumented("cv_parser.extract_education")
+def extract_education(text: str, matches: Optional[KeywordMatches] = None) -> List[Dict]:
+    if matches is None:
+        matches = get_extractor().extract(text)
+    return [{"institution": matches.lines[i].strip(), "date": ""} for i in matches.line_hits.get("education", [])]
 
 
-def extract_experience(text: str) -> List[Dict]:
-    experience = []
-    lines = text.lower().split('\n')
-    exp_keywords = ["staj", "çalıştı", "intern", "developer", "engineer", "mühendis", "şirket", "firm", "company"]
-    
-    for line in lines:
-        if any(k in line for k in exp_keywords):
-            experience.append({"company": line.strip()})
-    return experience
+@instrumented("cv_parser.extract_experience")
+def extract_experience(text: str, matches: Optional[KeywordMatches] = None) -> List[Dict]:
+    if matches is None:
+        matches = get_extractor().extract(text)
+    return [{"company": matches.lines[i].strip()} for i in matches.line_hits.get("experience", [])]
 
-    
-  
-
-def extract_skills(text: str) -> List[str]:
-    """spaCy ve önceden tanımlanmış beceri kalıpları kullanarak becerileri çıkarma"""
-    skills = []
-    # Yaygın teknik beceri kalıpları
-    skill_patterns = [
-        r'(?i)(python|java|javascript|react|node\.js|docker|kubernetes|aws|azure|gcp)',
-        r'(?i)(machine learning|ai|artificial intelligence|data science|big data|yapay zeka|veri bilimi)',
-        r'(?i)(sql|nosql|mongodb|postgresql|mysql)',
-        r'(?i)(agile|scrum|devops|ci/cd)'
-    ]
-    
-    for pattern in skill_patterns:
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            skills.append(match.group(0).lower())
-    
-    return list(set(skills))
 
+@instrumented("cv_parser.extract_skills")
+def extract_skills(text: str, matches: Optional[KeywordMatches] = None) -> List[str]:
+    """Taksonomideki becerileri (TAXONOMY_PATH) derlenmiş tek otomatla çıkarma"""
+    if matches is None:
+        matches = get_extractor().extract(text)
+    return matches.terms.get("skills", [])
+
+@instrumented("cv_parser.split_sections")
+def split_sections(text: str, summary: Optional[str] = None, matches: Optional[KeywordMatches] = None) -> Dict[str, str]:
+    """
+    CV'yi ayrı gömülecek bölümlere ayır: deneyim ve eğitim (anahtar kelime geçen satırlar ve
+    ardından gelen en fazla SECTION_CONTEXT_LINES satır), beceriler (beceri geçen satırlar) ve özet.
+    Boş bölümler döndürülmez.
+    """
+    if matches is None:
+        matches = get_extractor().extract(text)
+    lines = text.split("\n")
+    owner: Dict[int, str] = {}
+    for category in ("education", "experience"):
+        for i in matches.line_hits.get(category, []):
+            owner.setdefault(i, category)
+
+    blocks: Dict[str, List[str]] = {"experience": [], "education": []}
+    current, remaining = None, 0
+    for i, line in enumerate(lines):
+        if i in owner:
+            current, remaining = owner[i], SECTION_CONTEXT_LINES
+        elif remaining:
+            remaining -= 1
+        else:
+            current = None
+        if current and line.strip():
+            blocks[current].append(line.strip())
+
+    sections = {name: "\n".join(block) for name, block in blocks.items() if block}
+    skill_lines = [lines[i].strip() for i in matches.line_hits.get("skills", [])]
+    if skill_lines:
+        sections["skills"] = "\n".join(skill_lines)
+    if summary and summary != NON_ENGLISH_SUMMARY:
+        sections["summary"] = summary
+    return sections
+
+@instrumented("cv_parser.generate_summary")
 def generate_summary(text: str) -> str:
     if not isinstance(text, str):
         text = text.decode("utf-8", errors="ignore")
 
     if detect(text) != "en":
-        return "Özetleme yalnızca İngilizce CV'ler için kullanılabilir."
-
-    summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-    max_chunk_length = 1024
-    chunks = [text[i:i + max_chunk_length] for i in range(0, len(text), max_chunk_length)]
-
-    summaries = []
-    for chunk in chunks:
-        summary = summarizer(chunk, max_length=130, min_length=30, do_sample=False)
-        summaries.append(summary[0]['summary_text'])
-
-    return " ".join(summaries)
+        return NON_ENGLISH_SUMMARY
+
+    # Paylaşılan özetleyici parçaları token sınırlarında böler ve tek çağrıda toplu özetler
+    return get_summarizer().summarize(text)
+
+
+@instrumented("cv_parser.generate_summaries")
+def generate_summaries(texts: List[str]) -> List[str]:
+    """Birden çok CV'nin tüm parçalarını tek bir toplu özetleme çağrısında özetle"""
+    summarizer = get_summarizer()
+    summaries = [NON_ENGLISH_SUMMARY] * len(texts)
+    chunked = []
+    for i, text in enumerate(texts):
+        try:
+            is_english = detect(text) == "en"
+        except Exception:
+            is_english = False
+        if is_english:
+            chunked.append((i, summarizer.chunk(text)))
+    outputs = summarizer.summarize_chunks([chunk for _, chunks in chunked for chunk in chunks])
+    position = 0
+    for i, chunks in chunked:
+        summaries[i] = " ".join(outputs[position:position + len(chunks)])
+        position += len(chunks)
+    return summaries
+
+
+def parse_cv(text: str, doc=None, summary: Optional[str] = None) -> CVInfo:
+    """
+    CV'yi ayrıştırıp tüm bilgileri çıkaran ana fonksiyon. NER yalnızca ad e-postanın yanında
+    bulunamazsa çalıştırılır (verilen doc varsa o kullanılır).
+    """
+    if summary is None:
+        summary = generate_summary(text)
+    # Anahtar kelimeler tek geçişte çıkarılır, e-posta bir kez aranır ve çıkarıcılar arasında paylaşılır
+    matches = get_extractor().extract(text)
+    email = extract_email(text)
+    return CVInfo(
+        name=extract_name(text, doc, email),
+        email=email,
+        phone=extract_phone(text),
+        education=extract_education(text, matches),
+        experience=extract_experience(text, matches),
+        skills=extract_skills(text, matches),
+        summary=summary
+    )
 
 
-def parse_cv(text: str) -> CVInfo:
-    """CV'yi ayrıştırıp tüm bilgileri çıkaran ana fonksiyon"""
+@instrumented("cv_parser.parse_cv_fast")
+def parse_cv_fast(text: str) -> CVInfo:
+    """
+    Yalnızca regex ve anahtar kelime alanlarını milisaniyeler içinde çıkar (NER ve özet yok);
+    ertelenmiş zenginleştirme tamamlanınca parse_cv sonucu bu alanların yerini alır
+    """
+    matches = get_extractor().extract(text)
+    email = extract_email(text)
     return CVInfo(
-        name=extract_name(text),
-        email=extract_email(text),
+        name=_name_near_email(text, email),
+        email=email,
         phone=extract_phone(text),
-        education=extract_education(text),
-        experience=extract_experience(text),
-        skills=extract_skills(text),
-        summary=generate_summary(text)
+        education=extract_education(text, matches),
+        experience=extract_experience(text, matches),
+        skills=extract_skills(text, matches),
+        summary=""
     )
 
+
+def parse_cvs(texts: Iterable[str], n_process: int = 1, batch_size: int = 32) -> List[CVInfo]:
+    """
+    Birden çok CV'yi toplu özetleme ile ayrıştır; adı e-postanın yanında bulunamayan CV'ler tek
+    bir nlp.pipe çağrısıyla NER'den geçirilir
+    """
+    texts = list(texts)
+    summaries = generate_summaries(texts)
+    needs_ner = [i for i, text in enumerate(texts) if not _name_near_email(text, extract_email(text))]
+    docs: Dict[int, object] = {}
+    if needs_ner:
+        docs = dict(zip(needs_ner, get_nlp().pipe(
+            [texts[i] for i in needs_ner], n_process=n_process, batch_size=batch_size
+        )))
+    return [parse_cv(text, docs.get(i), summary) for i, (text, summary) in enumerate(zip(texts, summaries))]
+
 if __name__ == "__main__":
     example_cv = """
     Duygu Er
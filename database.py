@@ -1,13 +1,54 @@
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 from gridfs import GridFS
-from typing import Dict, List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+import base64
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+import logging
 import os
 from dotenv import load_dotenv
 
+from instrumentation import instrument_methods
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Benzersiz indeks oluşturulurken mevcut yinelenen kayıtlar için MongoDB hata kodu
+DUPLICATE_KEY_ERROR = 11000
+
+def _object_id(value):
+    """
+    Metin kimliği ObjectId'ye çevir; geçersizse olduğu gibi bırak
+    """
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return value
+
+def _encode_cursor(match: Dict) -> str:
+    """
+    Sayfanın son eşleşmesinden (yüzde, kimlik) sonraki sayfa imlecini üret
+    """
+    raw = json.dumps([match["match_percentage"], str(match["_id"])])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str) -> Tuple[float, ObjectId]:
+    """
+    Sayfa imlecini çöz; geçersizse ValueError fırlat
+    """
+    try:
+        match_percentage, match_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(match_percentage), ObjectId(match_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError("Geçersiz sayfa imleci") from e
+
+@instrument_methods("database")
 class Database:
     def __init__(self):
         """
@@ -21,35 +62,237 @@ class Database:
         self.candidates = self.db.candidates
         self.job_postings = self.db.job_postings
         self.matches = self.db.matches
+        self.notifications = self.db.notifications
+        self.enrichment_jobs = self.db.enrichment_jobs
+
+    def ensure_indexes(self):
+        """
+        Sorguların kullandığı indeksleri oluştur (zaten varsa işlem yapılmaz)
+        """
+        # Eşleşmeler: iş/aday çifti başına tek kayıt ve yüzdeye göre sayfalama
+        self._ensure_unique_matches()
+        self.matches.create_index([("job_id", ASCENDING), ("match_percentage", DESCENDING), ("_id", DESCENDING)])
+        self.matches.create_index("candidate_id")
+        # Adaylar: tekrar yüklenen CV'leri bulma ve eski gömmeleri yenileme
+        for field in ("file_hash", "text_hash"):
+            self._ensure_unique_hash(field)
+        self.candidates.create_index("embedding.model")
+        # İlanlar: oluşturulma sırasına göre listeleme
+        self.job_postings.create_index([("created_at", DESCENDING)])
+        # Bildirimler: iş/aday çifti başına tek kayıt, kirası dolmuş bekleyen bildirimleri bulma
+        self.notifications.create_index([("job_id", ASCENDING), ("candidate_id", ASCENDING)], unique=True)
+        self.notifications.create_index([("status", ASCENDING), ("lease_until", ASCENDING)])
+        # Zenginleştirme kuyruğu: aday başına tek iş, zamanı gelen işleri sırayla alma
+        self.enrichment_jobs.create_index("candidate_id", unique=True)
+        self.enrichment_jobs.create_index([("status", ASCENDING), ("available_at", ASCENDING)])
         
-    def store_cv(self, cv_data: Dict, file_content: bytes, filename: str) -> str:
+    def _ensure_unique_matches(self):
         """
-        CV dosyasını GridFS'e ve meta verileri candidates koleksiyonuna kaydet
+        İş/aday çifti için benzersiz indeksi oluştur. Önceki sürümler aynı çifti birden çok kez yazabildiğinden
+        indeks yinelenen kayıtlar yüzünden oluşturulamazsa her çiftin en yeni kaydı bırakılıp indeks yeniden denenir.
         """
-        # Dosyayı GridFS'e kaydet
-        file_id = self.fs.put(
+        keys = [("job_id", ASCENDING), ("candidate_id", ASCENDING)]
+        try:
+            self.matches.create_index(keys, unique=True)
+        except OperationFailure as e:
+            if e.code != DUPLICATE_KEY_ERROR:
+                raise
+            removed = self.dedupe_matches()
+            logger.warning("Yinelenen %d eşleşme kaydı silindi (her iş/aday çiftinin en yeni kaydı bırakıldı)", removed)
+            self.matches.create_index(keys, unique=True)
+
+    def _ensure_unique_hash(self, field: str):
+        """
+        Özet alanı için (alanı olan belgelerle sınırlı) benzersiz indeks oluştur; eşzamanlı yüklemelerde aynı
+        CV'nin iki kez kaydedilmesini veritabanı engeller. Önceki sürümün benzersiz olmayan indeksi kaldırılır.
+        Mevcut yinelenen adaylar varsa aramalar için benzersiz olmayan indekse dönülür ve çözüm günlüğe yazılır.
+        """
+        name = f"{field}_1"
+        existing = self.candidates.index_information().get(name)
+        if existing is not None and not existing.get("unique"):
+            self.candidates.drop_index(name)
+        try:
+            self.candidates.create_index(field, unique=True, partialFilterExpression={field: {"$exists": True}})
+        except OperationFailure as e:
+            if e.code != DUPLICATE_KEY_ERROR:
+                raise
+            logger.error(
+                "candidates.%s için benzersiz indeks oluşturulamadı: aynı özete sahip birden çok aday var. "
+                "Yinelenen adayları birleştirip/silip (ör. db.candidates.aggregate([{$group: {_id: '$%s', "
+                "n: {$sum: 1}}}, {$match: {n: {$gt: 1}}}])) uygulamayı yeniden başlatın; o zamana kadar "
+                "eşzamanlı yüklemeler aynı CV'yi iki kez kaydedebilir",
+                field, field,
+            )
+            self.candidates.create_index(field, sparse=True)
+
+    def dedupe_matches(self) -> int:
+        """
+        Aynı iş/aday çiftine ait birden çok eşleşme kaydından en yenisi (updated_at, created_at, _id sırasıyla)
+        dışındakileri sil; silinen kayıt sayısını döndür
+        """
+        duplicates = self.matches.aggregate([
+            {"$sort": {"updated_at": DESCENDING, "created_at": DESCENDING, "_id": DESCENDING}},
+            {"$group": {
+                "_id": {"job_id": "$job_id", "candidate_id": "$candidate_id"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1},
+            }},
+            {"$match": {"count": {"$gt": 1}}},
+        ], allowDiskUse=True)
+        removed = 0
+        for group in duplicates:
+            removed += self.matches.delete_many({"_id": {"$in": group["ids"][1:]}}).deleted_count
+        return removed
+
+    def _put_file(self, file_content: Union[bytes, BinaryIO], filename: str):
+        """
+        Dosyayı GridFS'e kaydet ve dosya kimliğini döndür; dosya nesnesi verilirse
+        GridFS onu parça boyutunda okuyarak yazar (tamamı belleğe alınmaz)
+        """
+        return self.fs.put(
             file_content,
             filename=filename,
             content_type="application/pdf" if filename.endswith(".pdf") else "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
         )
-        
-        # Meta verileri kaydet
-        cv_data["file_id"] = file_id
+
+    def _prepare_cv(self, cv_data: Dict, file_content: Union[bytes, BinaryIO], filename: str, embedding: Optional[Dict]) -> Dict:
+        # Dosyayı GridFS'e kaydet
+        cv_data["file_id"] = self._put_file(file_content, filename)
+        if embedding is not None:
+            cv_data["embedding"] = embedding
         cv_data["created_at"] = datetime.utcnow()
-        result = self.candidates.insert_one(cv_data)
-        
-        return str(result.inserted_id)
+        return cv_data
+
+    def store_cv(self, cv_data: Dict, file_content: Union[bytes, BinaryIO], filename: str, embedding: Optional[Dict] = None) -> str:
+        """
+        CV dosyasını GridFS'e, meta verileri ve gömme kaydını candidates koleksiyonuna kaydet.
+        Aynı dosya/metin özetine sahip aday zaten varsa dosya geri silinir ve DuplicateKeyError fırlatılır.
+        """
+        document = self._prepare_cv(cv_data, file_content, filename, embedding)
+        try:
+            return str(self.candidates.insert_one(document).inserted_id)
+        except DuplicateKeyError:
+            self.fs.delete(document["file_id"])
+            raise
+
+    def store_cvs(self, records: List[Tuple[Dict, Union[bytes, BinaryIO], str, Optional[Dict]]]) -> List[Optional[str]]:
+        """
+        Birden çok CV'yi kaydet; meta veriler tek bir insert_many ile yazılır. Aynı özete sahip aday zaten
+        bulunduğu için yazılamayan kayıtların yerinde None döner (dosyaları geri silinir).
+        """
+        if not records:
+            return []
+        documents = [self._prepare_cv(*record) for record in records]
+
+        # Meta verileri kaydet; sırasız yazımda yinelenenler dışındaki kayıtlar yine de eklenir
+        try:
+            self.candidates.insert_many(documents, ordered=False)
+            rejected = set()
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+            rejected = {error["index"] for error in errors}
+            for i in rejected:
+                self.fs.delete(documents[i]["file_id"])
+        return [None if i in rejected else str(document["_id"]) for i, document in enumerate(documents)]
     
     def get_cv(self, cv_id: str) -> Optional[Dict]:
         """
         CV meta verilerini ve dosya içeriğini al
         """
-        cv_data = self.candidates.find_one({"_id": cv_id})
+        cv_data = self.candidates.find_one({"_id": _object_id(cv_id)})
         if cv_data and "file_id" in cv_data:
             file_data = self.fs.get(cv_data["file_id"])
             cv_data["file_content"] = file_data.read()
             return cv_data
         return None
+
+    # Meta veri okumalarında taşınmayacak büyük alanlar
+    LARGE_FIELDS = ("text", "embedding")
+
+    def get_cv_metadata(self, cv_id: str) -> Optional[Dict]:
+        """
+        CV meta verilerini dosya içeriği, metin ve gömme olmadan al
+        """
+        return self.candidates.find_one(
+            {"_id": _object_id(cv_id)},
+            {field: 0 for field in self.LARGE_FIELDS}
+        )
+
+    def get_cv_fields(self, cv_id: str, fields: List[str]) -> Optional[Dict]:
+        """
+        CV belgesinden yalnızca istenen alanları al
+        """
+        return self.candidates.find_one({"_id": _object_id(cv_id)}, {field: 1 for field in fields})
+
+    def get_cvs(self, cv_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Birden çok CV'yi tek bir $in sorgusuyla al; sonuç aday kimliğine göre eşlenir
+        """
+        if not cv_ids:
+            return {}
+        projection = {field: 1 for field in fields} if fields else {field: 0 for field in self.LARGE_FIELDS}
+        cursor = self.candidates.find(
+            {"_id": {"$in": [_object_id(cv_id) for cv_id in cv_ids]}},
+            projection
+        )
+        return {str(cv_data["_id"]): cv_data for cv_data in cursor}
+
+    def find_cv_by_hash(self, file_hash: Optional[str] = None, text_hash: Optional[str] = None) -> Optional[Dict]:
+        """
+        Aynı dosya baytlarına veya aynı çıkarılmış metne sahip mevcut CV'yi (büyük alanlar olmadan) bul
+        """
+        conditions = []
+        if file_hash:
+            conditions.append({"file_hash": file_hash})
+        if text_hash:
+            conditions.append({"text_hash": text_hash})
+        if not conditions:
+            return None
+        return self.candidates.find_one({"$or": conditions}, {field: 0 for field in self.LARGE_FIELDS})
+
+    def find_cvs_by_hashes(self, file_hashes: Optional[List[str]] = None, text_hashes: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Toplu yükleme için find_cv_by_hash: verilen dosya/metin özetlerinden kayıtlı olanları tek sorguyla bul.
+        Sonuç özet -> aday (_id, status) eşlemesidir.
+        """
+        conditions = []
+        if file_hashes:
+            conditions.append({"file_hash": {"$in": list(file_hashes)}})
+        if text_hashes:
+            conditions.append({"text_hash": {"$in": list(text_hashes)}})
+        if not conditions:
+            return {}
+        found: Dict[str, Dict] = {}
+        wanted = {"file_hash": set(file_hashes or ()), "text_hash": set(text_hashes or ())}
+        for cv_data in self.candidates.find({"$or": conditions}, {"file_hash": 1, "text_hash": 1, "status": 1}):
+            for field, digests in wanted.items():
+                if cv_data.get(field) in digests:
+                    found[cv_data[field]] = cv_data
+        return found
+
+    def open_cv_file(self, cv_id: str):
+        """
+        CV dosyası için tembel, parça parça okunabilen GridFS tutamacını döndür
+        """
+        cv_data = self.get_cv_fields(cv_id, ["file_id"])
+        if cv_data and "file_id" in cv_data:
+            return self.fs.get(cv_data["file_id"])
+        return None
+
+    def delete_cv(self, cv_id: str) -> bool:
+        """
+        CV'yi, GridFS dosyasını ve ilgili eşleşmeleri sil
+        """
+        cv_data = self.candidates.find_one_and_delete({"_id": _object_id(cv_id)})
+        if not cv_data:
+            return False
+        if "file_id" in cv_data:
+            self.fs.delete(cv_data["file_id"])
+        self.matches.delete_many({"candidate_id": str(cv_id)})
+        self.delete_enrichment(cv_id)
+        return True
     
     def store_job_posting(self, job_data: Dict) -> str:
         """
@@ -63,25 +306,150 @@ class Database:
         """
         İş ilanını veritabanından al
         """
-        return self.job_postings.find_one({"_id": job_id})
+        return self.job_postings.find_one({"_id": _object_id(job_id)})
     
+    def get_job_postings(self, job_ids: List[str]) -> List[Dict]:
+        """
+        Birden çok iş ilanını tek bir $in sorgusuyla al
+        """
+        if not job_ids:
+            return []
+        return list(self.job_postings.find({"_id": {"$in": [_object_id(job_id) for job_id in job_ids]}}))
+
+    def update_job_posting(self, job_id: str, job_data: Dict) -> bool:
+        """
+        İş ilanının içeriğini güncelle; yeni gömme verilmezse eskisi geçersiz kılınır (silinir)
+        """
+        update = {"$set": {**job_data, "updated_at": datetime.utcnow()}}
+        if "embedding" not in job_data:
+            update["$unset"] = {"embedding": ""}
+        result = self.job_postings.update_one({"_id": _object_id(job_id)}, update)
+        return result.matched_count > 0
+
+    def update_job_embeddings(self, embeddings: Dict[str, Dict]):
+        """
+        Yeniden hesaplanan ilan gömmelerini kaydet
+        """
+        for job_id, embedding in embeddings.items():
+            self.job_postings.update_one({"_id": _object_id(job_id)}, {"$set": {"embedding": embedding}})
+
     def store_match(self, job_id: str, candidate_id: str, match_data: Dict) -> str:
         """
-        Eşleşme sonucunu veritabanına kaydet
+        Eşleşme sonucunu kaydet (iş/aday çifti zaten varsa güncellenir); çağıranın sözlüğü değiştirilmez
         """
-        match_data.update({
-            "job_id": job_id,
-            "candidate_id": candidate_id,
-            "created_at": datetime.utcnow()
-        })
-        result = self.matches.insert_one(match_data)
-        return str(result.inserted_id)
+        now = datetime.utcnow()
+        result = self.matches.find_one_and_update(
+            {"job_id": job_id, "candidate_id": candidate_id},
+            {
+                "$set": {**match_data, "job_id": job_id, "candidate_id": candidate_id, "updated_at": now},
+                "$setOnInsert": {"created_at": now},
+            },
+            projection={"_id": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return str(result["_id"])
+
+    def store_matches(self, job_id: str, matches: List[Dict]) -> int:
+        """
+        Bir ilanın eşleşmelerini tek bir bulk_write ile upsert et; yazılan kayıt sayısını döndür
+        """
+        if not matches:
+            return 0
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"job_id": job_id, "candidate_id": match["candidate_id"]},
+                {
+                    "$set": {**match, "job_id": job_id, "updated_at": now},
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True
+            )
+            for match in matches
+        ]
+        result = self.matches.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
     
-    def get_matches_for_job(self, job_id: str) -> List[Dict]:
+    def claim_notification(self, job_id: str, candidate_id: str, match_data: Dict, lease_seconds: float) -> bool:
         """
-        Bir iş ilanı için tüm eşleşmeleri al
+        İş/aday çifti için bildirimi "pending" olarak kaydedip kiralayarak al. Çift zaten gönderilmiş,
+        başarısız olmuş ya da kirası süren bir bekleyen kayda sahipse False döner (durum alanı olmayan
+        eski kayıtlar gönderilmiş sayılır).
         """
-        return list(self.matches.find({"job_id": job_id}).sort("match_percentage", -1))
+        now = datetime.utcnow()
+        try:
+            self.notifications.update_one(
+                {"job_id": job_id, "candidate_id": candidate_id, "status": "pending", "lease_until": {"$lt": now}},
+                {
+                    "$set": {
+                        "match_data": match_data,
+                        "lease_until": now + timedelta(seconds=lease_seconds),
+                        "updated_at": now,
+                    },
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def claim_stale_notifications(self, lease_seconds: float, limit: int = 100) -> List[Dict]:
+        """
+        Kirası dolmuş bekleyen bildirimleri (ör. gönderilmeden çöken bir süreçte kalanlar) yeniden kirala
+        """
+        now = datetime.utcnow()
+        claimed = []
+        while len(claimed) < limit:
+            notification = self.notifications.find_one_and_update(
+                {"status": "pending", "lease_until": {"$lt": now}},
+                {"$set": {"lease_until": now + timedelta(seconds=lease_seconds), "updated_at": now}},
+                return_document=ReturnDocument.AFTER
+            )
+            if notification is None:
+                break
+            claimed.append(notification)
+        return claimed
+
+    def complete_notification(self, job_id: str, candidate_id: str):
+        """
+        Bildirimi gönderildi olarak işaretle
+        """
+        now = datetime.utcnow()
+        self.notifications.update_one(
+            {"job_id": job_id, "candidate_id": candidate_id},
+            {"$set": {"status": "sent", "sent_at": now, "updated_at": now}, "$unset": {"lease_until": ""}}
+        )
+
+    def fail_notification(self, job_id: str, candidate_id: str, error: str):
+        """
+        Deneme hakkı biten bildirimi başarısız olarak işaretle (yeniden kuyruklanmaz)
+        """
+        self.notifications.update_one(
+            {"job_id": job_id, "candidate_id": candidate_id},
+            {"$set": {"status": "failed", "error": error, "updated_at": datetime.utcnow()}, "$unset": {"lease_until": ""}}
+        )
+    
+    def get_matches_for_job(self, job_id: str, limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Bir iş ilanının eşleşmelerini yüzdeye göre azalan sırada, imleçle (keyset) sayfalayarak al.
+        (eşleşmeler, sonraki sayfa imleci) döndürür; son sayfada imleç None olur.
+        """
+        query: Dict = {"job_id": job_id}
+        if cursor:
+            match_percentage, match_id = _decode_cursor(cursor)
+            query["$or"] = [
+                {"match_percentage": {"$lt": match_percentage}},
+                {"match_percentage": match_percentage, "_id": {"$lt": match_id}},
+            ]
+        matches = list(
+            self.matches.find(query)
+            .sort([("match_percentage", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
+        )
+        next_cursor = _encode_cursor(matches[limit - 1]) if len(matches) > limit else None
+        return matches[:limit], next_cursor
     
     def get_all_candidates(self) -> List[Dict]:
         """
@@ -89,6 +457,178 @@ class Database:
         """
         return list(self.candidates.find())
     
+    def iter_candidates(self, fields: List[str], batch_size: int = 1000, query: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Adayları belleğe toplamadan, yalnızca istenen alanlarla imleç üzerinden parça parça dolaş
+        """
+        cursor = self.candidates.find(query or {}, {field: 1 for field in fields}).batch_size(batch_size)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def iter_candidate_ids(self, model_name: str) -> Iterator[str]:
+        """
+        Gömmesi verilen modelle üretilmiş (indekste bulunması gereken) adayların kimlikleri
+        """
+        for candidate in self.iter_candidates(["_id"], query={"embedding.model": model_name}):
+            yield str(candidate["_id"])
+
+    def update_embedding(self, cv_id: str, embedding: Dict) -> bool:
+        """
+        Adayın gömme kaydını güncelle
+        """
+        result = self.candidates.update_one(
+            {"_id": _object_id(cv_id)},
+            {"$set": {"embedding": embedding}}
+        )
+        return result.matched_count > 0
+
+    def get_candidates_with_stale_embeddings(
+        self, model_name: str, limit: int = 0, require_sections: bool = False, exclude: Optional[List] = None
+    ) -> List[Dict]:
+        """
+        Gömmesi olmayan ya da başka bir modelle üretilmiş adayları al; require_sections ile
+        bölüm gömmeleri henüz hesaplanmamış adaylar da dahil edilir. exclude'daki adaylar (ör. bu
+        turda kodlanamayanlar) atlanır.
+        """
+        stale: Dict = {"embedding.model": {"$ne": model_name}}
+        if require_sections:
+            stale = {"$or": [stale, {"embedding.sections": {"$exists": False}}]}
+        # Zenginleştirmesi süren veya başarısız olan adayların gömmesi kuyruk işçisine bırakılır
+        cursor = self.candidates.find(
+            {
+                **stale,
+                "text": {"$exists": True},
+                "status": {"$nin": ["processing", "failed"]},
+                **({"_id": {"$nin": exclude}} if exclude else {}),
+            },
+            {"text": 1, "skills": 1, "summary": 1}
+        )
+        return list(cursor.limit(limit))
+
+    def enqueue_enrichment(self, cv_id: str):
+        """
+        Aday için ertelenmiş zenginleştirme işini kalıcı kuyruğa ekle (zaten varsa yeniden beklemeye alınır)
+        """
+        self.enqueue_enrichments([cv_id])
+
+    def enqueue_enrichments(self, cv_ids: List[str]):
+        """
+        Birden çok adayın zenginleştirme işini tek bir bulk_write ile kuyruğa ekle
+        """
+        if not cv_ids:
+            return
+        now = datetime.utcnow()
+        self.enrichment_jobs.bulk_write([
+            UpdateOne(
+                {"candidate_id": str(cv_id)},
+                {
+                    "$set": {"status": "pending", "available_at": now, "attempts": 0, "error": None, "updated_at": now},
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True
+            )
+            for cv_id in cv_ids
+        ], ordered=False)
+
+    def claim_enrichment(self, lease_seconds: float, cv_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Zamanı gelmiş bir bekleyen işi (ya da kirası dolmuş, çökmüş bir işçide kalmış işi) kiralayarak al.
+        cv_id verilirse yalnızca o adayın işi alınır; alınacak iş yoksa None döner.
+        """
+        now = datetime.utcnow()
+        query: Dict = {
+            "$or": [
+                {"status": "pending", "available_at": {"$lte": now}},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]
+        }
+        if cv_id is not None:
+            query["candidate_id"] = str(cv_id)
+        return self.enrichment_jobs.find_one_and_update(
+            query,
+            {
+                "$set": {"status": "running", "lease_until": now + timedelta(seconds=lease_seconds), "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def complete_enrichment(self, cv_id: str, cv_data: Dict, embedding: Dict) -> bool:
+        """
+        Zenginleştirilmiş alanları ve gömmeyi adaya yaz, adayı hazır işaretle ve kuyruk işini sil.
+        Aday bu sırada silinmişse False döner.
+        """
+        result = self.candidates.update_one(
+            {"_id": _object_id(cv_id)},
+            {
+                "$set": {**cv_data, "embedding": embedding, "status": "ready", "enriched_at": datetime.utcnow()},
+                "$unset": {"enrichment_error": ""},
+            }
+        )
+        self.delete_enrichment(cv_id)
+        return result.matched_count > 0
+
+    def delete_enrichment(self, cv_id: str):
+        self.enrichment_jobs.delete_one({"candidate_id": str(cv_id)})
+
+    def retry_enrichment(self, cv_id: str, error: str, delay_seconds: float):
+        """
+        Başarısız işi gecikmeyle yeniden beklemeye al
+        """
+        now = datetime.utcnow()
+        self.enrichment_jobs.update_one(
+            {"candidate_id": str(cv_id)},
+            {"$set": {
+                "status": "pending",
+                "available_at": now + timedelta(seconds=delay_seconds),
+                "error": error,
+                "updated_at": now,
+            }}
+        )
+
+    def fail_enrichment(self, cv_id: str, error: str):
+        """
+        Deneme hakkı biten işi ve adayı başarısız olarak işaretle
+        """
+        now = datetime.utcnow()
+        self.enrichment_jobs.update_one(
+            {"candidate_id": str(cv_id)},
+            {"$set": {"status": "failed", "error": error, "updated_at": now}}
+        )
+        self.candidates.update_one(
+            {"_id": _object_id(cv_id)},
+            {"$set": {"status": "failed", "enrichment_error": error}}
+        )
+
+    def requeue_failed_enrichment(self, cv_id: str) -> bool:
+        """
+        Zenginleştirmesi başarısız olmuş adayı yeniden "processing" durumuna alıp işini kuyruğa ekle
+        (ör. aynı CV yeniden yüklendiğinde). Aday başarısız durumda değilse False döner.
+        """
+        result = self.candidates.update_one(
+            {"_id": _object_id(cv_id), "status": "failed"},
+            {"$set": {"status": "processing"}, "$unset": {"enrichment_error": ""}}
+        )
+        if not result.modified_count:
+            return False
+        self.enqueue_enrichment(cv_id)
+        return True
+
+    def get_enrichment_job(self, cv_id: str) -> Optional[Dict]:
+        return self.enrichment_jobs.find_one({"candidate_id": str(cv_id)}, {"_id": 0})
+
+    def count_enrichment_jobs(self) -> Dict[str, int]:
+        """
+        Kuyruktaki işlerin duruma göre sayıları
+        """
+        counts = {"pending": 0, "running": 0, "failed": 0}
+        for row in self.enrichment_jobs.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return counts
+    
     def get_all_job_postings(self) -> List[Dict]:
         """
         Tüm iş ilanlarını al
@@ -100,7 +640,7 @@ class Database:
         İş ilanı için eşleştirme parametrelerini güncelle
         """
         result = self.job_postings.update_one(
-            {"_id": job_id},
+            {"_id": _object_id(job_id)},
             {"$set": {"matching_parameters": parameters}}
         )
         return result.modified_count > 0 
\ No newline at end of file
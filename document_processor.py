@@ -1,47 +1,224 @@
-from typing import Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import PyPDF2
 from docx import Document
+import functools
 import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_text_from_pdf(file_content: bytes) -> str:
+# PDF arka ucu: auto (pypdfium2 kuruluysa o, değilse PyPDF2), pypdfium2, pdfplumber veya pypdf2
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto")
+# Patolojik dosyalara karşı sınırlar: bayt sınırını aşan dosya reddedilir, fazla sayfalar atlanır
+PDF_MAX_BYTES = int(float(os.getenv("PDF_MAX_MB", "20")) * 1024 * 1024)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "200"))
+# Bu sayıdan uzun belgelerin sayfaları süreç havuzunda paralel çıkarılır (0: kapalı). Çıkarma zaten
+# bir işçi süreçte çalışıyorsa (API'nin extraction yürütücüsü, toplu yükleme havuzu) iç içe havuz açılmaz.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+logger = logging.getLogger(__name__)
+
+# Belge kaynağı: bellekteki baytlar ya da diske biriktirilmiş dosyanın yolu
+Source = Union[bytes, str]
+
+
+class DocumentTooLargeError(ValueError):
+    """
+    Belge yapılandırılmış bayt sınırını aştığında fırlatılır
+    """
+
+
+def _open(source: Source):
+    """
+    Yol olduğu gibi kullanılır; baytlar dosya benzeri nesneye sarılır
+    """
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _source_size(source: Source) -> int:
+    return len(source) if isinstance(source, bytes) else os.path.getsize(source)
+
+
+def _pypdf2_page_count(source: Source) -> int:
+    return len(PyPDF2.PdfReader(_open(source)).pages)
+
+
+def _pypdf2_pages(source: Source, start: int, end: int) -> List[str]:
+    reader = PyPDF2.PdfReader(_open(source))
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def _pdfplumber_page_count(source: Source) -> int:
+    import pdfplumber
+    with pdfplumber.open(_open(source)) as pdf:
+        return len(pdf.pages)
+
+
+def _pdfplumber_pages(source: Source, start: int, end: int) -> List[str]:
+    import pdfplumber
+    with pdfplumber.open(_open(source)) as pdf:
+        pages = []
+        for i in range(start, end):
+            page = pdf.pages[i]
+            pages.append(page.extract_text() or "")
+            # pdfplumber sayfa nesnelerini önbelleğe alır; uzun belgelerde belleği serbest bırak
+            page.close()
+        return pages
+
+
+def _pypdfium2_page_count(source: Source) -> int:
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(source)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _pypdfium2_pages(source: Source, start: int, end: int) -> List[str]:
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(source)
+    try:
+        pages = []
+        for i in range(start, end):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            # pdfium satır sonlarını \r\n olarak döndürür
+            pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+        return pages
+    finally:
+        pdf.close()
+
+
+# Arka uç adı -> (sayfa sayısı, sayfa aralığı metinleri)
+PDF_BACKENDS: Dict[str, Tuple[Callable[[Source], int], Callable[[Source, int, int], List[str]]]] = {
+    "pypdf2": (_pypdf2_page_count, _pypdf2_pages),
+    "pdfplumber": (_pdfplumber_page_count, _pdfplumber_pages),
+    "pypdfium2": (_pypdfium2_page_count, _pypdfium2_pages),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def available_pdf_backends() -> Tuple[str, ...]:
+    """
+    Bu ortamda kurulu olan PDF arka uçları (bir kez denetlenir)
+    """
+    available = []
+    for name, module in (("pypdfium2", "pypdfium2"), ("pdfplumber", "pdfplumber"), ("pypdf2", "PyPDF2")):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        available.append(name)
+    return tuple(available)
+
+
+def resolve_pdf_backend(backend: Optional[str] = None) -> str:
+    """
+    İstenen arka ucu (veya "auto" için kurulu en hızlısını) döndür
+    """
+    backend = (backend or PDF_BACKEND).lower()
+    if backend == "auto":
+        return "pypdfium2" if "pypdfium2" in available_pdf_backends() else "pypdf2"
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"Bilinmeyen PDF arka ucu: {backend}")
+    return backend
+
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+
+def _get_page_pool() -> ProcessPoolExecutor:
     """
-    PDF dosyasından metin çıkarma
+    Uzun belgelerin sayfa aralıkları için paylaşılan süreç havuzu
     """
+    global _page_pool
+    if _page_pool is None:
+        with _page_pool_lock:
+            if _page_pool is None:
+                _page_pool = ProcessPoolExecutor(max_workers=PDF_PAGE_WORKERS)
+    return _page_pool
+
+
+def _extract_page_range(backend: str, source: Source, start: int, end: int) -> List[str]:
+    return PDF_BACKENDS[backend][1](source, start, end)
+
+
+def _extract_pdf(source: Source, backend: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    PDF metnini ve PDF_MAX_PAGES nedeniyle sayfaların atlanıp atlanmadığını döndür
+    """
+    size = _source_size(source)
+    if size > PDF_MAX_BYTES:
+        raise DocumentTooLargeError(
+            f"PDF dosyası çok büyük ({size / (1024 * 1024):.1f} MB); "
+            f"sınır {PDF_MAX_BYTES / (1024 * 1024):.1f} MB"
+        )
+    backend = resolve_pdf_backend(backend)
+    page_count, extract_pages = PDF_BACKENDS[backend]
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-            
-        return text
+        total = page_count(source)
+        pages = min(total, PDF_MAX_PAGES)
+        parallel = (
+            PDF_PARALLEL_MIN_PAGES and PDF_PAGE_WORKERS > 1 and pages >= PDF_PARALLEL_MIN_PAGES
+            and multiprocessing.parent_process() is None
+        )
+        if parallel:
+            # Sayfaları çalışan başına bir aralık olacak şekilde böl; her süreç belgeyi kendisi açar
+            # (yol verildiyse süreçlere yalnızca yol gönderilir)
+            step = -(-pages // PDF_PAGE_WORKERS)
+            ranges = [(start, min(start + step, pages)) for start in range(0, pages, step)]
+            pool = _get_page_pool()
+            futures = [pool.submit(_extract_page_range, backend, source, start, end) for start, end in ranges]
+            page_texts = [text for future in futures for text in future.result()]
+        else:
+            page_texts = extract_pages(source, 0, pages)
     except Exception as e:
         raise Exception(f"PDF dosyası işlenirken hata oluştu: {str(e)}")
+    if total > pages:
+        logger.warning("PDF %d sayfa; yalnızca ilk %d sayfa okundu (PDF_MAX_PAGES)", total, pages)
+    # Sayfa metinleri tek seferde birleştirilir (döngüde += ile ikinci dereceden kopyalama yok)
+    return "\n".join(page_texts) + "\n", total > pages
+
 
-def extract_text_from_docx(file_content: bytes) -> str:
+def extract_text_from_pdf(source: Source, backend: Optional[str] = None) -> str:
     """
-    DOCX dosyasından metin çıkarma
+    PDF dosyasından (bayt veya dosya yolu) metin çıkarma; arka uç seçilebilir,
+    uzun belgelerde sayfalar paralel işlenir. Yol verilirse dosya belleğe okunmaz.
+    """
+    return _extract_pdf(source, backend)[0]
+
+def extract_text_from_docx(source: Source) -> str:
+    """
+    DOCX dosyasından (bayt veya dosya yolu) metin çıkarma
     """
     try:
-        docx_file = io.BytesIO(file_content)
-        doc = Document(docx_file)
-        text = ""
-        
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-            
-        return text
+        doc = Document(_open(source))
+        return "\n".join(paragraph.text for paragraph in doc.paragraphs) + "\n"
     except Exception as e:
         raise Exception(f"DOCX dosyası işlenirken hata oluştu: {str(e)}")
 
-def process_document(file_content: bytes, file_extension: str) -> str:
+def process_document_info(source: Source, file_extension: str) -> Dict:
     """
-    Dosya uzantısına göre belgeyi işle ve metni çıkar
+    Belgeyi işle; {"text", "truncated"} döndür. truncated, PDF_MAX_PAGES'i aşan sayfalar okunmadığında True olur.
     """
     if file_extension.lower() == '.pdf':
-        return extract_text_from_pdf(file_content)
+        text, truncated = _extract_pdf(source)
+        return {"text": text, "truncated": truncated}
     elif file_extension.lower() == '.docx':
-        return extract_text_from_docx(file_content)
+        return {"text": extract_text_from_docx(source), "truncated": False}
     else:
-        raise ValueError("Desteklenmeyen dosya formatı. Sadece PDF ve DOCX dosyaları desteklenir.") 
\ No newline at end of file
+        raise ValueError("Desteklenmeyen dosya formatı. Sadece PDF ve DOCX dosyaları desteklenir.")
+
+def process_document(source: Source, file_extension: str) -> str:
+    """
+    Dosya uzantısına göre belgeyi (bayt veya dosya yolu) işle ve metni çıkar
+    """
+    return process_document_info(source, file_extension)["text"]
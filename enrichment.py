@@ -0,0 +1,131 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, List
+
+from instrumentation import reset_trace_id, set_trace_id
+
+# Ertelenmiş zenginleştirme (NER, özet, gömme) işçi havuzu ayarları
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "2"))
+ENRICHMENT_POLL_INTERVAL = float(os.getenv("ENRICHMENT_POLL_INTERVAL", "1.0"))
+ENRICHMENT_LEASE_SECONDS = float(os.getenv("ENRICHMENT_LEASE_SECONDS", "300"))
+ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", "3"))
+ENRICHMENT_BACKOFF_BASE = float(os.getenv("ENRICHMENT_BACKOFF_BASE", "5.0"))
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentWorker:
+    def __init__(
+        self,
+        db,
+        enrich: Callable[[str], bool],
+        workers: int = ENRICHMENT_WORKERS,
+        poll_interval: float = ENRICHMENT_POLL_INTERVAL,
+        lease_seconds: float = ENRICHMENT_LEASE_SECONDS,
+        max_attempts: int = ENRICHMENT_MAX_ATTEMPTS,
+        backoff_base: float = ENRICHMENT_BACKOFF_BASE,
+    ):
+        """
+        Kalıcı (MongoDB) kuyruktaki zenginleştirme işlerini arka planda işleyen işçi havuzunu başlat.
+        enrich aday kimliğini alıp ağır aşamaları çalıştırır; aday artık yoksa False döndürür.
+        İşler kiralanarak alınır: süreç çökerse kira dolduğunda iş başka bir işçiye geçer,
+        hata veren işler üstel beklemeyle max_attempts kez yeniden denenir.
+        """
+        self.db = db
+        self.enrich = enrich
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.stats = {"completed": 0, "dropped": 0, "retried": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"enrichment-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        İşçilere durmalarını söyle; yarıda kalan işler kira dolunca yeniden alınır
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def notify(self):
+        """
+        Yeni iş kuyruğa eklendi; bekleyen işçileri yoklama aralığını beklemeden uyandır
+        """
+        self._wakeup.set()
+
+    def run_now(self, cv_id: str) -> bool:
+        """
+        Adayın işini çağıranın iş parçacığında hemen işle (ör. yanıtta sonuç gerektiğinde).
+        İş başka bir işçi tarafından alınmışsa veya başarısız olduysa False döner.
+        """
+        job = self.db.claim_enrichment(self.lease_seconds, cv_id)
+        return job is not None and self._process(job)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                job = self.db.claim_enrichment(self.lease_seconds)
+            except Exception as e:
+                logger.warning("Zenginleştirme kuyruğu okunurken hata oluştu: %s", e)
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            # Arka plan işinin günlükleri aday kimliğiyle ilişkilendirilir
+            token = set_trace_id(f"enrichment-{job['candidate_id']}")
+            try:
+                self._process(job)
+            finally:
+                reset_trace_id(token)
+
+    def _process(self, job: Dict) -> bool:
+        cv_id = job["candidate_id"]
+        try:
+            found = self.enrich(cv_id)
+        except Exception as e:
+            logger.exception("Aday %s zenginleştirilirken hata oluştu", cv_id)
+            self._handle_failure(job, str(e))
+            return False
+        if not found:
+            # Aday zenginleştirme beklerken silinmiş; iş düşürülür
+            self.db.delete_enrichment(cv_id)
+            self._count("dropped")
+            return False
+        self._count("completed")
+        return True
+
+    def _handle_failure(self, job: Dict, error: str):
+        """
+        Deneme hakkı varsa işi üstel beklemeyle yeniden planla; yoksa başarısız işaretle
+        """
+        cv_id = job["candidate_id"]
+        if job.get("attempts", 1) >= self.max_attempts:
+            logger.error("Zenginleştirme başarısız oldu: aday %s: %s", cv_id, error)
+            self.db.fail_enrichment(cv_id, error)
+            self._count("failed")
+        else:
+            self.db.retry_enrichment(cv_id, error, self.backoff_base ** job.get("attempts", 1))
+            self._count("retried")
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
@@ -0,0 +1,135 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Optional
+
+# Süreç havuzlarının başlatma yöntemi: spawn (varsayılan) veya forkserver. fork, iş parçacıkları
+# (Mongo istemcisi, bildirim ve zenginleştirme işçileri) çalışan bir süreçte güvenli değildir
+PROCESS_START_METHOD = os.getenv("PROCESS_START_METHOD", "spawn")
+
+
+class QueueFullError(Exception):
+    def __init__(self, name: str):
+        """
+        Yürütücünün kuyruğu dolu olduğunda yeni işi reddetmek için kullanılır
+        """
+        super().__init__(f"'{name}' yürütücüsünün kuyruğu dolu")
+        self.name = name
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int, max_queue: int, use_processes: bool = False):
+        """
+        Sınırlı çalışan ve kuyruk kapasitesine sahip yürütücüyü tanımla. Havuz içe aktarmada değil,
+        start() ile (uygulama açılışında ya da ilk işte) oluşturulur.
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_queue
+        self.use_processes = use_processes
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._in_flight = 0
+        self._counter_lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> Executor:
+        """
+        Havuzu henüz yoksa oluştur; süreç havuzu PROCESS_START_METHOD bağlamıyla başlatılır
+        """
+        with self._counter_lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=get_context(PROCESS_START_METHOD)
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            return self._executor
+
+    @property
+    def depth(self) -> int:
+        """
+        Çalışan ve kuyrukta bekleyen iş sayısı
+        """
+        return self._in_flight
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        İşi kapasite varsa kuyruğa al; yoksa QueueFullError fırlat
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError(self.name)
+        with self._counter_lock:
+            self._in_flight += 1
+        try:
+            future = self.start().submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        # İstek iptal edilse bile yer, iş gerçekten bittiğinde serbest bırakılır
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Engelleyici işi olay döngüsünü bloklamadan çalıştır ve sonucunu bekle
+        """
+        if kwargs:
+            fn = functools.partial(fn, **kwargs)
+        if not self.use_processes:
+            # İzleme kimliği gibi bağlam değişkenleri iş parçacığına taşınır
+            fn = functools.partial(contextvars.copy_context().run, fn)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _release(self):
+        with self._counter_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Havuzu kapat; sonraki iş yeni bir havuz başlatır
+        """
+        with self._counter_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Model çıkarımı (spaCy, özetleme, gömme, FAISS) için küçük bir iş parçacığı havuzu
+inference = BoundedExecutor(
+    "inference",
+    max_workers=int(os.getenv("INFERENCE_WORKERS", "2")),
+    max_queue=int(os.getenv("INFERENCE_QUEUE", "16")),
+)
+
+# PDF/DOCX ayrıştırma GIL'i tuttuğu için ayrı süreçlerde çalışır
+extraction = BoundedExecutor(
+    "extraction",
+    max_workers=int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 2))),
+    max_queue=int(os.getenv("EXTRACTION_QUEUE", "32")),
+    use_processes=True,
+)
+
+# Engelleyici ağ G/Ç'si (pymongo, GridFS, SMTP) için geniş bir iş parçacığı havuzu
+blocking_io = BoundedExecutor(
+    "blocking_io",
+    max_workers=int(os.getenv("IO_WORKERS", "16")),
+    max_queue=int(os.getenv("IO_QUEUE", "256")),
+)
+
+EXECUTORS = (inference, extraction, blocking_io)
+
+
+def start_all():
+    for executor in EXECUTORS:
+        executor.start()
+
+
+def shutdown_all():
+    for executor in EXECUTORS:
+        executor.shutdown(wait=False)
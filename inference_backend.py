@@ -0,0 +1,292 @@
+"""
+Gömme ve özetleme modelleri için çıkarım arka ucu seçimi.
+
+"torch": sentence-transformers / transformers ile PyTorch fp32 (varsayılan).
+"onnx": modeller ONNX'e aktarılır, dinamik int8 nicemlenir ve ONNX Runtime ile çalıştırılır
+(`pip install optimum[onnxruntime]`). Aktarılan dosyalar ONNX_CACHE_DIR altında saklanır ve sonraki
+açılışlarda yeniden kullanılır; önceden hazırlamak için:
+
+    python inference_backend.py --embedding-model all-MiniLM-L6-v2 --summary-model sshleifer/distilbart-cnn-12-6
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+INFERENCE_BACKENDS = ("torch", "onnx")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+# Model başına çıkarım iş parçacığı sayısı (0: kütüphane varsayılanı, genellikle tüm çekirdekler)
+INFERENCE_INTRA_OP_THREADS = int(os.getenv("INFERENCE_INTRA_OP_THREADS", "0"))
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", ".onnx_cache")
+# Dinamik int8 nicemleme hedefi: auto (CPU'ya göre), avx512_vnni, avx512, avx2, arm64 veya none (fp32 ONNX)
+ONNX_QUANTIZATION = os.getenv("ONNX_QUANTIZATION", "auto")
+QUANTIZATION_TARGETS = ("avx512_vnni", "avx512", "avx2", "arm64", "none")
+# sentence-transformers modellerinin kısa adları hub'da bu kuruluş altında bulunur
+_SENTENCE_TRANSFORMERS_ORG = "sentence-transformers"
+_MANIFEST = "manifest.json"
+
+_export_lock = threading.Lock()
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    backend = (backend or INFERENCE_BACKEND).lower()
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Bilinmeyen çıkarım arka ucu: {backend}. Seçenekler: {', '.join(INFERENCE_BACKENDS)}")
+    return backend
+
+
+def resolve_quantization(quantization: Optional[str] = None) -> str:
+    """
+    İstenen nicemleme hedefini (veya "auto" için bu CPU'ya uygun olanı) döndür
+    """
+    quantization = (quantization or ONNX_QUANTIZATION).lower()
+    if quantization == "auto":
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            return "arm64"
+        flags = _cpu_flags()
+        if "avx512_vnni" in flags:
+            return "avx512_vnni"
+        return "avx512" if "avx512f" in flags else "avx2"
+    if quantization not in QUANTIZATION_TARGETS:
+        raise ValueError(f"Bilinmeyen nicemleme hedefi: {quantization}. Seçenekler: auto, {', '.join(QUANTIZATION_TARGETS)}")
+    return quantization
+
+
+def _cpu_flags() -> set:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def model_tag(model_name: str, backend: Optional[str] = None, quantization: Optional[str] = None) -> str:
+    """
+    Kayıtlı gömmelerde ve önbellek anahtarlarında kullanılan model kimliği. PyTorch için model adının
+    kendisidir; ONNX çıktıları sayısal olarak farklı olduğundan arka uç ve nicemleme hedefi eklenir
+    (hedefe göre çekirdekler farklı int8 sonuçları üretir; arka uç veya hedef değişince kayıtlı
+    gömmeler eskimiş sayılır ve yeniden kodlanır).
+    """
+    if resolve_backend(backend) == "torch":
+        return model_name
+    quantization = resolve_quantization(quantization)
+    return f"{model_name}@onnx" if quantization == "none" else f"{model_name}@onnx-int8-{quantization}"
+
+
+def _hub_id(model_name: str) -> str:
+    return model_name if "/" in model_name else f"{_SENTENCE_TRANSFORMERS_ORG}/{model_name}"
+
+
+def _require_onnx():
+    try:
+        import optimum.onnxruntime  # noqa: F401
+    except ImportError as e:
+        raise ImportError("ONNX arka ucu için optimum ve onnxruntime gerekli: pip install optimum[onnxruntime]") from e
+
+
+def _session_options(threads: int):
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+    return options
+
+
+def _quantization_config(quantization: str):
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    return getattr(AutoQuantizationConfig, quantization)(is_static=False, per_channel=False)
+
+
+def export_model(
+    model_name: str,
+    task: str,
+    quantization: Optional[str] = None,
+    cache_dir: str = ONNX_CACHE_DIR,
+) -> str:
+    """
+    Modeli ONNX'e aktarıp (istenirse) dinamik int8 nicemle ve önbellek dizinini döndür.
+    task: "feature-extraction" (gömme) veya "summarization". Dizin daha önce hazırlanmışsa
+    yeniden kullanılır; dosyalar geçici dizinde üretilip tek adımda yerine taşınır.
+    """
+    _require_onnx()
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTModelForSeq2SeqLM, ORTQuantizer
+    from transformers import AutoTokenizer
+
+    quantization = resolve_quantization(quantization)
+    directory = os.path.join(cache_dir, _hub_id(model_name).replace("/", "__"), task, quantization)
+    if os.path.exists(os.path.join(directory, _MANIFEST)):
+        return directory
+    with _export_lock:
+        if os.path.exists(os.path.join(directory, _MANIFEST)):
+            return directory
+        os.makedirs(os.path.dirname(directory), exist_ok=True)
+        workdir = tempfile.mkdtemp(prefix=".export-", dir=os.path.dirname(directory))
+        try:
+            model_class = ORTModelForFeatureExtraction if task == "feature-extraction" else ORTModelForSeq2SeqLM
+            model_class.from_pretrained(_hub_id(model_name), export=True).save_pretrained(workdir)
+            AutoTokenizer.from_pretrained(_hub_id(model_name)).save_pretrained(workdir)
+            files = sorted(name for name in os.listdir(workdir) if name.endswith(".onnx"))
+            if quantization != "none":
+                config = _quantization_config(quantization)
+                for name in files:
+                    ORTQuantizer.from_pretrained(workdir, file_name=name).quantize(
+                        save_dir=workdir, quantization_config=config
+                    )
+                files = [name.replace(".onnx", "_quantized.onnx") for name in files]
+            with open(os.path.join(workdir, _MANIFEST), "w", encoding="utf-8") as f:
+                json.dump({"model": model_name, "task": task, "quantization": quantization, "files": files}, f)
+            try:
+                os.replace(workdir, directory)
+            except OSError:
+                # Başka bir süreç aynı dizini önce hazırladı
+                if not os.path.exists(os.path.join(directory, _MANIFEST)):
+                    raise
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return directory
+
+
+def _manifest(directory: str) -> Dict:
+    with open(os.path.join(directory, _MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _set_torch_threads(threads: int):
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+
+
+class OnnxEmbedder:
+    def __init__(
+        self,
+        model_name: str,
+        quantization: Optional[str] = None,
+        threads: int = INFERENCE_INTRA_OP_THREADS,
+        max_seq_length: int = 256,
+        batch_size: int = 32,
+    ):
+        """
+        sentence-transformers modelinin ONNX Runtime karşılığı: ortalama havuzlama (mean pooling) ve
+        isteğe bağlı L2 normalizasyonu SentenceTransformer.encode ile aynıdır. max_seq_length
+        MiniLM/MPNet modellerinin 256 token sınırıdır.
+        """
+        _require_onnx()
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        directory = export_model(model_name, "feature-extraction", quantization)
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            directory,
+            file_name=_manifest(directory)["files"][0],
+            session_options=_session_options(threads),
+            provider="CPUExecutionProvider",
+        )
+        self.max_seq_length = max_seq_length
+        self.batch_size = batch_size
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.config.hidden_size
+
+    def encode(self, texts, batch_size: Optional[int] = None, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """
+        Metinleri gömme vektörlerine dönüştür; dolguyu azaltmak için metinler uzunluğa göre gruplanır
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        batch_size = batch_size or self.batch_size
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = np.zeros((len(texts), self.get_sentence_embedding_dimension()), dtype="float32")
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [texts[i] for i in rows],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"][..., None].astype("float32")
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings[rows] = pooled
+        return embeddings[0] if single else embeddings
+
+
+def load_embedder(model_name: str, backend: Optional[str] = None, threads: int = INFERENCE_INTRA_OP_THREADS):
+    """
+    Seçilen arka uç için encode / get_sentence_embedding_dimension arayüzlü gömme modelini yükle
+    """
+    if resolve_backend(backend) == "onnx":
+        return OnnxEmbedder(model_name, threads=threads)
+    _set_torch_threads(threads)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def load_summarization_pipeline(model_name: str, backend: Optional[str] = None, threads: int = INFERENCE_INTRA_OP_THREADS):
+    """
+    Seçilen arka uç için transformers özetleme boru hattını yükle
+    """
+    if resolve_backend(backend) == "torch":
+        _set_torch_threads(threads)
+        from transformers import pipeline
+        return pipeline("summarization", model=model_name)
+
+    _require_onnx()
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from optimum.pipelines import pipeline
+    from transformers import AutoTokenizer
+
+    directory = export_model(model_name, "summarization")
+    files = _manifest(directory)["files"]
+    names = {
+        "encoder_file_name": next(name for name in files if name.startswith("encoder_model")),
+        "decoder_file_name": next(name for name in files if name.startswith("decoder_model")),
+    }
+    with_past = [name for name in files if name.startswith("decoder_with_past_model")]
+    if with_past:
+        names["decoder_with_past_file_name"] = with_past[0]
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        directory,
+        use_cache=bool(with_past),
+        session_options=_session_options(threads),
+        provider="CPUExecutionProvider",
+        **names,
+    )
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(directory), accelerator="ort")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modelleri ONNX'e aktar ve nicemle (önbelleği önceden hazırla)")
+    parser.add_argument("--embedding-model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--summary-model", default=os.getenv("SUMMARY_MODEL", "sshleifer/distilbart-cnn-12-6"))
+    parser.add_argument("--quantization", default=None, help=f"Varsayılan: ONNX_QUANTIZATION ({ONNX_QUANTIZATION})")
+    parser.add_argument("--skip-summary", action="store_true")
+    args = parser.parse_args()
+
+    exported: List[str] = [export_model(args.embedding_model, "feature-extraction", args.quantization)]
+    if not args.skip_summary:
+        exported.append(export_model(args.summary_model, "summarization", args.quantization))
+    for directory in exported:
+        print(json.dumps({"directory": directory, **_manifest(directory)}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Süreç içi ölçüm altyapısı: aşama süre histogramları ve sayaçlar (Prometheus metin biçiminde
+/metrics), istek başına izleme kimliği (trace ID) ve yavaş istekler için isteğe bağlı örnekleyici profil.
+"""
+import bisect
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Bu süreyi (ms) aşan istekler örnekleyici profil ile kaydedilir; 0 kapalı
+SLOW_REQUEST_PROFILE_MS = float(os.getenv("SLOW_REQUEST_PROFILE_MS", "0"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+# Doluysa yavaş isteklerin yığın örnekleri buraya "collapsed" (flamegraph / speedscope) biçiminde yazılır
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger(__name__)
+
+_trace_id: contextvars.ContextVar = contextvars.ContextVar("trace_id", default="-")
+
+
+def current_trace_id() -> str:
+    return _trace_id.get()
+
+
+def set_trace_id(trace_id: Optional[str] = None) -> contextvars.Token:
+    """
+    Geçerli bağlamın izleme kimliğini ayarla (verilmezse yeni üret); reset_trace_id için belirteç döndürür
+    """
+    return _trace_id.set(trace_id or uuid.uuid4().hex)
+
+
+def reset_trace_id(token: contextvars.Token):
+    _trace_id.reset(token)
+
+
+class TraceIdFilter(logging.Filter):
+    """
+    Günlük kayıtlarına geçerli izleme kimliğini ekler
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id()
+        return True
+
+
+def configure_logging(level: str = LOG_LEVEL):
+    """
+    Kök günlükçüyü izleme kimliğini içeren biçimle yapılandır (yalnızca bir kez)
+    """
+    root = logging.getLogger()
+    if any(isinstance(f, TraceIdFilter) for handler in root.handlers for f in handler.filters):
+        return
+    handler = logging.StreamHandler()
+    handler.addFilter(TraceIdFilter())
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(trace_id)s] %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Yalnızca artan sayaç (etiket değerleri başına)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Kümülatif kovalı süre histogramı (etiket değerleri başına kova sayıları, toplam ve adet)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # kova sayıları + [toplam, adet]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels[name]) for name in self.labelnames))
+        return int(series[-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {int(series[-1])}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {int(series[-1])}")
+        return lines
+
+
+class CallbackMetric:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        fn: Callable[[], object],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ):
+        """
+        Değeri her okumada fn ile hesaplanan ölçüm (indeks boyutu, kuyruk derinliği, önbellek sayaçları).
+        fn tek bir sayı ya da etiket değerleri demeti -> sayı sözlüğü döndürür.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        try:
+            values = self.fn()
+        except Exception:
+            logger.exception("Ölçüm okunamadı: %s", self.name)
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(values.items()):
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not isinstance(metric, CallbackMetric):
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self, name: str, documentation: str, fn: Callable[[], object], labelnames: Sequence[str] = (), kind: str = "gauge"
+    ):
+        """
+        Okuma anında hesaplanan ölçümü kaydet (aynı adla yeniden kaydedilirse değiştirilir)
+        """
+        self._register(CallbackMetric(name, documentation, fn, labelnames, kind))
+
+    def render(self) -> str:
+        """
+        Tüm ölçümleri Prometheus metin biçiminde (0.0.4) döndür
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "talentmatch_stage_seconds", "Aşama süreleri (belge çıkarma, cv_parser, özet, gömme, FAISS, veritabanı, bildirim)",
+    ["stage"],
+)
+STAGE_ERRORS = REGISTRY.counter("talentmatch_stage_errors_total", "Hata fırlatan aşama çağrıları", ["stage"])
+REQUEST_SECONDS = REGISTRY.histogram(
+    "talentmatch_http_request_seconds", "HTTP istek süreleri", ["method", "route", "status"]
+)
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Bloğun süresini talentmatch_stage_seconds{stage=...} histogramına, hatasını sayaca yaz
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+
+def instrumented(stage: str):
+    """
+    Fonksiyonu aşama olarak ölçen dekoratör; üreteçlerde yalnızca üretecin içinde geçen süre
+    (tüketicinin öğeleri işleme süresi hariç) tek gözlem olarak kaydedilir
+    """
+    def decorate(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator(*args, **kwargs):
+                iterator = fn(*args, **kwargs)
+                elapsed = 0.0
+                try:
+                    while True:
+                        started = time.perf_counter()
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        except BaseException:
+                            STAGE_ERRORS.inc(stage=stage)
+                            raise
+                        finally:
+                            elapsed += time.perf_counter() - started
+                        yield item
+                finally:
+                    iterator.close()
+                    STAGE_SECONDS.observe(elapsed, stage=stage)
+            return generator
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_methods(prefix: str, exclude: Iterable[str] = ()):
+    """
+    Sınıfın "_" ile başlamayan tüm yöntemlerini "<prefix>.<yöntem>" aşaması olarak ölçen sınıf dekoratörü
+    """
+    exclude = set(exclude)
+
+    def decorate(cls):
+        for name, value in list(vars(cls).items()):
+            if name.startswith("_") or name in exclude or not inspect.isfunction(value):
+                continue
+            setattr(cls, name, instrumented(f"{prefix}.{name}")(value))
+        return cls
+    return decorate
+
+
+# Boşta bekleyen iş parçacıklarının yığınları profile katılmaz
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "thread.py", "base_events.py", "connection.py")
+
+
+def _collapse(frame) -> Optional[str]:
+    if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+        return None
+    names = []
+    while frame is not None:
+        names.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _ProfileSession:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: _Tally = _Tally()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    self.samples[stack] += 1
+
+    def stop(self) -> _Tally:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+
+class SlowRequestProfiler:
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_REQUEST_PROFILE_MS,
+        interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS,
+        directory: str = PROFILE_DIR,
+    ):
+        """
+        İstek sürerken tüm iş parçacıklarının yığınlarını interval_ms aralıklarla örnekler; istek
+        threshold_ms'yi aşarsa örnekler kancalara (varsayılan: günlük ve directory'ye collapsed dosya)
+        verilir. Ek yükü sınırlamak için aynı anda tek istek profillenir; eşzamanlı isteklerin
+        yığınları da örneklere karışabilir.
+        """
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.directory = directory or None
+        self.hooks: List[Callable[[str, str, float, Dict[str, int]], None]] = [self._report]
+        self._active = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def add_hook(self, hook: Callable[[str, str, float, Dict[str, int]], None]):
+        """
+        hook(trace_id, istek, süre_sn, {collapsed yığın: örnek sayısı}) yavaş her istekte çağrılır
+        """
+        self.hooks.append(hook)
+
+    def start(self) -> Optional[_ProfileSession]:
+        if not self.enabled or not self._active.acquire(blocking=False):
+            return None
+        return _ProfileSession(self.interval)
+
+    def finish(self, session: Optional[_ProfileSession], trace_id: str, label: str, seconds: float):
+        if session is None:
+            return
+        try:
+            samples = session.stop()
+        finally:
+            self._active.release()
+        if seconds < self.threshold or not samples:
+            return
+        for hook in self.hooks:
+            try:
+                hook(trace_id, label, seconds, dict(samples))
+            except Exception:
+                logger.exception("Profil kancası başarısız oldu")
+
+    def _report(self, trace_id: str, label: str, seconds: float, samples: Dict[str, int]):
+        top = sorted(samples.items(), key=lambda item: item[1], reverse=True)[:5]
+        logger.warning(
+            "Yavaş istek %s: %.0f ms (trace %s); en sık örneklenen yığınlar:\n%s",
+            label, seconds * 1000, trace_id, "\n".join(f"{count} {stack}" for stack, count in top),
+        )
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            # İzleme kimliği istemciden gelebilir; dosya adında yalnızca güvenli karakterler kalır
+            filename = re.sub(r"[^A-Za-z0-9_.-]", "_", trace_id).lstrip(".") or "profile"
+            with open(os.path.join(self.directory, f"{filename}.collapsed"), "w", encoding="utf-8") as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in samples.items())
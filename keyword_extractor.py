@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from instrumentation import instrumented
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick isteğe bağlı; yoksa derlenmiş trie regex kullanılır
+    ahocorasick = None
+
+TAXONOMY_PATH = os.getenv("TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.json"))
+
+
+def load_taxonomy(path: str = TAXONOMY_PATH) -> Dict:
+    """
+    Kategori -> {"boundary", "terms", "aliases"} biçimindeki taksonomi dosyasını oku
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _trie_pattern(terms: List[str]) -> str:
+    """
+    Terimleri ortak önekleri paylaşan bir regex'e derle; her konumda en uzun terim eşleşir
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+@dataclass
+class KeywordMatches:
+    lines: List[str]  # Küçük harfe çevrilmiş satırlar
+    terms: Dict[str, List[str]] = field(default_factory=dict)  # Kategori -> bulunan terimler (ilk görülme sırasıyla)
+    line_hits: Dict[str, List[int]] = field(default_factory=dict)  # Kategori -> terim geçen satır numaraları
+
+
+class KeywordExtractor:
+    def __init__(self, taxonomy: Dict):
+        """
+        Taksonomideki tüm kategorilerin terimlerini tek bir otomatta birleştir
+        """
+        # Taksonomi değiştiğinde önbelleğe alınmış ayrıştırma sonuçları geçersiz olsun diye
+        self.version = hashlib.sha256(json.dumps(taxonomy, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.word_boundary: Dict[str, bool] = {}
+        self.entries: Dict[str, List[Tuple[str, str]]] = {}  # terim -> [(kategori, kanonik ad)]
+        for category, spec in taxonomy.items():
+            self.word_boundary[category] = spec.get("boundary", "word") == "word"
+            variants = [(term, term) for term in spec.get("terms", [])]
+            variants += list(spec.get("aliases", {}).items())
+            for term, canonical in variants:
+                term = term.strip().lower()
+                if term:
+                    self.entries.setdefault(term, []).append((category, canonical.strip().lower()))
+
+        terms = sorted(self.entries)
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for term in terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._pattern = re.compile("(?=(" + _trie_pattern(terms) + "))") if terms else None
+            # Regex her konumda en uzun terimi verir; aynı konumda başlayan kısa terimler önekten bulunur
+            known = set(terms)
+            self._prefixes = {
+                term: [term[:i] for i in range(1, len(term) + 1) if term[:i] in known]
+                for term in terms
+            }
+
+    def _hits(self, lowered: str) -> Iterator[Tuple[int, str]]:
+        """
+        Metindeki tüm terim geçişlerini (başlangıç, terim) olarak tek geçişte üret
+        """
+        if self._automaton is not None:
+            for end, term in self._automaton.iter(lowered):
+                yield end - len(term) + 1, term
+        elif self._pattern is not None:
+            for match in self._pattern.finditer(lowered):
+                for term in self._prefixes[match.group(1)]:
+                    yield match.start(), term
+
+    @instrumented("cv_parser.keywords")
+    def extract(self, text: str) -> KeywordMatches:
+        """
+        Metni bir kez küçük harfe çevir ve tüm kategorileri tek geçişte çıkar
+        """
+        lowered = text.lower()
+        line_starts = [0] + [m.end() for m in re.finditer("\n", lowered)]
+        matches = KeywordMatches(lines=lowered.split("\n"))
+        found: Dict[str, Dict[str, None]] = {category: {} for category in self.word_boundary}
+        line_hits: Dict[str, Dict[int, None]] = {category: {} for category in self.word_boundary}
+
+        for start, term in self._hits(lowered):
+            end = start + len(term)
+            at_word_edges = (
+                (start == 0 or not _is_word_char(lowered[start - 1]))
+                and (end == len(lowered) or not _is_word_char(lowered[end]))
+            )
+            for category, canonical in self.entries[term]:
+                if self.word_boundary[category] and not at_word_edges:
+                    continue
+                found[category][canonical] = None
+                line_hits[category][bisect_right(line_starts, start) - 1] = None
+
+        matches.terms = {category: list(terms) for category, terms in found.items()}
+        matches.line_hits = {category: sorted(lines) for category, lines in line_hits.items()}
+        return matches
+
+
+_extractor: Optional[KeywordExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor() -> KeywordExtractor:
+    """
+    Süreç genelinde paylaşılan, TAXONOMY_PATH dosyasından derlenmiş çıkarıcıyı döndür
+    """
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = KeywordExtractor(load_taxonomy())
+    return _extractor
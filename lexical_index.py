@@ -0,0 +1,254 @@
+import json
+import math
+import os
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from instrumentation import instrumented
+
+_TOKEN_PATTERN = re.compile(r"[0-9a-zçğıöşü][0-9a-zçğıöşü+#.]*")
+# BM25'e katkısı ihmal edilebilir, posting listeleri çok uzun olan sözcükler
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the to we with you your "
+    "ve ile bir bu da de için olarak olan gibi daha çok en".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Metni küçük harfli terimlere böl; c++, c#, node.js gibi teknik terimler korunur
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        token = token.rstrip(".")
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+class BM25Index:
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_df_ratio: Optional[float] = None,
+        compact_min: int = 1000,
+        compact_ratio: float = 0.2,
+    ):
+        """
+        Aday int kimlikleri üzerinde artımlı BM25 ters indeksi. Her terim için (kimlik, terim sıklığı)
+        posting listesi tutulur; sorgu yalnızca sorgu terimlerinin listelerini dolaşır (tarama yok).
+        Sık geçen terimlerin katkısı IDF ile azalır; max_df_ratio verilirse belgelerin bu oranından
+        fazlasında geçen sorgu terimleri tamamen atlanır (varsayılan: kapalı).
+        Çıkarılan belgeler posting listelerinden hemen silinmez, silindi olarak işaretlenir; işaretli
+        belge sayısı max(compact_min, compact_ratio * canlı belge) sınırını aşınca listeler tek geçişte sıkıştırılır.
+        """
+        self.k1 = k1
+        self.b = b
+        self.max_df_ratio = max_df_ratio
+        self.compact_min = compact_min
+        self.compact_ratio = compact_ratio
+        self.terms: Dict[str, int] = {}
+        self.postings_ids: List[array] = []
+        self.postings_tfs: List[array] = []
+        self.doc_len = np.zeros(1024, dtype=np.uint32)
+        self.doc_terms: Dict[int, Tuple[int, ...]] = {}
+        self.total_len = 0
+        # Silindi işaretleri: kimlik maskesi, işaretli belgelerin terimleri ve terim başına ölü girdi sayısı
+        self.dead = np.zeros(1024, dtype=bool)
+        self.dead_terms: Dict[int, Tuple[int, ...]] = {}
+        self.dead_counts = array("I")
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def __contains__(self, int_id: int) -> bool:
+        return int_id in self.doc_terms
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.terms.get(term)
+        if term_id is None:
+            term_id = self.terms[term] = len(self.postings_ids)
+            self.postings_ids.append(array("I"))
+            self.postings_tfs.append(array("H"))
+            self.dead_counts.append(0)
+        return term_id
+
+    def add(self, int_id: int, text: str, skills: Iterable[str] = ()):
+        """
+        Belgeyi (CV metni ve beceriler) indeksle; aynı kimlik varsa önce çıkarılır
+        """
+        tokens = tokenize(text) + tokenize(" ".join(skills))
+        with self.lock:
+            self.remove(int_id)
+            if int_id in self.dead_terms:
+                # Aynı kimliğin eski girdileri yeni girdilerle karışmasın diye önce temizlenir
+                self._purge(int_id)
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                term_id = self._term_id(token)
+                counts[term_id] = counts.get(term_id, 0) + 1
+            for term_id, count in counts.items():
+                self.postings_ids[term_id].append(int_id)
+                self.postings_tfs[term_id].append(min(count, 0xFFFF))
+            if int_id >= len(self.doc_len):
+                size = max(len(self.doc_len) * 2, int_id + 1)
+                self.doc_len = np.concatenate([self.doc_len, np.zeros(size - len(self.doc_len), dtype=np.uint32)])
+                self.dead = np.concatenate([self.dead, np.zeros(size - len(self.dead), dtype=bool)])
+            self.doc_len[int_id] = len(tokens)
+            self.doc_terms[int_id] = tuple(counts)
+            self.total_len += len(tokens)
+
+    def remove(self, int_id: int):
+        """
+        Belgeyi silindi olarak işaretle (posting listeleri taranmaz); gerekirse listeleri sıkıştır
+        """
+        with self.lock:
+            terms = self.doc_terms.pop(int_id, None)
+            if terms is None:
+                return
+            self.total_len -= int(self.doc_len[int_id])
+            self.doc_len[int_id] = 0
+            self.dead[int_id] = True
+            self.dead_terms[int_id] = terms
+            for term_id in terms:
+                self.dead_counts[term_id] += 1
+            if len(self.dead_terms) >= max(self.compact_min, self.compact_ratio * len(self.doc_terms)):
+                self.compact()
+
+    def _drop_dead(self, term_id: int):
+        ids = np.frombuffer(self.postings_ids[term_id], dtype=np.uint32)
+        keep = ~self.dead[ids]
+        self.postings_ids[term_id] = array("I", ids[keep].tobytes())
+        self.postings_tfs[term_id] = array("H", np.frombuffer(self.postings_tfs[term_id], dtype=np.uint16)[keep].tobytes())
+        self.dead_counts[term_id] = 0
+
+    def _purge(self, int_id: int):
+        """
+        Tek bir silindi işaretli belgenin girdilerini yalnızca kendi terimlerinin listelerinden temizle
+        """
+        # Bu listelerdeki diğer ölü girdiler de aynı geçişte düşer; bu zararsızdır
+        for term_id in self.dead_terms.pop(int_id):
+            self._drop_dead(term_id)
+        self.dead[int_id] = False
+
+    def compact(self):
+        """
+        Silindi işaretli belgelerin girdilerini posting listelerinden tek geçişte çıkar
+        """
+        with self.lock:
+            if not self.dead_terms:
+                return
+            for term_id in {term_id for terms in self.dead_terms.values() for term_id in terms}:
+                self._drop_dead(term_id)
+            self.dead[list(self.dead_terms)] = False
+            self.dead_terms = {}
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Terimin posting listesinin numpy kopyası (kopya, listeye ekleme yapılırken de güvenlidir)
+        """
+        return (
+            np.array(self.postings_ids[term_id], dtype=np.uint32),
+            np.array(self.postings_tfs[term_id], dtype=np.uint16),
+        )
+
+    @instrumented("bm25_search")
+    def search(self, query: str, k: int, allowed: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Sorgu terimlerinin posting listelerinden BM25 skorlarını topla ve en iyi k (kimlik, skor) çiftini döndür.
+        allowed verilirse (int kimlik bit dizisi) yalnızca bu belgeler skorlanır.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self.lock:
+            live_docs = len(self.doc_terms)
+            if not live_docs or k <= 0:
+                return []
+            avgdl = self.total_len / live_docs
+            postings = []
+            for term in terms:
+                term_id = self.terms.get(term)
+                if term_id is None:
+                    continue
+                df = len(self.postings_ids[term_id]) - self.dead_counts[term_id]
+                if not df or (self.max_df_ratio is not None and live_docs > 10 and df > self.max_df_ratio * live_docs):
+                    continue
+                ids, tfs = self._postings(term_id)
+                live = ~self.dead[ids] if self.dead_counts[term_id] else None
+                postings.append((df, ids, tfs, self.doc_len[ids], live))
+
+        ids_parts, score_parts = [], []
+        for df, ids, tfs, lengths, live in postings:
+            tfs = tfs.astype(np.float32)
+            bits = live
+            if allowed is not None:
+                in_range = ids < len(allowed) * 8
+                allowed_bits = np.zeros(len(ids), dtype=bool)
+                allowed_bits[in_range] = (allowed[ids[in_range] >> 3] >> (ids[in_range] & 7)) & 1
+                bits = allowed_bits if bits is None else bits & allowed_bits
+            if bits is not None:
+                ids, tfs, lengths = ids[bits], tfs[bits], lengths[bits]
+                if not len(ids):
+                    continue
+            idf = math.log(1 + (live_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths / avgdl)
+            ids_parts.append(ids)
+            score_parts.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not ids_parts:
+            return []
+        unique_ids, inverse = np.unique(np.concatenate(ids_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(int(unique_ids[i]), float(scores[i])) for i in top]
+
+    def save(self, path: str):
+        """
+        İndeksi sıkıştırılmamış numpy arşivi olarak diske atomik olarak yaz (önce silindi işaretli girdiler temizlenir)
+        """
+        with self.lock:
+            self.compact()
+            header = json.dumps({"k1": self.k1, "b": self.b, "terms": list(self.terms)}).encode("utf-8")
+            arrays = {
+                "header": np.frombuffer(header, dtype=np.uint8),
+                "lengths": np.array([len(ids) for ids in self.postings_ids], dtype=np.int64),
+                "ids": np.frombuffer(b"".join(ids.tobytes() for ids in self.postings_ids), dtype=np.uint32),
+                "tfs": np.frombuffer(b"".join(tfs.tobytes() for tfs in self.postings_tfs), dtype=np.uint16),
+                "doc_len": self.doc_len.copy(),
+                "doc_ids": np.fromiter(self.doc_terms, dtype=np.uint32, count=len(self.doc_terms)),
+            }
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        """
+        Kaydedilmiş indeksi yükle; dosya yoksa None döndür
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            header = json.loads(data["header"].tobytes().decode("utf-8"))
+            index = cls(header["k1"], header["b"])
+            ids, tfs = data["ids"], data["tfs"]
+            offsets = np.concatenate([[0], np.cumsum(data["lengths"])])
+            index.doc_len = data["doc_len"].astype(np.uint32)
+            index.dead = np.zeros(len(index.doc_len), dtype=bool)
+            for term_id, term in enumerate(header["terms"]):
+                index.terms[term] = term_id
+                start, end = offsets[term_id], offsets[term_id + 1]
+                index.postings_ids.append(array("I", ids[start:end].tobytes()))
+                index.postings_tfs.append(array("H", tfs[start:end].tobytes()))
+                index.dead_counts.append(0)
+            doc_terms: Dict[int, List[int]] = {int(int_id): [] for int_id in data["doc_ids"]}
+            for term_id in range(len(index.postings_ids)):
+                for int_id in index.postings_ids[term_id]:
+                    doc_terms[int_id].append(term_id)
+            index.doc_terms = {int_id: tuple(terms) for int_id, terms in doc_terms.items()}
+            index.total_len = int(index.doc_len.sum())
+        return index
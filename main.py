@@ -1,18 +1,41 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import uvicorn
 from datetime import datetime
 
-from document_processor import process_document
-from cv_parser import parse_cv
-from vector_matcher import VectorMatcher
+from document_processor import DocumentTooLargeError, process_document_info, resolve_pdf_backend
+from cv_parser import CVInfo, extract_skills, parse_cv, parse_cv_fast, parser_version, split_sections
+from artifact_cache import artifact_key, get_cache
+from bulk_ingest import (
+    ZIP_EXTRACT_DIR, ZIP_MAX_TOTAL_BYTES, BulkIngest, ZipLimitError, extract_document, extract_zip, is_supported,
+    read_source,
+)
+from summarizer import get_summarizer
+from vector_matcher import MATCH_MODES, VectorMatcher, content_hash, job_query
 from database import Database
-from notifications import NotificationService
+from notifications import NotificationDispatcher, NotificationService
+from enrichment import EnrichmentWorker
+from executors import EXECUTORS, QueueFullError, blocking_io, extraction, inference, shutdown_all, start_all
+from instrumentation import (
+    REGISTRY, REQUEST_SECONDS, SlowRequestProfiler, configure_logging, current_trace_id, reset_trace_id,
+    set_trace_id, timed,
+)
+from uploads import UPLOAD_MAX_BYTES, UploadTooLargeError, hash_upload, read_upload
+import asyncio
+import logging
 import os
+import tempfile
+import threading
+import time
+import zipfile
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from fastapi.encoders import jsonable_encoder
 
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="TalentMatch NLP API",
@@ -33,6 +56,370 @@ app.add_middleware(
 db = Database()
 vector_matcher = VectorMatcher()
 notification_service = NotificationService()
+artifact_cache = get_cache()
+
+def _resolve_contacts(candidate_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Bildirim dağıtıcısı için adayların e-posta ve telefon bilgilerini al
+    """
+    return db.get_cvs(candidate_ids, ["email", "phone"])
+
+notification_dispatcher = NotificationDispatcher(
+    notification_service, _resolve_contacts, store=db
+)
+
+# Aday indeksinin kalıcı anlık görüntüsü
+INDEX_PATH = os.getenv("INDEX_PATH", "candidate_index.faiss")
+INDEX_SNAPSHOT_EVERY = int(os.getenv("INDEX_SNAPSHOT_EVERY", "50"))
+REEMBED_BATCH_SIZE = int(os.getenv("REEMBED_BATCH_SIZE", "256"))
+# İlan indeksinin kalıcı anlık görüntüsü ve yüklemede aday -> ilan eşleştirmesi
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", "job_index.faiss")
+MATCH_JOBS_ON_UPLOAD = os.getenv("MATCH_JOBS_ON_UPLOAD", "false").lower() == "true"
+# İstek gövdesi sınırları (multipart başlıkları için küçük bir pay bırakılır)
+BULK_UPLOAD_MAX_BYTES = int(float(os.getenv("BULK_UPLOAD_MAX_MB", "200")) * 1024 * 1024)
+REQUEST_SIZE_LIMITS = {
+    "/upload-cv": UPLOAD_MAX_BYTES + 64 * 1024,
+    "/bulk-upload-cv": BULK_UPLOAD_MAX_BYTES + 64 * 1024,
+}
+
+def snapshot_index(force: bool = False):
+    """
+    Bekleyen değişiklik sayısı eşiği aştığında aday ve ilan indekslerini diske kaydet
+    """
+    pending = vector_matcher.index.pending_changes
+    if pending and (force or pending >= INDEX_SNAPSHOT_EVERY):
+        vector_matcher.save_index(INDEX_PATH)
+    # İlan sayısı ve değişiklik sıklığı düşük olduğundan ilan indeksi her değişiklikte yazılır
+    if vector_matcher.jobs.pending_changes:
+        vector_matcher.save_job_index(JOB_INDEX_PATH)
+
+def reembed_stale_candidates():
+    """
+    Gömmesi başka bir modelle üretilmiş (veya hiç olmayan ya da bölüm gömmeleri eksik) adayları
+    toplu olarak yeniden kodla. Arka plan iş parçacığında çalışır: başarısız olan toplu iş günlüğe
+    yazılıp bu turda atlanır (adaylar bir sonraki açılışta yeniden denenir), diğerleri işlenmeye devam eder.
+    """
+    failed = []
+    while True:
+        try:
+            candidates = db.get_candidates_with_stale_embeddings(
+                vector_matcher.model_name, REEMBED_BATCH_SIZE, require_sections=vector_matcher.section_embeddings,
+                exclude=failed,
+            )
+        except Exception:
+            logger.exception("Gömmesi eskimiş adaylar alınamadı; yeniden kodlama durduruldu")
+            break
+        if not candidates:
+            break
+        try:
+            # Toplu iş süresi ve hataları talentmatch_stage_*{stage="reembed"} ölçümlerine yazılır
+            with timed("reembed"):
+                texts = [candidate["text"] for candidate in candidates]
+                sections = [split_sections(candidate["text"], candidate.get("summary")) for candidate in candidates]
+                for candidate, embedding in zip(candidates, vector_matcher.embedding_records(texts, sections)):
+                    candidate["embedding"] = embedding
+                    db.update_embedding(candidate["_id"], embedding)
+                vector_matcher.add_candidates(candidates)
+                snapshot_index()
+        except Exception:
+            logger.exception("%d adayın gömmesi yeniden kodlanamadı; bu turda atlanıyor", len(candidates))
+            failed.extend(candidate["_id"] for candidate in candidates)
+    if failed:
+        logger.warning("Yeniden kodlanamayan %d aday eski gömmesiyle kaldı", len(failed))
+    try:
+        snapshot_index(force=True)
+    except Exception:
+        logger.exception("Aday indeksi kaydedilemedi")
+
+def reconcile_candidate_index():
+    """
+    Diskten yüklenen indeksi veritabanıyla uzlaştır: son anlık görüntüden sonra eklenen adayları ekle,
+    silinen ya da gömmesi değişen adayları çıkar (ör. süreç kaydetmeden sonlandıysa)
+    """
+    added, removed = vector_matcher.reconcile(
+        db.iter_candidate_ids(vector_matcher.model_name),
+        lambda cv_ids: db.get_cvs(cv_ids, ["embedding", "skills", "text"]),
+        REEMBED_BATCH_SIZE,
+    )
+    if added or removed:
+        logger.info("Aday indeksi veritabanıyla uzlaştırıldı: %d aday eklendi, %d aday çıkarıldı", added, removed)
+        vector_matcher.save_index(INDEX_PATH)
+
+def rebuild_lexical_index():
+    """
+    Vektör indeksinde olup BM25 indeksinde olmayan adayları CV metinlerinden ekle
+    """
+    added = vector_matcher.index_lexical(db.iter_candidates(["text", "skills"]))
+    if added:
+        vector_matcher.save_index(INDEX_PATH)
+
+def _compute_cached(namespace: str, key: str, fn, *args):
+    """
+    Ara ürünü önbellekten al; yoksa çağıranın iş parçacığında hesapla ve önbelleğe yaz
+    """
+    value = artifact_cache.get(namespace, key)
+    if value is None:
+        value = fn(*args)
+        artifact_cache.set(namespace, key, value)
+    return value
+
+def _embed_candidate(text: str, summary: str) -> Dict:
+    """
+    CV'nin belge ve bölüm gömmelerini tek toplu kodlamayla hesapla
+    """
+    return vector_matcher.embedding_record(text, sections=split_sections(text, summary))
+
+def _enrich_candidate(cv_id: str) -> bool:
+    """
+    Ertelenmiş aşamalar: tam ayrıştırma (NER, tarihler, özet) ve gömme. Sonuçlar adaya yazılır ve
+    aday ancak bundan sonra aday indeksine eklenir; aday silinmişse False döner.
+    """
+    candidate = db.get_cv_fields(cv_id, ["text", "text_hash"])
+    if not candidate:
+        return False
+    text = candidate.get("text", "")
+    text_digest = candidate.get("text_hash") or content_hash(text)
+    parsed = _compute_cached("parsed", artifact_key(text_digest, parser_version()), _parse_cached, text, text_digest)
+    # Bölüm gömmeleri ayrıştırma sonucuna (özet, taksonomi) bağlı olduğundan anahtar ayrıştırıcı sürümünü de içerir
+    embedding = _compute_cached(
+        "embedding", artifact_key(text_digest, vector_matcher.model_name, parser_version()),
+        _embed_candidate, text, parsed["summary"]
+    )
+    if not db.complete_enrichment(cv_id, parsed, embedding):
+        return False
+    vector_matcher.add_candidate({"_id": cv_id, "embedding": embedding, "skills": parsed["skills"], "text": text})
+    snapshot_index()
+    return True
+
+enrichment_worker = EnrichmentWorker(db, _enrich_candidate)
+profiler = SlowRequestProfiler()
+
+def _cache_hit_ratio() -> float:
+    stats = artifact_cache.stats()
+    total = stats["hits"] + stats["misses"]
+    return stats["hits"] / total if total else 0.0
+
+# Okuma anında hesaplanan ölçümler: indeks boyutları, kuyruk derinlikleri ve önbellek isabetleri
+REGISTRY.callback(
+    "talentmatch_index_vectors", "İndeksteki vektör sayısı (bölüm vektörleri dahil)",
+    lambda: {("candidates",): len(vector_matcher.index), ("jobs",): len(vector_matcher.jobs)}, ["index"],
+)
+REGISTRY.callback(
+    "talentmatch_index_pending_changes", "Son anlık görüntüden beri indekse yapılan değişiklikler",
+    lambda: {
+        ("candidates",): vector_matcher.index.pending_changes, ("jobs",): vector_matcher.jobs.pending_changes
+    },
+    ["index"],
+)
+REGISTRY.callback(
+    "talentmatch_indexed_candidates", "Aday indeksindeki aday sayısı", lambda: len(vector_matcher.candidate_vectors)
+)
+REGISTRY.callback(
+    "talentmatch_lexical_documents", "BM25 indeksindeki belge sayısı", lambda: len(vector_matcher.lexical)
+)
+REGISTRY.callback(
+    "talentmatch_executor_in_flight", "Yürütücüde çalışan ve kuyrukta bekleyen iş sayısı",
+    lambda: {(executor.name,): executor.depth for executor in EXECUTORS}, ["executor"],
+)
+REGISTRY.callback(
+    "talentmatch_executor_capacity", "Yürütücü kapasitesi (çalışan + kuyruk)",
+    lambda: {(executor.name,): executor.capacity for executor in EXECUTORS}, ["executor"],
+)
+REGISTRY.callback(
+    "talentmatch_queue_depth", "Süreç içi kuyruklarda bekleyen iş sayısı",
+    lambda: {("notifications",): notification_dispatcher.depth, ("summarization",): get_summarizer().depth},
+    ["queue"],
+)
+REGISTRY.callback(
+    "talentmatch_enrichment_jobs", "Kalıcı zenginleştirme kuyruğundaki işler (duruma göre)",
+    lambda: {(status,): count for status, count in db.count_enrichment_jobs().items()}, ["status"],
+)
+REGISTRY.callback(
+    "talentmatch_enrichment_total", "Bu süreçte işlenen zenginleştirme işleri (sonuca göre)",
+    lambda: {(result,): count for result, count in enrichment_worker.stats.items()}, ["result"], kind="counter",
+)
+REGISTRY.callback(
+    "talentmatch_notification_events_total", "Bildirim dağıtıcısı olayları",
+    lambda: {(event,): count for event, count in notification_dispatcher.stats.items()}, ["event"], kind="counter",
+)
+REGISTRY.callback(
+    "talentmatch_artifact_cache_requests_total", "Ara ürün önbelleği okumaları (isabet / ıska)",
+    lambda: {("hit",): artifact_cache.stats()["hits"], ("miss",): artifact_cache.stats()["misses"]}, ["result"],
+    kind="counter",
+)
+REGISTRY.callback("talentmatch_artifact_cache_hit_ratio", "Ara ürün önbelleği isabet oranı", _cache_hit_ratio)
+REGISTRY.callback(
+    "talentmatch_artifact_cache_entries", "Ara ürün önbelleğindeki kayıt sayısı",
+    lambda: artifact_cache.stats()["entries"],
+)
+REGISTRY.callback(
+    "talentmatch_artifact_cache_bytes", "Ara ürün önbelleğinin disk boyutu", lambda: artifact_cache.stats()["bytes"]
+)
+
+@app.on_event("startup")
+def setup_logging():
+    """
+    Kök günlükçüyü izleme kimliği biçimiyle yapılandır; içe aktarmada değil uygulama açılırken
+    yapılır, böylece main'i içe aktaran araçların ve testlerin günlük ayarı değişmez
+    """
+    configure_logging()
+
+@app.on_event("startup")
+def start_executors():
+    """
+    Yürütücü havuzlarını oluştur; metin çıkarma süreçleri içe aktarmada değil burada başlatılır
+    """
+    start_all()
+
+@app.on_event("startup")
+def ensure_database_indexes():
+    db.ensure_indexes()
+
+@app.on_event("startup")
+def load_candidate_index():
+    """
+    Aday indeksini diskten yükle ve veritabanıyla uzlaştır; yoksa kayıtlı gömmelerden (ve CV metinlerinden)
+    bir kez oluştur
+    """
+    if not vector_matcher.load_index(INDEX_PATH):
+        candidates = db.iter_candidates(["embedding", "skills", "text"])
+        vector_matcher.create_index(c for c in candidates if vector_matcher.has_current_embedding(c))
+        vector_matcher.save_index(INDEX_PATH)
+    else:
+        reconcile_candidate_index()
+        if vector_matcher.lexical_coverage() < 1.0:
+            # BM25 indeksi eksik (ör. bu sürümden önce kaydedilmiş indeks); arka planda tamamla
+            threading.Thread(target=rebuild_lexical_index, daemon=True).start()
+    # Model değiştiyse eski gömmeleri arka planda yenile
+    threading.Thread(target=reembed_stale_candidates, daemon=True).start()
+
+@app.on_event("startup")
+def load_job_index():
+    """
+    İlan indeksini diskten yükle; yoksa kayıtlı ilanlardan (ve gömmelerinden) oluştur
+    """
+    if not vector_matcher.load_job_index(JOB_INDEX_PATH):
+        refreshed = _index_jobs(db.get_all_job_postings())
+        if refreshed:
+            db.update_job_embeddings(refreshed)
+        vector_matcher.save_job_index(JOB_INDEX_PATH)
+
+@app.on_event("startup")
+def warmup_summarizer():
+    """
+    Özetleme modelini ilk yüklemeden önce belleğe al
+    """
+    get_summarizer().warmup()
+
+@app.on_event("startup")
+def start_notification_dispatcher():
+    """
+    Bildirim dağıtıcısını başlat; önceki çalıştırmadan gönderilmeden kalan bildirimler de yeniden kuyruğa alınır
+    """
+    notification_dispatcher.start()
+
+@app.on_event("startup")
+def start_enrichment_worker():
+    """
+    Kalıcı kuyruktaki (önceki çalıştırmadan kalanlar dahil) zenginleştirme işlerini işlemeye başla
+    """
+    enrichment_worker.start()
+
+@app.on_event("shutdown")
+def save_candidate_index():
+    enrichment_worker.stop()
+    snapshot_index(force=True)
+    notification_dispatcher.stop()
+    shutdown_all()
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    """
+    Yürütücü kuyruğu doluysa isteği 429 ile geri çevir (geri basınç)
+    """
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Sunucu şu anda yoğun, lütfen daha sonra tekrar deneyin"},
+        headers={"Retry-After": "1"},
+    )
+
+class RequestSizeLimitMiddleware:
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Yükleme uç noktalarının gövde boyutunu sınırla. Content-Length sınırı aşıyorsa gövde okunmadan,
+        başlık yoksa (chunked aktarım) ya da yanlışsa gövde okunurken sınır aşıldığı anda 413 döner.
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if not limit:
+            await self.app(scope, receive, send)
+            return
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Gövdeyi ayrıştıran katman (FastAPI form okuma) HTTPException'ı olduğu gibi iletir
+                    raise HTTPException(status_code=413, detail="İstek gövdesi boyut sınırını aşıyor")
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as e:
+            if e.status_code != 413 or response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    @staticmethod
+    async def _reject(scope, receive, send):
+        response = JSONResponse(status_code=413, content={"detail": "İstek gövdesi boyut sınırını aşıyor"})
+        await response(scope, receive, send)
+
+app.add_middleware(RequestSizeLimitMiddleware, limits=REQUEST_SIZE_LIMITS)
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """
+    İsteğe izleme kimliği ata (geçerli bir X-Request-ID başlığı varsa o kullanılır) ve yanıtta
+    X-Trace-ID olarak döndür; süreyi rota şablonu ve durum koduyla ölç. SLOW_REQUEST_PROFILE_MS
+    ayarlıysa istek örnekleyici profil altında çalışır ve eşiği aşarsa yığınlar günlüğe yazılır.
+    """
+    incoming = request.headers.get("x-request-id", "")
+    token = set_trace_id(incoming if 0 < len(incoming) <= 128 and incoming.isprintable() else None)
+    trace_id = current_trace_id()
+    session = profiler.start()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Trace-ID"] = trace_id
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        # Eşleşmeyen yollar (404) etiket sayısını büyütmemek için tek etikette toplanır
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        REQUEST_SECONDS.observe(elapsed, method=request.method, route=route, status=status)
+        profiler.finish(session, trace_id, f"{request.method} {route}", elapsed)
+        reset_trace_id(token)
 
 # Modeller
 class JobPosting(BaseModel):
@@ -48,11 +435,24 @@ class CandidateMatch(BaseModel):
     match_percentage: float  # Eşleşme yüzdesi
     missing_skills: List[str]  # Eksik beceriler
     explanation: str  # Açıklama
+    fusion_score: Optional[float] = None  # Hibrit eşleştirmede RRF füzyon skoru (sonuçlar buna göre sıralanır)
+
+class BatchMatchRequest(BaseModel):
+    job_ids: Optional[List[str]] = None  # Boşsa tüm ilanlar yeniden eşleştirilir
 
 class MatchParameters(BaseModel):
     min_match_percentage: float = 70.0  # Minimum eşleşme yüzdesi
     required_skills: List[str] = []  # Gerekli beceriler
     preferred_skills: List[str] = []  # Tercih edilen beceriler
+    match_mode: Optional[str] = None  # "dense" veya "hybrid" (boşsa MATCH_MODE)
+
+def _check_match_mode(parameters: Optional[Dict]):
+    """
+    Eşleştirme parametrelerindeki match_mode geçerli değilse 400 döndür
+    """
+    mode = (parameters or {}).get("match_mode")
+    if mode is not None and mode not in MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"match_mode şunlardan biri olmalıdır: {', '.join(MATCH_MODES)}")
 
 # Rotalar
 @app.get("/")
@@ -60,53 +460,389 @@ async def root():
     return {"message": "TalentMatch NLP API'ye Hoş Geldiniz"}
 
 @app.post("/upload-cv")
-async def upload_cv(file: UploadFile = File(...)):
+async def upload_cv(file: UploadFile = File(...), match_jobs: bool = MATCH_JOBS_ON_UPLOAD):
     """
-    CV dosyası yükleme ve işleme (PDF/DOCX)
+    CV dosyası yükleme (PDF/DOCX). Hızlı alanlar (e-posta, telefon, beceriler) kaydedilip aday
+    "processing" durumuyla hemen döndürülür; NER, özet ve gömme arka plan kuyruğunda tamamlanır.
+    match_jobs ile zenginleştirme istek içinde yapılır ve aday için en uygun ilanlar da döndürülür.
     """
     if not file.filename.lower().endswith(('.pdf', '.docx')):
      raise HTTPException(status_code=400, detail="Sadece PDF ve DOCX dosyaları kabul edilir")
 
     try:
-        # Dosya içeriğini oku
-        file_content = await file.read()
-        
-        # Belgeyi işle
-        
+        # Starlette yüklemeyi zaten geçici dosyada biriktirir; özet ikinci bir kopya oluşturmadan oradan hesaplanır
         ext = os.path.splitext(file.filename)[1]
-        text = process_document(file_content, ext)
-        
-        # CV'yi ayrıştır
-        cv_info = parse_cv(text)
-        
-        # Veritabanına kaydet
-        cv_id = str(db.store_cv(cv_info.__dict__, file_content, file.filename))
+        content_digest = await blocking_io.run(hash_upload, file.file)
+
+        # Aynı dosya daha önce yüklendiyse mevcut adayı döndür
+        existing = await blocking_io.run(db.find_cv_by_hash, file_hash=content_digest)
+        if existing:
+            return await _existing_cv_response(existing)
+
+        # Belgeyi işle (çıkarılan metin dosya özeti ve PDF arka ucuyla önbelleğe alınır)
+        document_key = artifact_key(content_digest, resolve_pdf_backend())
+        document = await blocking_io.run(artifact_cache.get, "document", document_key)
+        if document is None:
+            content = await blocking_io.run(read_upload, file.file)
+            with timed("document_extraction"):
+                document = await extraction.run(process_document_info, content, ext)
+            await blocking_io.run(artifact_cache.set, "document", document_key, document)
+        text = document["text"]
+
+        # Farklı baytlarla aynı metni üreten dosyalar (ör. yeniden dışa aktarılmış PDF) da aynı adaydır
+        text_digest = content_hash(text)
+        existing = await blocking_io.run(db.find_cv_by_hash, text_hash=text_digest)
+        if existing:
+            return await _existing_cv_response(existing)
+
+        # Yalnızca hızlı alanları çıkar ve adayı "processing" durumuyla kaydet
+        cv_info = parse_cv_fast(text)
+        cv_data = {
+            **cv_info.__dict__, "text": text, "truncated": document["truncated"], "file_hash": content_digest,
+            "text_hash": text_digest, "status": "processing"
+        }
+        try:
+            cv_id = str(await blocking_io.run(_store_upload, cv_data, file.file, file.filename, None))
+        except DuplicateKeyError:
+            # Aynı CV eşzamanlı bir istekle kaydedildi; benzersiz özet indeksi ikinci kaydı reddeder
+            existing = await blocking_io.run(db.find_cv_by_hash, content_digest, text_digest)
+            if existing is None:
+                raise
+            return await _existing_cv_response(existing)
+
+        # Ağır aşamalar kalıcı kuyruğa alınır; aday, gömmesi hazır olunca aday indeksine eklenir
+        await blocking_io.run(db.enqueue_enrichment, cv_id)
+        if match_jobs and await inference.run(enrichment_worker.run_now, cv_id):
+            candidate = await blocking_io.run(db.get_cv_fields, cv_id, ["embedding", *CVInfo.__dataclass_fields__])
+            return {
+                "message": "CV başarıyla yüklendi ve işlendi",
+                "cv_id": cv_id,
+                "status": "ready",
+                "truncated": document["truncated"],
+                "parsed_info": jsonable_encoder({field: candidate.get(field) for field in CVInfo.__dataclass_fields__}),
+                "job_matches": await inference.run(
+                    vector_matcher.find_jobs, candidate["embedding"]["vector"], candidate.get("skills", [])
+                ),
+            }
+        enrichment_worker.notify()
 
-        
         return {
-         "message": "CV başarıyla yüklendi ve işlendi",
-         "cv_id": cv_id,
-         "parsed_info": jsonable_encoder(cv_info)
-          }
+            "message": "CV yüklendi; özet ve gömme arka planda hesaplanıyor",
+            "cv_id": cv_id,
+            "status": "processing",
+            "truncated": document["truncated"],
+            "parsed_info": jsonable_encoder(cv_info)
+        }
+    except (DocumentTooLargeError, UploadTooLargeError) as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (HTTPException, QueueFullError):
+        raise
     except Exception as e:
-     import traceback
-     traceback.print_exc()
+     logger.exception("CV yüklenirken hata oluştu: %s", file.filename)
      raise HTTPException(status_code=500, detail=str(e))
 
+def _store_upload(cv_data: Dict, source, filename: str, embedding: Dict) -> str:
+    """
+    Yüklenen dosyayı baştan GridFS'e parça parça akıtarak CV'yi kaydet
+    """
+    source.seek(0)
+    return db.store_cv(cv_data, source, filename, embedding)
+
+def _parse_cached(text: str, text_digest: str) -> Dict:
+    """
+    CV'yi ayrıştır; özet, taksonomi değişse de yeniden kullanılabilmesi için ayrıca önbelleğe alınır
+    """
+    summary_key = artifact_key(text_digest, get_summarizer().model_tag)
+    summary = artifact_cache.get("summary", summary_key)
+    cv_info = parse_cv(text, summary=summary)
+    if summary is None:
+        artifact_cache.set("summary", summary_key, cv_info.summary)
+    return cv_info.__dict__
+
+async def _existing_cv_response(existing: Dict) -> Dict:
+    """
+    Daha önce yüklenmiş CV'yi döndür; zenginleştirmesi başarısız olduysa yeniden kuyruğa al
+    (aksi halde aynı CV'nin her yüklemesi kalıcı olarak başarısız adayı döndürürdü)
+    """
+    if existing.get("status") == "failed" and await blocking_io.run(db.requeue_failed_enrichment, str(existing["_id"])):
+        existing["status"] = "processing"
+        enrichment_worker.notify()
+    return _duplicate_response(existing)
+
+def _duplicate_response(cv_data: Dict) -> Dict:
+    """
+    Daha önce yüklenmiş CV için kayıtlı adayı ve ayrıştırma sonucunu döndür
+    """
+    return {
+        "message": "Bu CV daha önce yüklenmiş",
+        "cv_id": str(cv_data["_id"]),
+        "duplicate": True,
+        "status": cv_data.get("status", "ready"),
+        "parsed_info": jsonable_encoder({field: cv_data.get(field) for field in CVInfo.__dataclass_fields__})
+    }
+
+@app.post("/bulk-upload-cv")
+async def bulk_upload_cv(files: List[UploadFile] = File(...)):
+    """
+    Çok parçalı toplu CV yükleme (PDF/DOCX dosyaları veya bunları içeren zip arşivleri). Daha önce
+    yüklenmiş dosyalar "duplicate" olarak raporlanır; metin çıkarma paylaşılan süreç havuzunda yapılır.
+    Kaydedilen adaylar "processing" durumuyla döner ve zenginleştirme kuyruğundan tamamlanır.
+    """
+    items = []
+    skipped = []
+    # Zip üyeleri istek süresince geçici dizine açılır; düz dosyalar Starlette'in biriktirdiği
+    # yükleme dosyalarından okunur, hiçbiri tümüyle belleğe alınmaz
+    workdir = tempfile.TemporaryDirectory(dir=ZIP_EXTRACT_DIR)
+    try:
+        # Açılmış boyut sınırı istek başına uygulanır ve toplu yükleme istek sınırını aşamaz
+        budget = min(ZIP_MAX_TOTAL_BYTES, BULK_UPLOAD_MAX_BYTES)
+        for file in files:
+            if file.filename.lower().endswith(".zip"):
+                try:
+                    members = await blocking_io.run(
+                        extract_zip, file.file, tempfile.mkdtemp(dir=workdir.name), max_total_bytes=budget
+                    )
+                except ZipLimitError as e:
+                    raise HTTPException(status_code=413, detail=str(e))
+                except zipfile.BadZipFile:
+                    skipped.append(file.filename)
+                    continue
+                budget -= sum(os.path.getsize(path) for _, path in members)
+                items.extend(members)
+            elif is_supported(file.filename):
+                items.append((file.filename, file.file))
+            else:
+                skipped.append(file.filename)
+
+        if not items:
+            raise HTTPException(status_code=400, detail="Sadece PDF, DOCX veya bunları içeren ZIP dosyaları kabul edilir")
+
+        batch = BulkIngest(items, db)
+        pending = await blocking_io.run(batch.pending)
+        # Metin çıkarma paylaşılan süreç havuzunda; kuyruğu doldurmamak ve bellekte en fazla çalışan
+        # sayısı kadar dosya tutmak için o kadar iş bekler
+        slots = asyncio.Semaphore(extraction.max_workers)
+
+        async def extract(i: int):
+            async with slots:
+                filename, source = items[i]
+                return await extraction.run(extract_document, (filename, await blocking_io.run(read_source, source)))
+
+        extracted = await asyncio.gather(*(extract(i) for i in pending))
+        # Adaylar hızlı alanlarla kaydedilip kuyruğa alındıktan sonra yanıt döner; NER, özet ve gömme
+        # tekli yüklemelerle aynı zenginleştirme işçilerinde tamamlanır
+        report = await blocking_io.run(batch.complete, dict(zip(pending, extracted)))
+        if report["succeeded"] or batch.requeued:
+            enrichment_worker.notify()
+        report["skipped"] = skipped
+        return report
+    except (HTTPException, QueueFullError):
+        raise
+    except Exception as e:
+        logger.exception("Toplu CV yüklemesi başarısız oldu")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        try:
+            await blocking_io.run(workdir.cleanup)
+        except QueueFullError:
+            workdir.cleanup()
+
+@app.get("/cv/{cv_id}")
+async def get_cv(cv_id: str):
+    """
+    CV meta verilerini alma (dosya içeriği olmadan)
+    """
+    cv_data = await blocking_io.run(db.get_cv_metadata, cv_id)
+    if not cv_data:
+        raise HTTPException(status_code=404, detail="CV bulunamadı")
+    return jsonable_encoder(cv_data, custom_encoder={ObjectId: str})
+
+@app.get("/cv/{cv_id}/status")
+async def get_cv_status(cv_id: str):
+    """
+    Adayın zenginleştirme durumu: processing, ready veya failed (kuyruk işinin deneme bilgileriyle)
+    """
+    cv_data = await blocking_io.run(db.get_cv_fields, cv_id, ["status", "enrichment_error", "enriched_at"])
+    if not cv_data:
+        raise HTTPException(status_code=404, detail="CV bulunamadı")
+    response = {
+        "cv_id": cv_id,
+        "status": cv_data.get("status", "ready"),
+        "indexed": cv_id in vector_matcher.index,
+    }
+    if cv_data.get("enriched_at"):
+        response["enriched_at"] = cv_data["enriched_at"]
+    job = await blocking_io.run(db.get_enrichment_job, cv_id)
+    if job:
+        response["attempts"] = job.get("attempts", 0)
+        response["error"] = job.get("error")
+    elif cv_data.get("enrichment_error"):
+        response["error"] = cv_data["enrichment_error"]
+    return jsonable_encoder(response)
+
+@app.get("/enrichment")
+async def get_enrichment_queue():
+    """
+    Zenginleştirme kuyruğunun durum sayıları ve bu süreçteki işçi istatistikleri
+    """
+    return {"queue": await blocking_io.run(db.count_enrichment_jobs), "worker": enrichment_worker.stats}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metin biçiminde ölçümler: aşama ve istek süre histogramları, hata sayaçları,
+    indeks boyutları, kuyruk derinlikleri ve önbellek isabet oranı
+    """
+    return PlainTextResponse(await blocking_io.run(REGISTRY.render), media_type="text/plain; version=0.0.4")
+
+@app.get("/cv/{cv_id}/file")
+async def download_cv_file(cv_id: str):
+    """
+    CV dosyasını GridFS'ten parça parça akıtarak indirme
+    """
+    grid_out = await blocking_io.run(db.open_cv_file, cv_id)
+    if grid_out is None:
+        raise HTTPException(status_code=404, detail="CV bulunamadı")
+    return StreamingResponse(
+        iter(lambda: grid_out.readchunk(), b""),
+        media_type=grid_out.content_type or "application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{grid_out.filename}"'},
+    )
+
+@app.get("/cv/{cv_id}/jobs")
+async def match_jobs_for_candidate(cv_id: str, k: int = 5):
+    """
+    Bir aday için en uygun iş ilanlarını ilan indeksinde bulma
+    """
+    try:
+        candidate = await blocking_io.run(db.get_cv_fields, cv_id, ["embedding", "skills", "text", "status"])
+        if not candidate:
+            raise HTTPException(status_code=404, detail="CV bulunamadı")
+        if candidate.get("status") == "processing":
+            raise HTTPException(status_code=409, detail="CV henüz işleniyor; durum için /cv/{cv_id}/status")
+        if vector_matcher.has_current_embedding(candidate):
+            vector = candidate["embedding"]["vector"]
+        else:
+            vector = (await inference.run(vector_matcher.encode, [candidate.get("text", "")]))[0]
+        return await inference.run(vector_matcher.find_jobs, vector, candidate.get("skills", []), k)
+    except (HTTPException, QueueFullError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/cv/{cv_id}")
+async def delete_cv(cv_id: str):
+    """
+    CV'yi veritabanından ve aday indeksinden silme
+    """
+    if not await blocking_io.run(db.delete_cv, cv_id):
+        raise HTTPException(status_code=404, detail="CV bulunamadı")
+    vector_matcher.remove_candidate(cv_id)
+    await blocking_io.run(snapshot_index)
+    return {"message": "CV başarıyla silindi"}
+
 @app.post("/job-posting")
 async def create_job_posting(job: JobPosting):
     """
-    Yeni iş ilanı oluşturma
+    Yeni iş ilanı oluşturma (ilan sorgusunun gömmesi bir kez hesaplanıp ilanla saklanır)
     """
+    _check_match_mode(job.matching_parameters)
     try:
-        job_id = db.store_job_posting(job.dict())
+        job_data = job.dict()
+        job_data["embedding"] = await inference.run(vector_matcher.embedding_record, job_query(job_data))
+        job_id = await blocking_io.run(db.store_job_posting, job_data)
+        await inference.run(_index_jobs, [{**job_data, "_id": job_id}])
+        await blocking_io.run(snapshot_index)
         return {
             "message": "İş ilanı başarıyla oluşturuldu",
             "job_id": job_id
         }
+    except QueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.put("/job-posting/{job_id}")
+async def update_job_posting(job_id: str, job: JobPosting):
+    """
+    İş ilanını güncelleme; saklanan sorgu gömmesi yeni içerikle yeniden hesaplanır
+    """
+    _check_match_mode(job.matching_parameters)
+    try:
+        job_data = job.dict()
+        job_data["embedding"] = await inference.run(vector_matcher.embedding_record, job_query(job_data))
+        if not await blocking_io.run(db.update_job_posting, job_id, job_data):
+            raise HTTPException(status_code=404, detail="İş ilanı bulunamadı")
+        await _reindex_job(job_id)
+        return {"message": "İş ilanı başarıyla güncellendi"}
+    except (HTTPException, QueueFullError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _job_queries(jobs: List[Dict]) -> Tuple[List[Dict], Dict[str, Dict]]:
+    """
+    İlanlardan eşleştirme sorgularını hazırla. Saklanan gömmesi eksik ya da eskimiş
+    (model veya içerik değişmiş) ilanlar tek toplu çağrıyla yeniden kodlanır;
+    (sorgular, yenilenen gömmeler) döndürülür.
+    """
+    texts = [job_query(job) for job in jobs]
+    stale = [
+        i for i, (job, text) in enumerate(zip(jobs, texts))
+        if not vector_matcher.has_current_embedding({"embedding": job.get("embedding"), "text": text})
+    ]
+    refreshed = {}
+    if stale:
+        vectors = vector_matcher.encode([texts[i] for i in stale])
+        for i, vector in zip(stale, vectors):
+            jobs[i]["embedding"] = refreshed[str(jobs[i]["_id"])] = vector_matcher.embedding_record(texts[i], vector)
+
+    queries = []
+    for job, text in zip(jobs, texts):
+        parameters = job.get("matching_parameters") or {}
+        required_skills = parameters.get("required_skills", [])
+        preferred_skills = parameters.get("preferred_skills", [])
+        queries.append({
+            "vector": job["embedding"]["vector"],
+            "min_match_percentage": parameters.get("min_match_percentage"),
+            "required_skills": required_skills,
+            "preferred_skills": preferred_skills,
+            "job_skills": extract_skills(text) + required_skills + preferred_skills,
+            # Hibrit eşleştirmede BM25 ile aranan anahtar kelimeler (yoğun sorgu metninde seyrelmesinler)
+            "keywords": [job.get("title", "")] + job.get("requirements", []) + required_skills + preferred_skills,
+            "mode": parameters.get("match_mode"),
+        })
+    return queries, refreshed
+
+def _index_jobs(jobs: List[Dict]) -> Dict[str, Dict]:
+    """
+    İlanları ilan indeksine ekle; yeniden hesaplanan gömmeleri döndür
+    """
+    queries, refreshed = _job_queries(jobs)
+    vector_matcher.add_jobs([
+        {**query, "_id": job["_id"], "title": job.get("title", ""), "company": job.get("company", "")}
+        for job, query in zip(jobs, queries)
+    ])
+    return refreshed
+
+async def _reindex_job(job_id: str):
+    """
+    Güncellenen ilanı veritabanından okuyup ilan indeksinde yenile
+    """
+    job = await blocking_io.run(db.get_job_posting, job_id)
+    if job:
+        refreshed = await inference.run(_index_jobs, [job])
+        if refreshed:
+            await blocking_io.run(db.update_job_embeddings, refreshed)
+        await blocking_io.run(snapshot_index)
+
+def _match_jobs(jobs: List[Dict]) -> Tuple[List[List[Dict]], Dict[str, Dict]]:
+    """
+    İlanları kayıtlı gömmeleriyle tek toplu aramada eşleştir
+    """
+    queries, refreshed = _job_queries(jobs)
+    return vector_matcher.find_matches_batch(queries), refreshed
+
 @app.get("/match-candidates/{job_id}")
 async def match_candidates(job_id: str):
     """
@@ -114,60 +850,97 @@ async def match_candidates(job_id: str):
     """
     try:
         # İş ilanını al
-        job = db.get_job_posting(job_id)
+        job = await blocking_io.run(db.get_job_posting, job_id)
         if not job:
             raise HTTPException(status_code=404, detail="İş ilanı bulunamadı")
         
-        # Tüm adayları al
-        candidates = db.get_all_candidates()
+        # Eşleşmeleri kalıcı aday indeksinde, ilanın saklanan gömmesi ve eşleştirme parametreleriyle bul
+        results, refreshed = await inference.run(_match_jobs, [job])
+        matches = results[0]
+        if refreshed:
+            await blocking_io.run(db.update_job_embeddings, refreshed)
         
-        # Vektör indeksi oluştur
-        vector_matcher.create_index(candidates)
-        
-        # Eşleşmeleri bul
-        matches = vector_matcher.find_matches(
-            f"{job['title']} {job['description']} {' '.join(job['requirements'])}"
-        )
-        
-        # Eşleşmeleri kaydet ve bildirimleri gönder
-        for match in matches:
-            match_id = db.store_match(job_id, match["candidate_id"], match)
-            
-            # Bildirim için aday bilgilerini al
-            candidate = db.get_cv(match["candidate_id"])
-            if candidate:
-                notification_service.send_match_notification(
-                    candidate.get("email"),
-                    candidate.get("phone"),
-                    match
-                )
+        # Eşleşmeleri kaydet ve bildirimleri kuyruğa al
+        await blocking_io.run(_store_and_notify, job_id, matches)
         
         return matches
+    except (HTTPException, QueueFullError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/match-candidates")
+async def match_candidates_batch(request: BatchMatchRequest):
+    """
+    Birden çok iş ilanını (varsayılan: tümü) tek toplu kodlama ve FAISS aramasıyla eşleştirme
+    """
+    try:
+        if request.job_ids:
+            jobs = await blocking_io.run(db.get_job_postings, request.job_ids)
+        else:
+            jobs = await blocking_io.run(db.get_all_job_postings)
+        if not jobs:
+            return {}
+
+        results, refreshed = await inference.run(_match_jobs, jobs)
+        if refreshed:
+            await blocking_io.run(db.update_job_embeddings, refreshed)
+
+        response = {}
+        for job, matches in zip(jobs, results):
+            job_id = str(job["_id"])
+            await blocking_io.run(_store_and_notify, job_id, matches)
+            response[job_id] = matches
+        return response
+    except (HTTPException, QueueFullError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _store_and_notify(job_id: str, matches: List[Dict]):
+    """
+    Eşleşmeleri kaydet ve bildirimleri arka plan dağıtıcısına kuyrukla (teslimat beklenmez)
+    """
+    db.store_matches(job_id, matches)
+    for match in matches:
+        notification_dispatcher.enqueue(job_id, match["candidate_id"], match)
+
 @app.put("/job-posting/{job_id}/parameters")
 async def update_match_parameters(job_id: str, parameters: MatchParameters):
     """
     İş ilanı için eşleştirme parametrelerini güncelleme
     """
+    _check_match_mode(parameters.dict())
     try:
-        success = db.update_match_parameters(job_id, parameters.dict())
+        success = await blocking_io.run(db.update_match_parameters, job_id, parameters.dict())
         if not success:
             raise HTTPException(status_code=404, detail="İş ilanı bulunamadı")
+        # Eşik ve beceri koşulları ilan indeksinde de güncellenir
+        await _reindex_job(job_id)
         
         return {"message": "Eşleştirme parametreleri başarıyla güncellendi"}
+    except (HTTPException, QueueFullError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/job-posting/{job_id}/matches")
-async def get_job_matches(job_id: str):
+async def get_job_matches(job_id: str, limit: int = 50, cursor: Optional[str] = None):
     """
-    Bir iş ilanı için tüm eşleşmeleri alma
+    Bir iş ilanı için eşleşmeleri yüzdeye göre sayfalayarak alma; sonraki sayfa için next_cursor kullanılır
     """
+    if not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="limit 1 ile 500 arasında olmalıdır")
     try:
-        matches = db.get_matches_for_job(job_id)
-        return matches
+        matches, next_cursor = await blocking_io.run(db.get_matches_for_job, job_id, limit, cursor)
+        return {
+            "matches": jsonable_encoder(matches, custom_encoder={ObjectId: str}),
+            "next_cursor": next_cursor
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
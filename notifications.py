@@ -1,15 +1,27 @@
+import heapq
+import logging
+import queue
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from twilio.rest import Client
 import os
 from dotenv import load_dotenv
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from instrumentation import REGISTRY, instrumented
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+NOTIFICATIONS_SENT = REGISTRY.counter(
+    "talentmatch_notifications_total", "Gönderim denemeleri (kanal ve sonuç başına)", ["channel", "result"]
+)
+
 class NotificationService:
-    def __init__(self):
+    def __init__(self, smtp_factory: Callable = smtplib.SMTP, sms_client=None):
         """
         E-posta ve SMS kimlik bilgileriyle bildirim servisini başlat
         """
@@ -18,71 +30,116 @@ class NotificationService:
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
         self.smtp_username = os.getenv("SMTP_USERNAME")
         self.smtp_password = os.getenv("SMTP_PASSWORD")
-        
+        self.smtp_use_tls = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+        self.smtp_idle_timeout = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+        self.smtp_factory = smtp_factory
+        self._smtp = None
+        self._smtp_last_used = 0.0
+        self._smtp_lock = threading.Lock()
+
         # SMS yapılandırması
         self.twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         self.twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
         self.twilio_phone_number = os.getenv("TWILIO_PHONE_NUMBER")
-        
+
         # Kimlik bilgileri varsa Twilio istemcisini başlat
-        if all([self.twilio_account_sid, self.twilio_auth_token]):
+        if sms_client is not None:
+            self.twilio_client = sms_client
+        elif all([self.twilio_account_sid, self.twilio_auth_token]):
             self.twilio_client = Client(self.twilio_account_sid, self.twilio_auth_token)
         else:
             self.twilio_client = None
-    
-    def send_email(self, to_email: str, subject: str, body: str) -> bool:
+
+    def _smtp_session(self):
         """
-        E-posta bildirimi gönder
+        Kalıcı SMTP oturumunu döndür; boşta kalmış veya kopmuşsa yeniden bağlan
         """
-        try:
-            msg = MIMEMultipart()
-            msg["From"] = self.smtp_username
-            msg["To"] = to_email
-            msg["Subject"] = subject
-            
-            msg.attach(MIMEText(body, "html"))
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+        if self._smtp is not None and time.monotonic() - self._smtp_last_used > self.smtp_idle_timeout:
+            try:
+                self._smtp.noop()
+            except smtplib.SMTPException:
+                self._close_smtp()
+        if self._smtp is None:
+            server = self.smtp_factory(self.smtp_server, self.smtp_port)
+            if self.smtp_use_tls:
                 server.starttls()
+            if self.smtp_username:
                 server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-            
-            return True
-        except Exception as e:
-            print(f"E-posta gönderilirken hata oluştu: {str(e)}")
-            return False
-    
+            self._smtp = server
+        self._smtp_last_used = time.monotonic()
+        return self._smtp
+
+    def _close_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def close(self):
+        """
+        Açık SMTP oturumunu kapat
+        """
+        with self._smtp_lock:
+            self._close_smtp()
+
+    @instrumented("notification.email")
+    def send_email(self, to_email: str, subject: str, body: str) -> bool:
+        """
+        E-posta bildirimi gönder (SMTP oturumu çağrılar arasında yeniden kullanılır)
+        """
+        msg = MIMEMultipart()
+        msg["From"] = self.smtp_username
+        msg["To"] = to_email
+        msg["Subject"] = subject
+
+        msg.attach(MIMEText(body, "html"))
+
+        with self._smtp_lock:
+            # Sunucu bağlantıyı kapatmışsa bir kez yeniden bağlanıp dene
+            for attempt in range(2):
+                try:
+                    self._smtp_session().send_message(msg)
+                    NOTIFICATIONS_SENT.inc(channel="email", result="sent")
+                    return True
+                except smtplib.SMTPServerDisconnected as e:
+                    self._close_smtp()
+                    if attempt:
+                        logger.warning("E-posta gönderilirken hata oluştu: %s", e)
+                except Exception as e:
+                    logger.warning("E-posta gönderilirken hata oluştu: %s", e)
+                    self._close_smtp()
+                    break
+        NOTIFICATIONS_SENT.inc(channel="email", result="failed")
+        return False
+
+    @instrumented("notification.sms")
     def send_sms(self, to_phone: str, message: str) -> bool:
         """
         Twilio kullanarak SMS bildirimi gönder
         """
         if not self.twilio_client:
-            print("Twilio istemcisi başlatılmamış. Kimlik bilgilerinizi kontrol edin.")
+            logger.warning("Twilio istemcisi başlatılmamış. Kimlik bilgilerinizi kontrol edin.")
             return False
-            
+
         try:
             self.twilio_client.messages.create(
                 body=message,
                 from_=self.twilio_phone_number,
                 to=to_phone
             )
+            NOTIFICATIONS_SENT.inc(channel="sms", result="sent")
             return True
         except Exception as e:
-            print(f"SMS gönderilirken hata oluştu: {str(e)}")
+            logger.warning("SMS gönderilirken hata oluştu: %s", e)
+            NOTIFICATIONS_SENT.inc(channel="sms", result="failed")
             return False
-    
-    def send_match_notification(
-        self,
-        candidate_email: str,
-        candidate_phone: Optional[str],
-        match_data: Dict
-    ) -> Dict:
+
+    def build_match_messages(self, match_data: Dict) -> Tuple[str, str, str]:
         """
-        E-posta ve/veya SMS ile eşleşme bildirimi gönder
+        Eşleşme bildirimi için (konu, e-posta gövdesi, SMS metni) oluştur
         """
-        results = {"email": False, "sms": False}
-        
-        # Bildirim içeriğini hazırla
         subject = "Yeni İş Eşleşmesi Bulundu!"
         email_body = f"""
         <h2>Yeni İş Eşleşmesi Bulundu!</h2>
@@ -93,15 +150,257 @@ class NotificationService:
         </ul>
         <p>Detayları görmek için lütfen hesabınıza giriş yapın.</p>
         """
-        
+
         sms_message = f"Yeni iş eşleşmesi bulundu! Eşleşme yüzdesi: {match_data['match_percentage']}%. Detaylar için giriş yapın."
-        
+        return subject, email_body, sms_message
+
+    def send_match_notification(
+        self,
+        candidate_email: str,
+        candidate_phone: Optional[str],
+        match_data: Dict
+    ) -> Dict:
+        """
+        E-posta ve/veya SMS ile eşleşme bildirimi gönder
+        """
+        results = {"email": False, "sms": False}
+
+        # Bildirim içeriğini hazırla
+        subject, email_body, sms_message = self.build_match_messages(match_data)
+
         # E-posta gönder
         if candidate_email:
             results["email"] = self.send_email(candidate_email, subject, email_body)
-        
+
         # Telefon numarası varsa SMS gönder
         if candidate_phone and self.twilio_client:
             results["sms"] = self.send_sms(candidate_phone, sms_message)
-        
-        return results 
\ No newline at end of file
+
+        return results
+
+
+class _Notification:
+    def __init__(self, job_id: str, candidate_id: str, match_data: Dict):
+        self.job_id = job_id
+        self.candidate_id = candidate_id
+        self.match_data = match_data
+        self.email: Optional[str] = None
+        self.phone: Optional[str] = None
+        self.resolved = False
+        self.pending: Set[str] = {"email", "sms"}
+        self.attempts = 0
+
+
+class NotificationDispatcher:
+    def __init__(
+        self,
+        service: NotificationService,
+        resolve_contacts: Callable[[List[str]], Dict[str, Dict]],
+        store=None,
+        batch_size: int = int(os.getenv("NOTIFICATION_BATCH_SIZE", "50")),
+        batch_wait: float = float(os.getenv("NOTIFICATION_BATCH_WAIT", "0.5")),
+        max_retries: int = int(os.getenv("NOTIFICATION_MAX_RETRIES", "3")),
+        backoff_base: float = float(os.getenv("NOTIFICATION_BACKOFF_BASE", "2.0")),
+        lease_seconds: float = float(os.getenv("NOTIFICATION_LEASE_SECONDS", "600")),
+    ):
+        """
+        Bildirimleri arka planda toplu ve yeniden denemeli gönderen dağıtıcıyı başlat.
+        resolve_contacts aday kimliklerinden {"email", "phone"} sözlüklerine toplu eşleme yapar.
+        store (Database) verilirse her bildirim kuyruğa alınmadan önce kalıcı olarak "pending" kaydedilip
+        kiralanır ve ancak gönderim başarılı olunca "sent" işaretlenir; kirası dolan bekleyen kayıtlar
+        (ör. süreç çöktüyse) yeniden kuyruğa alınır. Böylece her iş/aday çifti en az bir kez ve
+        tekilleştirilmiş olarak bildirilir. lease_seconds yeniden denemelerin toplam süresinden uzun olmalıdır.
+        """
+        self.service = service
+        self.resolve_contacts = resolve_contacts
+        self.store = store
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.lease_seconds = lease_seconds
+        self.stats = {
+            "enqueued": 0, "deduplicated": 0, "recovered": 0, "email_sent": 0, "sms_sent": 0, "retried": 0, "failed": 0,
+        }
+        self._queue: "queue.Queue[_Notification]" = queue.Queue()
+        self._retries: List[Tuple[float, int, _Notification]] = []
+        self._retry_seq = 0
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._next_recovery = 0.0
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def depth(self) -> int:
+        """
+        Kuyrukta, yeniden deneme bekleyen ve gönderilmekte olan bildirim sayısı
+        """
+        return self._outstanding
+
+    def start(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="notifications", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Kuyruğu boşaltmak için en fazla timeout saniye bekle ve SMTP oturumunu kapat
+        """
+        deadline = time.monotonic() + timeout
+        while self.depth and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self._stopping.set()
+        if self._worker is not None:
+            self._worker.join(timeout=max(0.0, deadline - time.monotonic()) + 1)
+        self.service.close()
+
+    def enqueue(self, job_id: str, candidate_id: str, match_data: Dict) -> bool:
+        """
+        Eşleşme bildirimini kuyruğa al; aynı iş/aday çifti zaten gönderildiyse ya da gönderilmekteyse
+        False döndür
+        """
+        job_id, candidate_id, match_data = str(job_id), str(candidate_id), dict(match_data)
+        if self.store is not None and not self.store.claim_notification(
+            job_id, candidate_id, match_data, self.lease_seconds
+        ):
+            self._count("deduplicated")
+            return False
+        self._count("enqueued")
+        self._submit(_Notification(job_id, candidate_id, match_data))
+        return True
+
+    def recover(self) -> int:
+        """
+        Kirası dolmuş bekleyen bildirimleri kalıcı depodan alıp yeniden kuyruğa koy; alınan sayıyı döndür
+        """
+        if self.store is None:
+            return 0
+        recovered = 0
+        while True:
+            rows = self.store.claim_stale_notifications(self.lease_seconds, self.batch_size)
+            for row in rows:
+                self._submit(_Notification(row["job_id"], row["candidate_id"], row.get("match_data") or {}))
+            recovered += len(rows)
+            if len(rows) < self.batch_size:
+                break
+        if recovered:
+            self._count("recovered", recovered)
+            logger.info("%d bekleyen bildirim yeniden kuyruğa alındı", recovered)
+        return recovered
+
+    def _count(self, key: str, amount: int = 1):
+        # enqueue istek iş parçacıklarından, gönderim sonuçları dağıtıcı iş parçacığından sayılır
+        with self._lock:
+            self.stats[key] += amount
+
+    def _submit(self, notification: _Notification):
+        with self._lock:
+            self._outstanding += 1
+        self._queue.put(notification)
+        self.start()
+
+    def _collect_batch(self) -> List[_Notification]:
+        """
+        Zamanı gelmiş yeniden denemeleri ve kuyruktaki yeni bildirimleri bir toplu iş olarak topla
+        """
+        batch = []
+        now = time.monotonic()
+        while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+            batch.append(heapq.heappop(self._retries)[2])
+        timeout = self.batch_wait
+        if not batch and self._retries:
+            timeout = min(timeout, max(0.0, self._retries[0][0] - now))
+        deadline = now + timeout
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            # Açılışta ve her kira süresinde bir, çökmüş süreçlerden kalan bekleyen bildirimleri topla
+            if time.monotonic() >= self._next_recovery:
+                self._next_recovery = time.monotonic() + self.lease_seconds
+                try:
+                    self.recover()
+                except Exception as e:
+                    logger.warning("Bekleyen bildirimler alınırken hata oluştu: %s", e)
+            batch = self._collect_batch()
+            if batch:
+                self._send_batch(batch)
+
+    def _send_batch(self, batch: List[_Notification]):
+        # Aday iletişim bilgilerini tek bir toplu sorguyla çöz
+        unresolved = [n for n in batch if not n.resolved]
+        if unresolved:
+            try:
+                contacts = self.resolve_contacts([n.candidate_id for n in unresolved])
+            except Exception as e:
+                logger.warning("Aday iletişim bilgileri alınırken hata oluştu: %s", e)
+                for notification in unresolved:
+                    self._schedule_retry(notification)
+                batch = [n for n in batch if n.resolved]
+                contacts = {}
+            for notification in unresolved:
+                if notification.candidate_id in contacts:
+                    contact = contacts[notification.candidate_id]
+                    notification.email = contact.get("email")
+                    notification.phone = contact.get("phone")
+                    notification.resolved = True
+
+        for notification in batch:
+            if not notification.resolved:
+                # Aday artık yok; bildirim düşürülür
+                self._finish(notification, "Aday bulunamadı")
+                continue
+            subject, email_body, sms_message = self.service.build_match_messages(notification.match_data)
+            if "email" in notification.pending:
+                if not notification.email:
+                    notification.pending.discard("email")
+                elif self.service.send_email(notification.email, subject, email_body):
+                    notification.pending.discard("email")
+                    self._count("email_sent")
+            if "sms" in notification.pending:
+                if not notification.phone or not self.service.twilio_client:
+                    notification.pending.discard("sms")
+                elif self.service.send_sms(notification.phone, sms_message):
+                    notification.pending.discard("sms")
+                    self._count("sms_sent")
+            if notification.pending:
+                self._schedule_retry(notification)
+            else:
+                self._finish(notification)
+
+    def _finish(self, notification: _Notification, error: Optional[str] = None):
+        """
+        Bildirimin sonucunu kalıcı depoya yaz; yazılamazsa kira dolunca yeniden denenir
+        """
+        try:
+            if self.store is not None:
+                if error is None:
+                    self.store.complete_notification(notification.job_id, notification.candidate_id)
+                else:
+                    self.store.fail_notification(notification.job_id, notification.candidate_id, error)
+        except Exception as e:
+            logger.warning("Bildirim durumu kaydedilirken hata oluştu: %s", e)
+        with self._lock:
+            self._outstanding -= 1
+
+    def _schedule_retry(self, notification: _Notification):
+        """
+        Başarısız bildirimi üstel bekleme ile yeniden planla; deneme hakkı bittiyse bırak
+        """
+        notification.attempts += 1
+        if notification.attempts > self.max_retries:
+            self._count("failed")
+            logger.error("Bildirim gönderilemedi: iş %s, aday %s", notification.job_id, notification.candidate_id)
+            self._finish(notification, "Gönderilemedi: " + ", ".join(sorted(notification.pending)))
+            return
+        self._count("retried")
+        delay = self.backoff_base ** notification.attempts
+        self._retry_seq += 1
+        heapq.heappush(self._retries, (time.monotonic() + delay, self._retry_seq, notification))
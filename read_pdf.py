@@ -1,8 +1,5 @@
-import pdfplumber
+from document_processor import extract_text_from_pdf as _extract_text
 
-def extract_text_from_pdf(file_path):
-    all_text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            all_text += page.extract_text() + "\n"
-    return all_text.strip()
\ No newline at end of file
+def extract_text_from_pdf(file_path, backend="pdfplumber"):
+    with open(file_path, "rb") as f:
+        return _extract_text(f.read(), backend).strip()
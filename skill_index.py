@@ -0,0 +1,130 @@
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+def normalize_skill(skill: str) -> str:
+    """
+    Beceri adını karşılaştırma için küçük harfe çevir ve boşlukları sadeleştir
+    """
+    return re.sub(r"\s+", " ", skill.strip().lower())
+
+
+def ids_to_bitmap(ids: Iterable[int]) -> np.ndarray:
+    """
+    Int kimlikleri FAISS IDSelectorBitmap ile uyumlu bayt dizisine çevir (bayt başına 8 kimlik, little-endian)
+    """
+    ids = np.fromiter(ids, dtype=np.int64) if not isinstance(ids, np.ndarray) else ids.astype(np.int64, copy=False)
+    if not len(ids):
+        return np.zeros(0, dtype=np.uint8)
+    bits = np.zeros(int(ids.max()) + 1, dtype=bool)
+    bits[ids] = True
+    return np.packbits(bits, bitorder="little")
+
+
+class SkillIndex:
+    def __init__(self):
+        """
+        Beceri sözlüğü, aday başına beceri kimliği demetleri ve beceri -> aday ters indeksi.
+        Adaylar belge vektörlerinin int kimliğiyle tutulur; posting listeleri sıralı, seyrek kimlik dizileridir.
+        """
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.rows: Dict[int, Tuple[int, ...]] = {}
+        self.postings: Dict[int, array] = {}
+
+    def _skill_id(self, skill: str) -> int:
+        skill_id = self.ids.get(skill)
+        if skill_id is None:
+            skill_id = self.ids[skill] = len(self.names)
+            self.names.append(skill)
+        return skill_id
+
+    def set(self, int_id: int, skills: Iterable[str]):
+        """
+        Adayın becerilerini kaydet ve ters indeksi güncelle
+        """
+        self.remove(int_id)
+        row = tuple(sorted({self._skill_id(normalize_skill(skill)) for skill in skills if skill.strip()}))
+        self.rows[int_id] = row
+        for skill_id in row:
+            _insert(self.postings.setdefault(skill_id, array("I")), int_id)
+
+    def get(self, int_id: int) -> List[str]:
+        return [self.names[skill_id] for skill_id in self.rows.get(int_id, ())]
+
+    def remove(self, int_id: int):
+        for skill_id in self.rows.pop(int_id, ()):
+            posting = self.postings[skill_id]
+            position = bisect_left(posting, int_id)
+            if position < len(posting) and posting[position] == int_id:
+                del posting[position]
+
+    def skill_ids(self, skills: Iterable[str]) -> Set[int]:
+        """
+        Sözlükte bulunan becerilerin kimlikleri (bilinmeyenler atlanır)
+        """
+        return {self.ids[name] for name in map(normalize_skill, skills) if name in self.ids}
+
+    def eligible(self, required_skills: Iterable[str]) -> Optional[np.ndarray]:
+        """
+        Gerekli becerilerin tümüne sahip adayların sıralı int kimlikleri; gereksinim yoksa None.
+        Sözlükte hiç görülmemiş bir beceri gerekiyorsa boş dizi döner. Kesişim en kısa listeden başlar.
+        """
+        names = {normalize_skill(skill) for skill in required_skills if skill.strip()}
+        if not names:
+            return None
+        if any(name not in self.ids for name in names):
+            return np.zeros(0, dtype=np.int64)
+        postings = sorted((self.postings.get(self.ids[name], array("I")) for name in names), key=len)
+        result = np.frombuffer(postings[0], dtype=np.uint32).astype(np.int64)
+        for posting in postings[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, np.frombuffer(posting, dtype=np.uint32), assume_unique=True)
+        return result
+
+    def missing(self, int_id: int, job_skills: Iterable[str]) -> List[str]:
+        """
+        İlanın normalize beceri kümesinde olup adayda bulunmayan beceriler
+        """
+        have = set(self.rows.get(int_id, ()))
+        missing = []
+        for name in dict.fromkeys(map(normalize_skill, job_skills)):
+            skill_id = self.ids.get(name)
+            if skill_id is None or skill_id not in have:
+                missing.append(name)
+        return missing
+
+    def overlap(self, int_id: int, skill_ids: Set[int]) -> int:
+        return len(skill_ids.intersection(self.rows.get(int_id, ())))
+
+    def to_dict(self) -> Dict:
+        return {"names": self.names, "rows": {str(int_id): list(row) for int_id, row in self.rows.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SkillIndex":
+        index = cls()
+        index.names = list(data.get("names", []))
+        index.ids = {name: skill_id for skill_id, name in enumerate(index.names)}
+        for int_id, row in data.get("rows", {}).items():
+            int_id = int(int_id)
+            index.rows[int_id] = tuple(row)
+            for skill_id in row:
+                _insert(index.postings.setdefault(skill_id, array("I")), int_id)
+        return index
+
+
+def _insert(posting: array, int_id: int):
+    """
+    Kimliği sıralı posting listesine ekle; kimlikler artan verildiğinden çoğunlukla sona eklenir
+    """
+    if not posting or posting[-1] < int_id:
+        posting.append(int_id)
+        return
+    position = bisect_left(posting, int_id)
+    if position == len(posting) or posting[position] != int_id:
+        posting.insert(position, int_id)
@@ -0,0 +1,180 @@
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from inference_backend import load_summarization_pipeline, model_tag, resolve_backend
+from instrumentation import instrumented, timed
+
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "sshleifer/distilbart-cnn-12-6")
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+SUMMARY_BATCH_WAIT_MS = float(os.getenv("SUMMARY_BATCH_WAIT_MS", "20"))
+
+
+class Summarizer:
+    def __init__(
+        self,
+        model_name: str = SUMMARY_MODEL,
+        max_batch_size: int = SUMMARY_BATCH_SIZE,
+        max_wait_ms: float = SUMMARY_BATCH_WAIT_MS,
+        max_length: int = 130,
+        min_length: int = 30,
+        backend: Optional[str] = None,
+    ):
+        """
+        Tembel yüklenen, süreç genelinde paylaşılan ve istekleri toplu işleyen özetleyiciyi başlat.
+        backend verilmezse INFERENCE_BACKEND ("torch" veya nicemlenmiş "onnx") kullanılır.
+        """
+        self.model_name = model_name
+        self.backend = resolve_backend(backend)
+        # Özet önbellek anahtarlarında kullanılan model kimliği (arka ucu da içerir)
+        self.model_tag = model_tag(model_name, self.backend)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_length = max_length
+        self.min_length = min_length
+        self._pipeline = None
+        self._load_lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._requests: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def depth(self) -> int:
+        """
+        Toplu işlenmeyi bekleyen özetleme isteği sayısı
+        """
+        return self._requests.qsize()
+
+    @property
+    def pipeline(self):
+        """
+        Özetleme modelini ilk kullanımda bir kez yükle
+        """
+        if self._pipeline is None:
+            with self._load_lock:
+                if self._pipeline is None:
+                    self._pipeline = load_summarization_pipeline(self.model_name, self.backend)
+        return self._pipeline
+
+    def warmup(self):
+        """
+        Modeli yükle ve ilk çağrının gecikmesini başlangıçta öde
+        """
+        self.summarize_chunks(["TalentMatch warms up the summarization model at startup. " * 8])
+
+    def chunk(self, text: str) -> List[str]:
+        """
+        Metni model bağlam penceresine sığan, eşit boyutlu token parçalarına böl
+        """
+        tokenizer = self.pipeline.tokenizer
+        max_tokens = tokenizer.model_max_length - tokenizer.num_special_tokens_to_add()
+        encoding = tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=tokenizer.is_fast,
+            verbose=False,
+        )
+        token_ids = encoding["input_ids"]
+        if not token_ids:
+            return []
+
+        # Kısa bir kuyruk parçası oluşmasın diye tokenleri parçalara eşit dağıt
+        chunk_count = math.ceil(len(token_ids) / max_tokens)
+        chunk_size = math.ceil(len(token_ids) / chunk_count)
+        chunks = []
+        for start in range(0, len(token_ids), chunk_size):
+            end = min(start + chunk_size, len(token_ids))
+            if tokenizer.is_fast:
+                offsets = encoding["offset_mapping"]
+                chunks.append(text[offsets[start][0]:offsets[end - 1][1]])
+            else:
+                chunks.append(tokenizer.decode(token_ids[start:end], skip_special_tokens=True))
+        return chunks
+
+    def summarize(self, text: str) -> str:
+        """
+        Metnin tüm parçalarını tek bir toplu çağrıyla özetle
+        """
+        return " ".join(self.summarize_chunks(self.chunk(text)))
+
+    @instrumented("summarization")
+    def summarize_chunks(self, chunks: List[str]) -> List[str]:
+        """
+        Parçaları toplu işleme kuyruğuna gönder ve özetleri bekle (ölçülen süre kuyruk beklemesini içerir)
+        """
+        if not chunks:
+            return []
+        future: Future = Future()
+        self._ensure_worker()
+        self._requests.put((chunks, future))
+        return future.result()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._worker_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="summarizer", daemon=True)
+                    self._worker.start()
+
+    def _collect_batch(self) -> List[Tuple[List[str], Future]]:
+        """
+        İlk isteği bekle, ardından kısa bir süre eşzamanlı yüklemelerin isteklerini topla
+        """
+        batch = [self._requests.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            chunks = [chunk for request_chunks, _ in batch for chunk in request_chunks]
+            try:
+                with timed("summarization.model_batch"):
+                    outputs = self.pipeline(
+                        chunks,
+                        batch_size=self.max_batch_size,
+                        max_length=self.max_length,
+                        min_length=self.min_length,
+                        do_sample=False,
+                        truncation=True,
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            position = 0
+            for request_chunks, future in batch:
+                summaries = outputs[position:position + len(request_chunks)]
+                position += len(request_chunks)
+                future.set_result([summary["summary_text"] for summary in summaries])
+
+
+_summarizer: Optional[Summarizer] = None
+_summarizer_lock = threading.Lock()
+
+
+def get_summarizer() -> Summarizer:
+    """
+    Süreç genelinde paylaşılan özetleyiciyi döndür
+    """
+    global _summarizer
+    if _summarizer is None:
+        with _summarizer_lock:
+            if _summarizer is None:
+                _summarizer = Summarizer()
+    return _summarizer
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class HashingEmbedder:
+    """
+    Testler için model indirmeyen, belirlenimci gömme modeli: her sözcük sabit bir boyuta
+    karma ile eşlenir, böylece ortak sözcüğü çok olan metinlerin benzerliği yüksek olur
+    """
+
+    def __init__(self, dimension: int = 64):
+        self.dimension = dimension
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts, normalize_embeddings: bool = False):
+        self.calls += 1
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                digest = hashlib.md5(word.encode("utf-8")).digest()
+                vectors[row, digest[0] % self.dimension] += 1.0
+                vectors[row, digest[1] % self.dimension] += 0.5
+            if not vectors[row].any():
+                vectors[row, 0] = 1.0
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    import vector_matcher
+
+    model = HashingEmbedder()
+    monkeypatch.setattr(vector_matcher, "load_embedder", lambda model_name, backend=None: model)
+    return model
+
+
+@pytest.fixture
+def matcher(embedder):
+    from vector_matcher import VectorMatcher
+
+    return VectorMatcher(index_type="flat", backend="torch")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    import mongomock.gridfs
+
+    import database
+
+    mongomock.gridfs.enable_gridfs_integration()
+    monkeypatch.setattr(database, "MongoClient", mongomock.MongoClient)
+    instance = database.Database()
+    instance.ensure_indexes()
+    return instance
+
+
+@pytest.fixture
+def api(embedder, monkeypatch, tmp_path):
+    """
+    main modülü mongomock ve test gömme modeliyle; açılış olayları çalıştırılmadan (model yüklenmez)
+    """
+    mongomock = pytest.importorskip("mongomock")
+    import mongomock.gridfs
+    from fastapi.testclient import TestClient
+
+    import database
+
+    mongomock.gridfs.enable_gridfs_integration()
+    monkeypatch.setattr(database, "MongoClient", mongomock.MongoClient)
+    monkeypatch.setenv("INFERENCE_BACKEND", "torch")
+    sys.modules.pop("main", None)
+    import main
+
+    from artifact_cache import ArtifactCache
+
+    monkeypatch.setattr(main, "artifact_cache", ArtifactCache(directory=None))
+    monkeypatch.setattr(main, "INDEX_PATH", str(tmp_path / "index.faiss"))
+    monkeypatch.setattr(main, "JOB_INDEX_PATH", str(tmp_path / "jobs.faiss"))
+    main.db.ensure_indexes()
+    yield main, TestClient(main.app)
+    sys.modules.pop("main", None)
@@ -0,0 +1,73 @@
+import pytest
+
+import artifact_cache
+from artifact_cache import ArtifactCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(artifact_cache.time, "time", clock)
+    return clock
+
+
+def test_evicts_least_recently_used_entries(tmp_path, clock):
+    cache = ArtifactCache(str(tmp_path), max_entries=4)
+    for key in "abcd":
+        cache.set("text", key * 8, key)
+    # "a" okunarak en yeni kullanılan olur; tahliye sırası b, c, ...
+    assert cache.get("text", "a" * 8) == "a"
+
+    cache.set("text", "e" * 8, "e")
+
+    assert cache.stats()["entries"] == 3
+    assert cache.get("text", "b" * 8) is None
+    assert cache.get("text", "c" * 8) is None
+    assert [cache.get("text", key * 8) for key in "ade"] == ["a", "d", "e"]
+
+
+def test_evicts_by_size(tmp_path, clock):
+    cache = ArtifactCache(str(tmp_path), max_bytes=400)
+    # Her kayıt yaklaşık 100 bayt; beşinci kayıt sınırı aşar ve toplam sınırın %90'ına iner
+    for key in "abcde":
+        cache.set("text", key * 8, key * 60)
+
+    assert cache.stats()["bytes"] <= 400 * 0.9
+    assert cache.get("text", "a" * 8) is None
+    assert cache.get("text", "e" * 8) == "e" * 60
+
+
+def test_expired_entries_are_misses(tmp_path, clock):
+    cache = ArtifactCache(str(tmp_path), ttl_seconds=10)
+    cache.set("summary", "k" * 8, "özet")
+    assert cache.get("summary", "k" * 8) == "özet"
+
+    clock.now += 60
+
+    assert cache.get("summary", "k" * 8) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_survive_restart(tmp_path, clock):
+    ArtifactCache(str(tmp_path)).set("parse", "k" * 8, {"skills": ["python"]})
+
+    reopened = ArtifactCache(str(tmp_path))
+
+    assert reopened.get("parse", "k" * 8) == {"skills": ["python"]}
+    assert reopened.stats()["entries"] == 1
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ArtifactCache(directory=None)
+    cache.set("text", "k" * 8, "value")
+    assert cache.get("text", "k" * 8) is None
+    assert not list(tmp_path.iterdir())
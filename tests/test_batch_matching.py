@@ -0,0 +1,61 @@
+import pytest
+
+CANDIDATES = [
+    {"_id": "c1", "text": "python django developer rest api", "skills": ["Python", "Django"]},
+    {"_id": "c2", "text": "java spring backend developer", "skills": ["Java", "Spring"]},
+    {"_id": "c3", "text": "python data scientist pandas", "skills": ["Python", "Pandas"]},
+    {"_id": "c4", "text": "registered nurse hospital care", "skills": []},
+]
+
+QUERIES = [
+    {"query": "python developer", "mode": "dense"},
+    {"query": "python developer", "required_skills": ["django"], "mode": "dense"},
+    {"query": "backend developer", "min_match_percentage": 30, "mode": "dense"},
+    {"query": "python data", "preferred_skills": ["pandas"], "keywords": ["pandas"], "mode": "hybrid"},
+]
+
+
+@pytest.fixture
+def indexed(matcher):
+    matcher.create_index(CANDIDATES)
+    return matcher
+
+
+def test_batch_matches_equal_individual_queries(indexed):
+    expected = [indexed.find_matches(k=3, **query) for query in QUERIES]
+    assert all(expected)
+
+    assert indexed.find_matches_batch(QUERIES, k=3) == expected
+
+
+def test_batch_encodes_missing_vectors_in_one_call(indexed, embedder):
+    stored = indexed.encode(["backend developer"])[0]
+    embedder.calls = 0
+
+    results = indexed.find_matches_batch(QUERIES[:2] + [{"query": "ignored", "vector": stored, "mode": "dense"}], k=3)
+
+    assert embedder.calls == 1
+    assert results[2] == indexed.find_matches("backend developer", k=3, mode="dense")
+
+
+def test_stored_job_embedding_is_reused_when_matching(api, embedder):
+    main, client = api
+    main.vector_matcher.create_index(CANDIDATES)
+    job = {
+        "title": "Python developer",
+        "description": "Django rest api",
+        "requirements": ["python"],
+        "location": "Ankara",
+        "company": "Acme",
+    }
+    job_id = client.post("/job-posting", json=job).json()["job_id"]
+    assert main.db.get_job_posting(job_id)["embedding"]["model"] == main.vector_matcher.model_name
+
+    embedder.calls = 0
+    first = client.get(f"/match-candidates/{job_id}")
+    second = client.post("/match-candidates", json={"job_ids": [job_id]})
+
+    assert first.status_code == second.status_code == 200
+    assert embedder.calls == 0
+    assert first.json()[0]["candidate_id"] == "c1"
+    assert second.json()[job_id] == first.json()
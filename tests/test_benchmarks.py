@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import _common  # noqa: E402
+import load_test  # noqa: E402
+
+
+def test_compare_flags_regressions_in_the_worse_direction():
+    baseline = {
+        "upload.p95_ms": _common.metric(100, "ms"),
+        "match.p95_ms": _common.metric(100, "ms"),
+        "recall": _common.metric(0.95, "ratio", better="higher"),
+        "throughput": _common.metric(50, "per_s", better="higher"),
+        "removed": _common.metric(10, "ms"),
+        "zero": _common.metric(0, "ratio"),
+    }
+    current = {
+        "upload.p95_ms": _common.metric(130, "ms"),
+        "match.p95_ms": _common.metric(60, "ms"),
+        "recall": _common.metric(0.70, "ratio", better="higher"),
+        "throughput": _common.metric(80, "per_s", better="higher"),
+        "zero": _common.metric(0.5, "ratio"),
+    }
+
+    regressions = _common.compare(current, baseline, tolerance=0.2)
+
+    assert [regression["metric"] for regression in regressions] == ["upload.p95_ms", "recall"]
+    assert regressions[0]["change"] == 0.3
+
+
+def test_finish_fails_on_regression_when_requested(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"metrics": {"match.p95_ms": _common.metric(100, "ms")}}))
+    output = tmp_path / "result.json"
+    args = argparse.Namespace(
+        output=str(output), baseline=str(baseline), tolerance=0.2, fail_on_regression=True
+    )
+
+    with pytest.raises(SystemExit):
+        _common.finish(args, "pipeline", {"match.p95_ms": _common.metric(150, "ms")}, {})
+
+    result = json.loads(output.read_text())
+    assert result["suite"] == "pipeline"
+    assert result["regressions"][0]["metric"] == "match.p95_ms"
+
+
+def test_summarize_ms_reports_percentiles():
+    summary = _common.summarize_ms([i / 1000 for i in range(1, 101)])
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 51.0
+    assert summary["p99_ms"] == 100.0
+
+
+class StatusClient:
+    """
+    /cv/{id}/status yanıtlarını sırayla döndüren istemci
+    """
+
+    def __init__(self, statuses):
+        self.statuses = {cv_id: list(values) for cv_id, values in statuses.items()}
+
+    def get(self, path):
+        cv_id = path.split("/")[2]
+        values = self.statuses[cv_id]
+        status = values.pop(0) if len(values) > 1 else values[0]
+        if status == 409:
+            return SimpleNamespace(status_code=409, json=lambda: {})
+        return SimpleNamespace(status_code=200, json=lambda: {"status": status})
+
+
+def test_wait_until_ready_records_enrichment_latency():
+    client = StatusClient({
+        "a": ["processing", "ready"],
+        "b": ["failed"],
+        "c": ["processing"],
+    })
+    recorder = load_test.Recorder()
+
+    counts = load_test.wait_until_ready(client, {"a": 0.0, "b": 0.0, "c": 0.0}, recorder, timeout=0.1, interval=0.01)
+
+    assert counts == {"ready": 1, "failed": 1, "timeout": 1}
+    assert len(recorder.enrichment) == 1
+
+
+def test_not_ready_responses_are_not_counted_as_errors():
+    recorder = load_test.Recorder()
+    client = SimpleNamespace(request=lambda method, path, **kwargs: SimpleNamespace(status_code=409))
+    recorder.call(client, "match", "GET", "/match-candidates/j1")
+    client = SimpleNamespace(request=lambda method, path, **kwargs: SimpleNamespace(status_code=500))
+    recorder.call(client, "match", "GET", "/match-candidates/j1")
+
+    metrics, details = {}, {}
+    recorder.report(metrics, details)
+
+    assert metrics["match.error_rate"]["value"] == 0.5
+    assert metrics["match.not_ready_rate"]["value"] == 0.5
@@ -0,0 +1,129 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from bulk_ingest import ZipLimitError, extract_zip, ingest, iter_directory
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def _docx(text, author=""):
+    from docx import Document
+
+    document = Document()
+    document.core_properties.author = author
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_extract_zip_writes_supported_members_to_disk(tmp_path):
+    archive = _zip([("a/cv.pdf", b"pdf"), ("notes.txt", b"x"), ("__MACOSX/cv.pdf", b"y"), ("../../evil.docx", b"d")])
+
+    members = extract_zip(archive, str(tmp_path))
+
+    assert [name for name, _ in members] == ["cv.pdf", "evil.docx"]
+    # Üyeler arşivdeki yoldan bağımsız olarak verilen dizine yazılır
+    assert all(os.path.dirname(path) == str(tmp_path) for _, path in members)
+    assert open(members[0][1], "rb").read() == b"pdf"
+
+
+def test_extract_zip_limits_member_count(tmp_path):
+    archive = _zip([(f"{i}.pdf", b"x") for i in range(5)])
+
+    with pytest.raises(ZipLimitError):
+        extract_zip(archive, str(tmp_path), max_members=4)
+
+
+def test_extract_zip_limits_member_and_total_size(tmp_path):
+    # 5 MB sıfır birkaç KB'a sıkışır: sınırlar sıkıştırılmış değil açılmış boyuta uygulanır
+    bomb = _zip([("a.pdf", bytes(5 * 1024 * 1024)), ("b.pdf", bytes(5 * 1024 * 1024))])
+    assert len(bomb) < 64 * 1024
+
+    with pytest.raises(ZipLimitError):
+        extract_zip(bomb, str(tmp_path), max_member_bytes=1024 * 1024)
+    with pytest.raises(ZipLimitError):
+        extract_zip(io.BytesIO(bomb), str(tmp_path), max_total_bytes=8 * 1024 * 1024)
+    assert len(extract_zip(bomb, str(tmp_path), max_total_bytes=10 * 1024 * 1024)) == 2
+
+
+def test_ingest_skips_files_already_stored(db):
+    first = _docx("Ayşe Kaya\nayse@example.com\nPython developer")
+    second = _docx("Mehmet Demir\nmehmet@example.com\nJava developer")
+
+    report = ingest([("a.docx", first), ("a-copy.docx", first)], db, workers=1)
+    assert [entry["status"] for entry in report["files"]] == ["stored", "duplicate"]
+
+    # cvler/ dizini yeniden içe aktarıldığında aynı adaylar tekrar kaydedilmez
+    report = ingest([("a.docx", first), ("b.docx", second)], db, workers=1)
+
+    assert [entry["status"] for entry in report["files"]] == ["duplicate", "stored"]
+    assert (report["succeeded"], report["duplicates"], report["failed"]) == (1, 1, 0)
+    assert db.candidates.count_documents({}) == 2
+    # Kaydedilen adaylar hızlı alanlarla "processing" durumundadır ve zenginleştirme kuyruğundadır
+    assert db.candidates.count_documents({"status": "processing", "embedding": {"$exists": False}}) == 2
+    assert db.enrichment_jobs.count_documents({"status": "pending"}) == 2
+
+
+def test_ingest_reads_directory_files_from_disk(db, tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "a.docx").write_bytes(_docx("Deniz Ak\ndeniz@example.com\nKotlin developer"))
+    (tmp_path / "notes.txt").write_text("x")
+
+    items = list(iter_directory(str(tmp_path)))
+    report = ingest(items, db, workers=1)
+
+    assert items == [("a.docx", str(tmp_path / "nested" / "a.docx"))]
+    assert report["files"][0]["status"] == "stored"
+    stored = db.get_cv(report["files"][0]["cv_id"])
+    assert stored["file_content"] == (tmp_path / "nested" / "a.docx").read_bytes()
+
+
+def test_ingest_detects_same_text_with_different_bytes(db):
+    ingest([("a.docx", _docx("Can Er\ncan@example.com\nGo developer"))], db, workers=1)
+
+    other = _docx("Can Er\ncan@example.com\nGo developer", author="export")
+    report = ingest([("b.docx", other)], db, workers=1)
+
+    assert report["files"][0]["status"] == "duplicate"
+    assert db.candidates.count_documents({}) == 1
+
+
+def test_ingest_reports_unreadable_files(db):
+    report = ingest([("broken.pdf", b"not a pdf")], db, workers=1)
+
+    assert report["files"][0]["status"] == "failed"
+    assert report["failed"] == 1
+
+
+def test_bulk_upload_endpoint_dedupes_and_limits_zip(api, monkeypatch, tmp_path):
+    main, client = api
+    monkeypatch.setattr(main, "ZIP_EXTRACT_DIR", str(tmp_path))
+    cv = _docx("Elif Şahin\nelif@example.com\nPython developer")
+    archive = _zip([("cvs/elif.docx", cv), ("cvs/other.docx", _docx("Burak Can\nburak@example.com\nRust"))])
+
+    response = client.post("/bulk-upload-cv", files=[("files", ("cvs.zip", archive, "application/zip"))])
+    assert response.status_code == 200
+    assert response.json()["succeeded"] == 2
+    stored = [entry["cv_id"] for entry in response.json()["files"]]
+    assert all(main.db.get_cv_fields(cv_id, ["status"])["status"] == "processing" for cv_id in stored)
+    assert main.db.enrichment_jobs.count_documents({"candidate_id": {"$in": stored}}) == 2
+    # Açılan zip üyeleri yanıt döndükten sonra silinir
+    assert list(tmp_path.iterdir()) == []
+
+    response = client.post("/bulk-upload-cv", files=[("files", ("elif.docx", cv, "application/octet-stream"))])
+    assert response.json()["files"][0]["status"] == "duplicate"
+
+    monkeypatch.setattr(main, "ZIP_MAX_TOTAL_BYTES", 1024)
+    response = client.post("/bulk-upload-cv", files=[("files", ("cvs.zip", archive, "application/zip"))])
+    assert response.status_code == 413
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import calibrate_scores  # noqa: E402
+
+
+def test_calibrate_places_floor_and_ceiling_on_label_quantiles():
+    negatives = [0.05, 0.10, 0.20, 0.30, 0.40]
+    positives = [0.50, 0.60, 0.70, 0.80, 0.90]
+
+    result = calibrate_scores.calibrate(positives + negatives, [1] * 5 + [0] * 5, 0.5, 1.0)
+
+    assert result["MATCH_SCORE_FLOOR"] == 0.2
+    assert result["MATCH_SCORE_CEILING"] == 0.9
+    assert result["auc"] == 1.0
+    assert result["suggested_threshold"]["f1"] == 1.0
+
+
+def test_calibrate_rejects_unseparated_labels():
+    with pytest.raises(ValueError):
+        calibrate_scores.calibrate([0.1, 0.9, 0.1, 0.9], [1, 0, 1, 0], 0.5, 0.5)
+
+
+def test_pair_similarities_score_matching_pairs_higher(matcher):
+    pairs = [
+        {"cv": "python django developer rest api", "job": "python django developer", "label": 1},
+        {"cv": "python django developer rest api", "job": "nurse hospital care", "label": 0},
+        {"cv": "registered nurse hospital patient care", "job": {"title": "nurse", "description": "hospital care", "requirements": ["patient"]}, "label": 1},
+    ]
+
+    similarities = calibrate_scores.pair_similarities(matcher, pairs)
+
+    assert similarities[0] > similarities[1]
+    assert similarities[2] > similarities[1]
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+import cv_parser
+
+CV = """Duygu Er
+duygu.er@example.com
++90 555 123 4567
+Pamukkale Üniversitesi, Bilgisayar Mühendisliği 2021
+Stajyer, XYZ Şirketi, 2024
+Python, NLP, Machine Learning"""
+
+
+class FakeNLP:
+    """
+    İlk satırı PERSON varlığı olarak işaretleyen spaCy yerine geçen boru hattı; çağrıları sayar
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.pipe_batches = []
+
+    def _doc(self, text):
+        first = text.strip().split("\n")[0]
+        return SimpleNamespace(ents=[SimpleNamespace(label_="PERSON", text=first, start_char=0)])
+
+    def __call__(self, text):
+        self.calls += 1
+        return self._doc(text)
+
+    def pipe(self, texts, n_process=1, batch_size=32):
+        texts = list(texts)
+        self.pipe_batches.append((len(texts), n_process, batch_size))
+        return (self._doc(text) for text in texts)
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    fake = FakeNLP()
+    monkeypatch.setattr(cv_parser, "_nlp", fake)
+    return fake
+
+
+def test_parse_cv_skips_ner_when_name_is_next_to_email(nlp):
+    info = cv_parser.parse_cv(CV, summary="özet")
+
+    assert nlp.calls == 0
+    assert info.name == "Duygu Er"
+    assert [entry["institution"] for entry in info.education] == ["pamukkale üniversitesi, bilgisayar mühendisliği 2021"]
+
+
+def test_parse_cv_falls_back_to_ner_once(nlp):
+    info = cv_parser.parse_cv(CV.replace("duygu.er@example.com\n", ""), summary="özet")
+
+    assert nlp.calls == 1
+    assert info.name == "Duygu Er"
+
+
+def test_name_next_to_email_skips_ner(nlp):
+    assert cv_parser.extract_name(CV) == "Duygu Er"
+    assert nlp.calls == 0
+
+
+def test_parse_cvs_pipes_only_cvs_without_email_name(nlp, monkeypatch):
+    monkeypatch.setattr(cv_parser, "generate_summaries", lambda texts: [f"özet {i}" for i in range(len(texts))])
+    no_email = "Elif Kaya\nAnkara\nPython developer"
+
+    infos = cv_parser.parse_cvs([CV, no_email, CV.replace("Duygu Er", "Can Er")], batch_size=8)
+
+    assert nlp.calls == 0
+    assert nlp.pipe_batches == [(1, 1, 8)]
+    assert [info.name for info in infos] == ["Duygu Er", "Elif Kaya", "Can Er"]
+    assert [info.summary for info in infos] == ["özet 0", "özet 1", "özet 2"]
+
+
+def test_spacy_pipeline_keeps_only_ner(monkeypatch):
+    spacy = pytest.importorskip("spacy")
+    if not spacy.util.is_package(cv_parser.SPACY_MODEL):
+        pytest.skip(f"{cv_parser.SPACY_MODEL} modeli kurulu değil")
+    monkeypatch.setattr(cv_parser, "_nlp", None)
+
+    assert cv_parser.get_nlp().pipe_names == ["ner"]
+    assert cv_parser.get_nlp() is cv_parser.get_nlp()
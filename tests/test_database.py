@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+
+
+def test_ensure_indexes_dedupes_existing_matches(db):
+    db.matches.drop_indexes()
+    old = datetime(2024, 1, 1)
+    db.matches.insert_many([
+        {"job_id": "j1", "candidate_id": "c1", "match_percentage": 40, "updated_at": old},
+        {"job_id": "j1", "candidate_id": "c1", "match_percentage": 70, "updated_at": old + timedelta(days=1)},
+        {"job_id": "j1", "candidate_id": "c1", "match_percentage": 10},
+        {"job_id": "j1", "candidate_id": "c2", "match_percentage": 55, "updated_at": old},
+    ])
+
+    db.ensure_indexes()
+
+    rows = sorted(db.matches.find({}, {"_id": 0, "candidate_id": 1, "match_percentage": 1}), key=lambda r: r["candidate_id"])
+    assert rows == [{"candidate_id": "c1", "match_percentage": 70}, {"candidate_id": "c2", "match_percentage": 55}]
+    assert any(index.get("unique") for index in db.matches.index_information().values())
+
+
+def test_store_matches_upserts_per_pair(db):
+    db.store_matches("j1", [{"candidate_id": "c1", "match_percentage": 50}])
+    db.store_matches("j1", [{"candidate_id": "c1", "match_percentage": 80}, {"candidate_id": "c2", "match_percentage": 20}])
+
+    assert db.matches.count_documents({"job_id": "j1"}) == 2
+    assert db.matches.find_one({"candidate_id": "c1"})["match_percentage"] == 80
+
+
+def test_cursor_pages_cover_ties_without_gaps_or_repeats(db):
+    percentages = [90, 75, 75, 75, 60, 60, 40, 10, 10, 5]
+    db.store_matches("j1", [
+        {"candidate_id": f"c{i}", "match_percentage": p} for i, p in enumerate(percentages)
+    ])
+    db.store_matches("j2", [{"candidate_id": "c0", "match_percentage": 99}])
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = db.get_matches_for_job("j1", limit=3, cursor=cursor)
+        pages.append(page)
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    rows = [match for page in pages for match in page]
+    assert [match["match_percentage"] for match in rows] == sorted(percentages, reverse=True)
+    assert sorted(match["candidate_id"] for match in rows) == sorted(f"c{i}" for i in range(len(percentages)))
+
+
+def test_last_full_page_has_no_cursor(db):
+    db.store_matches("j1", [{"candidate_id": f"c{i}", "match_percentage": i} for i in range(4)])
+
+    page, cursor = db.get_matches_for_job("j1", limit=4)
+
+    assert len(page) == 4 and cursor is None
+
+
+def test_invalid_cursor_is_rejected(api):
+    _, client = api
+
+    assert client.get("/job-posting/j1/matches?cursor=bm90LWEtY3Vyc29y").status_code == 400
+    assert client.get("/job-posting/j1/matches?limit=0").status_code == 400
+
+
+def store_candidate(db, **fields):
+    cv_data = {"name": "Ayşe Kaya", "email": "ayse@example.com", "text": "python " * 50, **fields}
+    return db.store_cv(cv_data, b"%PDF-1.4 cv", "cv.pdf", embedding={"vector": [0.1] * 4, "model": "m"})
+
+
+def test_metadata_reads_skip_file_and_large_fields(db):
+    cv_id = store_candidate(db)
+
+    metadata = db.get_cv_metadata(cv_id)
+    contacts = db.get_cvs([cv_id], ["email"])
+    listed = db.get_cvs([cv_id])
+
+    assert metadata["name"] == "Ayşe Kaya"
+    assert not {"text", "embedding", "file_content"} & set(metadata)
+    assert set(contacts[cv_id]) == {"_id", "email"}
+    assert not {"text", "embedding"} & set(listed[cv_id])
+    assert db.get_cv(cv_id)["file_content"] == b"%PDF-1.4 cv"
+
+
+def test_cv_endpoint_does_not_read_gridfs(api, monkeypatch):
+    main, client = api
+    cv_id = store_candidate(main.db)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("GridFS okunmamalı")
+
+    monkeypatch.setattr(main.db.fs, "get", fail)
+    response = client.get(f"/cv/{cv_id}")
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "ayse@example.com"
+    assert "text" not in response.json() and "file_content" not in response.json()
+
+
+def test_iter_candidates_projects_fields_and_filters(db):
+    for i in range(5):
+        store_candidate(db, skills=["Python"], email=f"c{i}@example.com")
+    db.candidates.update_one({}, {"$set": {"embedding.model": "other"}})
+
+    rows = list(db.iter_candidates(["skills"], batch_size=2))
+    ids = list(db.iter_candidate_ids("m"))
+
+    assert len(rows) == 5
+    assert all(set(row) == {"_id", "skills"} for row in rows)
+    assert len(ids) == 4
+
+
+def test_create_index_consumes_candidates_in_batches(matcher, monkeypatch):
+    consumed = []
+
+    def candidates():
+        for i in range(5):
+            consumed.append(i)
+            yield {"_id": f"c{i}", "text": f"python developer {i}", "skills": ["Python"]}
+
+    batches = []
+    add_candidates = matcher.add_candidates
+    monkeypatch.setattr(matcher, "add_candidates", lambda batch: (batches.append(len(consumed)), add_candidates(batch)))
+
+    matcher.create_index(candidates(), batch_size=2)
+
+    # Her parça, imleçten yalnızca o parça kadar aday okunduktan sonra eklenir
+    assert batches == [2, 4, 5]
+    assert len(matcher.candidate_vectors) == 5
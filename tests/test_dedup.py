@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+
+def _cv(file_hash, text_hash, **fields):
+    return {"text": "cv", "skills": [], "file_hash": file_hash, "text_hash": text_hash, **fields}
+
+
+def test_hash_indexes_are_unique_and_partial(db):
+    info = db.candidates.index_information()
+
+    for field in ("file_hash", "text_hash"):
+        assert info[f"{field}_1"]["unique"]
+        assert info[f"{field}_1"]["partialFilterExpression"] == {field: {"$exists": True}}
+    # Özeti olmayan adaylar (ör. eski kayıtlar) birbiriyle çakışmaz
+    db.candidates.insert_many([{"name": "a"}, {"name": "b"}])
+
+
+def test_store_cv_rejects_duplicate_hash_and_removes_file(db):
+    db.store_cv(_cv("f1", "t1"), b"first", "a.pdf")
+
+    with pytest.raises(DuplicateKeyError):
+        db.store_cv(_cv("f2", "t1"), b"second", "b.pdf")
+
+    assert db.candidates.count_documents({}) == 1
+    assert len(db.fs.list()) == 1
+
+
+def test_store_cvs_returns_none_for_duplicates(db):
+    db.store_cv(_cv("f1", "t1"), b"first", "a.pdf")
+
+    ids = db.store_cvs([
+        (_cv("f2", "t2"), b"new", "b.pdf", None),
+        (_cv("f1", "t3"), b"same file", "c.pdf", None),
+    ])
+
+    assert ids[0] is not None and ids[1] is None
+    assert db.candidates.count_documents({}) == 2
+    assert len(db.fs.list()) == 2
+
+
+def test_existing_non_unique_index_is_replaced(db):
+    db.candidates.drop_index("file_hash_1")
+    db.candidates.create_index("file_hash", sparse=True)
+
+    db.ensure_indexes()
+
+    assert db.candidates.index_information()["file_hash_1"]["unique"]
+
+
+def test_existing_duplicates_fall_back_to_plain_index(db, caplog):
+    db.candidates.drop_index("text_hash_1")
+    db.candidates.insert_many([_cv("f1", "same"), _cv("f2", "same")])
+
+    with caplog.at_level(logging.ERROR, logger="database"):
+        db.ensure_indexes()
+
+    assert not db.candidates.index_information()["text_hash_1"].get("unique")
+    assert "text_hash" in caplog.text
+
+
+def test_failed_candidate_is_requeued(db):
+    cv_id = db.store_cv(_cv("f1", "t1", status="processing"), b"pdf", "a.pdf")
+    db.enqueue_enrichment(cv_id)
+    db.fail_enrichment(cv_id, "model error")
+
+    assert db.requeue_failed_enrichment(cv_id)
+    assert not db.requeue_failed_enrichment(cv_id)
+
+    candidate = db.get_cv_fields(cv_id, ["status", "enrichment_error"])
+    assert candidate["status"] == "processing" and "enrichment_error" not in candidate
+    job = db.get_enrichment_job(cv_id)
+    assert (job["status"], job["attempts"]) == ("pending", 0)
@@ -0,0 +1,45 @@
+import io
+
+import pytest
+
+import document_processor
+from document_processor import process_document_info
+
+
+def blank_pdf(pages: int) -> bytes:
+    PyPDF2 = pytest.importorskip("PyPDF2")
+    writer = PyPDF2.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("pages, truncated", [(2, False), (3, True)])
+def test_reports_pages_dropped_by_page_limit(monkeypatch, pages, truncated):
+    monkeypatch.setattr(document_processor, "PDF_MAX_PAGES", 2)
+    monkeypatch.setattr(document_processor, "PDF_BACKEND", "pypdf2")
+    read = []
+    original = document_processor._pypdf2_pages
+    monkeypatch.setitem(
+        document_processor.PDF_BACKENDS, "pypdf2",
+        (document_processor._pypdf2_page_count, lambda source, start, end: read.append(end) or original(source, start, end)),
+    )
+
+    document = process_document_info(blank_pdf(pages), ".pdf")
+
+    assert document["truncated"] is truncated
+    assert read == [2]
+
+
+def test_worker_process_does_not_open_nested_page_pool(monkeypatch):
+    monkeypatch.setattr(document_processor, "PDF_BACKEND", "pypdf2")
+    monkeypatch.setattr(document_processor, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(document_processor, "PDF_PAGE_WORKERS", 2)
+    monkeypatch.setattr(document_processor.multiprocessing, "parent_process", lambda: object())
+    monkeypatch.setattr(document_processor, "_get_page_pool", lambda: pytest.fail("iç içe süreç havuzu açıldı"))
+
+    document = process_document_info(blank_pdf(4), ".pdf")
+
+    assert document == {"text": "\n" * 4, "truncated": False}
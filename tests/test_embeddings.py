@@ -0,0 +1,77 @@
+import numpy as np
+
+from instrumentation import STAGE_ERRORS
+
+
+def test_index_reuses_current_embeddings_without_encoding(matcher, embedder):
+    text = "python django developer"
+    candidate = {"_id": "c1", "text": text, "embedding": matcher.embedding_record(text)}
+    candidate["embedding"]["vector"] = [0.0] * (matcher.dimension - 1) + [1.0]
+    embedder.calls = 0
+
+    matcher.create_index([candidate])
+
+    assert embedder.calls == 0
+    # Kayıtlı vektör olduğu gibi indekse girer
+    hits = matcher.index.search(np.eye(1, matcher.dimension, matcher.dimension - 1, dtype="float32"), 1)
+    assert hits[0][0] == ("c1", 1.0)
+
+
+def test_stale_embeddings_are_encoded_once_per_batch(matcher, embedder):
+    text = "python django developer"
+    current = {"_id": "c1", "text": text, "embedding": matcher.embedding_record(text)}
+    other_model = {"_id": "c2", "text": text, "embedding": {**matcher.embedding_record(text), "model": "old-model"}}
+    edited = {"_id": "c3", "text": "java developer", "embedding": matcher.embedding_record(text)}
+    missing = {"_id": "c4", "text": "nurse"}
+    embedder.calls = 0
+
+    matcher.create_index([current, other_model, edited, missing])
+
+    assert embedder.calls == 1
+    assert matcher.has_current_embedding(current)
+    assert not matcher.has_current_embedding(other_model)
+    assert not matcher.has_current_embedding(edited)
+    assert sorted(matcher.candidate_vectors) == ["c1", "c2", "c3", "c4"]
+
+
+def test_reembed_stale_candidates_updates_database_and_index(api):
+    main, _ = api
+    matcher = main.vector_matcher
+    text = "Experience\nPython developer at Acme\nSkills\nPython, Django"
+    current = main.db.candidates.insert_one({"text": text, "embedding": matcher.embedding_record(text)}).inserted_id
+    stale = main.db.candidates.insert_one({"text": text, "embedding": {"vector": [0.0], "model": "old-model"}}).inserted_id
+    processing = main.db.candidates.insert_one({"text": text, "status": "processing"}).inserted_id
+
+    main.reembed_stale_candidates()
+
+    refreshed = main.db.get_cv_fields(str(stale), ["embedding"])["embedding"]
+    assert refreshed["model"] == matcher.model_name and "sections" in refreshed
+    assert str(stale) in matcher.candidate_vectors
+    # Bölüm gömmesi olmayan güncel kayıt da tamamlanır; işlenmekte olan aday kuyruğa bırakılır
+    assert "sections" in main.db.get_cv_fields(str(current), ["embedding"])["embedding"]
+    assert "embedding" not in main.db.get_cv_fields(str(processing), ["embedding"])
+
+
+def test_reembed_skips_failing_batch_and_continues(api, monkeypatch, caplog):
+    main, _ = api
+    matcher = main.vector_matcher
+    stale = {"vector": [0.0], "model": "old-model"}
+    bad = main.db.candidates.insert_one({"text": "broken cv", "embedding": stale}).inserted_id
+    good = main.db.candidates.insert_one({"text": "python developer", "embedding": stale}).inserted_id
+    original = matcher.embedding_records
+
+    def embedding_records(texts, sections=None):
+        if "broken cv" in texts:
+            raise RuntimeError("model hatası")
+        return original(texts, sections)
+
+    monkeypatch.setattr(main, "REEMBED_BATCH_SIZE", 1)
+    monkeypatch.setattr(matcher, "embedding_records", embedding_records)
+    errors = STAGE_ERRORS.value(stage="reembed")
+
+    main.reembed_stale_candidates()
+
+    assert main.db.get_cv_fields(str(good), ["embedding"])["embedding"]["model"] == matcher.model_name
+    assert main.db.get_cv_fields(str(bad), ["embedding"])["embedding"]["model"] == "old-model"
+    assert "yeniden kodlanamadı" in caplog.text
+    assert STAGE_ERRORS.value(stage="reembed") == errors + 1
@@ -0,0 +1,87 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from enrichment import EnrichmentWorker
+
+
+def add_candidate(db) -> str:
+    cv_id = str(db.candidates.insert_one({"text": "python developer", "status": "processing"}).inserted_id)
+    db.enqueue_enrichment(cv_id)
+    return cv_id
+
+
+def test_claimed_job_is_leased_to_one_worker(db):
+    cv_id = add_candidate(db)
+
+    job = db.claim_enrichment(lease_seconds=60)
+
+    assert job["candidate_id"] == cv_id and job["status"] == "running" and job["attempts"] == 1
+    assert db.claim_enrichment(lease_seconds=60) is None
+
+
+def test_expired_lease_is_reclaimed(db):
+    cv_id = add_candidate(db)
+    db.claim_enrichment(lease_seconds=60)
+    # Kirası dolmuş, çökmüş bir işçide kalan işi taklit et
+    db.enrichment_jobs.update_one(
+        {"candidate_id": cv_id}, {"$set": {"lease_until": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+
+    job = db.claim_enrichment(lease_seconds=60)
+
+    assert job["candidate_id"] == cv_id and job["attempts"] == 2
+
+
+def test_failures_are_retried_with_backoff_then_marked_failed(db):
+    cv_id = add_candidate(db)
+
+    def enrich(candidate_id):
+        raise RuntimeError("model yüklenemedi")
+
+    worker = EnrichmentWorker(db, enrich, workers=1, max_attempts=2, backoff_base=0.0)
+
+    assert not worker.run_now(cv_id)
+    job = db.get_enrichment_job(cv_id)
+    assert job["status"] == "pending" and job["error"] == "model yüklenemedi"
+
+    assert not worker.run_now(cv_id)
+    assert db.get_enrichment_job(cv_id)["status"] == "failed"
+    candidate = db.candidates.find_one({"_id": ObjectId(cv_id)})
+    assert candidate["status"] == "failed" and candidate["enrichment_error"] == "model yüklenemedi"
+    assert worker.stats == {"completed": 0, "dropped": 0, "retried": 1, "failed": 1}
+
+
+def test_background_workers_process_each_job_once(db):
+    cv_ids = [add_candidate(db) for _ in range(20)]
+    seen = []
+    lock = threading.Lock()
+
+    def enrich(candidate_id):
+        with lock:
+            seen.append(candidate_id)
+        db.complete_enrichment(candidate_id, {}, {"vector": []})
+        return True
+
+    worker = EnrichmentWorker(db, enrich, workers=4, poll_interval=0.01)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while worker.stats["completed"] < len(cv_ids) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+
+    assert sorted(seen) == sorted(cv_ids)
+    assert db.count_enrichment_jobs() == {"pending": 0, "running": 0, "failed": 0}
+
+
+def test_deleted_candidate_drops_job(db):
+    cv_id = add_candidate(db)
+    worker = EnrichmentWorker(db, lambda candidate_id: False, workers=1)
+
+    assert not worker.run_now(cv_id)
+    assert db.get_enrichment_job(cv_id) is None
+    assert worker.stats["dropped"] == 1
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import pytest
+
+from executors import BoundedExecutor, QueueFullError
+
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor("test", max_workers=2, max_queue=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_rejects_work_beyond_workers_plus_queue(executor):
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(3)]
+    assert executor.depth == 3
+
+    with pytest.raises(QueueFullError):
+        executor.submit(release.wait)
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert executor.depth == 0
+    # Yerler iş bitince geri verilir
+    assert executor.submit(lambda: 42).result(timeout=5) == 42
+
+
+def test_run_does_not_block_event_loop(executor):
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    async def scenario():
+        task = asyncio.ensure_future(executor.run(blocking))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        # Engelleyici iş sürerken döngü başka işleri yürütebilir
+        ticks = 0
+        for _ in range(3):
+            await asyncio.sleep(0)
+            ticks += 1
+        release.set()
+        return ticks, await task
+
+    assert asyncio.run(scenario()) == (3, "done")
+
+
+def test_full_queue_returns_429(api, monkeypatch):
+    main, client = api
+    full = BoundedExecutor("blocking_io", max_workers=1, max_queue=0)
+    release = threading.Event()
+    full.submit(release.wait)
+    monkeypatch.setattr(main, "blocking_io", full)
+    try:
+        response = client.get("/cv/000000000000000000000000")
+    finally:
+        release.set()
+        full.shutdown()
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_process_pool_is_created_on_start_with_spawn_context():
+    executor = BoundedExecutor("processes", max_workers=1, max_queue=0, use_processes=True)
+    # İçe aktarmada havuz (ve çatallanmış süreç) oluşturulmaz
+    assert executor._executor is None
+    try:
+        pool = executor.start()
+        assert executor.start() is pool
+        assert pool._mp_context.get_start_method() == "spawn"
+        assert executor.submit(abs, -3).result(timeout=60) == 3
+    finally:
+        executor.shutdown()
+    assert executor._executor is None
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+CANDIDATES = [
+    {"_id": "a", "text": "frontend developer react typescript css", "skills": ["React"]},
+    {"_id": "b", "text": "backend developer python django postgres", "skills": ["Python"]},
+    {"_id": "c", "text": "data engineer kafka spark streaming pipelines", "skills": ["Kafka"]},
+    {"_id": "d", "text": "mobile developer swift kotlin", "skills": ["Swift"]},
+]
+
+
+@pytest.fixture
+def indexed(matcher):
+    matcher.create_index(CANDIDATES)
+    return matcher
+
+
+def test_rrf_rewards_candidates_found_by_both_rankings(indexed):
+    ids = indexed.index.key_to_id
+    vector = indexed.encode(["backend developer"])[0]
+
+    fused, scores = indexed._fuse([("a", 0.9), ("b", 0.5)], [(ids["c"], 7.0), (ids["b"], 3.0)], vector, None, None, None)
+
+    # b: 1/62 + 1/62 > a: 1/61 = c: 1/61 (eşitlikte yoğun sıralamadaki aday önce gelir)
+    assert [candidate_id for candidate_id, _ in fused] == ["b", "a", "c"]
+    assert scores == pytest.approx({"b": 2 / 62, "a": 1 / 61, "c": 1 / 61})
+    # Skorlar füzyon değil, kosinüs benzerliğidir; yalnızca BM25'in bulduğu adayınki FAISS'ten alınır
+    similarity = dict(fused)
+    assert similarity["b"] == 0.5
+    c_vector = indexed.encode([CANDIDATES[2]["text"]])[0]
+    cosine = float(vector @ c_vector / np.linalg.norm(vector) / np.linalg.norm(c_vector))
+    assert similarity["c"] == pytest.approx(cosine, abs=1e-5)
+
+
+def test_lexical_only_candidates_below_threshold_are_dropped(indexed):
+    ids = indexed.index.key_to_id
+    vector = indexed.encode(["frontend developer react"])[0]
+
+    fused, _ = indexed._fuse([("a", 0.9)], [(ids["c"], 7.0)], vector, 0.99, None, None)
+
+    assert [candidate_id for candidate_id, _ in fused] == ["a"]
+
+
+def test_hybrid_mode_surfaces_keyword_match_missed_by_dense(indexed):
+    vector = indexed.encode([CANDIDATES[0]["text"]])[0].tolist()
+
+    dense = indexed.find_matches("", k=1, query_vector=vector, keywords=["kafka"], mode="dense")
+    hybrid = indexed.find_matches("", k=2, query_vector=vector, keywords=["kafka"], mode="hybrid")
+
+    assert [match["candidate_id"] for match in dense] == ["a"]
+    assert "fusion_score" not in dense[0]
+    assert {match["candidate_id"] for match in hybrid} == {"a", "c"}
+    # Hibrit sonuçlar füzyon skoruna göre sıralanır ve skoru taşır
+    assert [match["fusion_score"] for match in hybrid] == sorted((match["fusion_score"] for match in hybrid), reverse=True)
+
+
+def test_dense_is_the_default_mode(indexed):
+    vector = indexed.encode([CANDIDATES[0]["text"]])[0].tolist()
+
+    assert indexed.match_mode == "dense"
+    assert indexed.find_matches("", k=1, query_vector=vector, keywords=["kafka"]) == indexed.find_matches(
+        "", k=1, query_vector=vector, keywords=["kafka"], mode="dense"
+    )
+
+
+def test_job_can_opt_into_hybrid_matching(api):
+    main, client = api
+    main.vector_matcher.create_index(CANDIDATES)
+    job = {
+        "title": "Frontend developer",
+        "description": "react typescript",
+        "requirements": ["kafka"],
+        "location": "İzmir",
+        "company": "Acme",
+    }
+
+    invalid = client.post("/job-posting", json={**job, "matching_parameters": {"match_mode": "sparse"}})
+    job_id = client.post("/job-posting", json={**job, "matching_parameters": {"match_mode": "hybrid"}}).json()["job_id"]
+    matches = client.get(f"/match-candidates/{job_id}").json()
+
+    assert invalid.status_code == 400
+    assert all("fusion_score" in match for match in matches)
+    assert "c" in [match["candidate_id"] for match in matches]
+
+
+def test_unknown_mode_is_rejected(indexed):
+    with pytest.raises(ValueError):
+        indexed.find_matches("python", mode="sparse")
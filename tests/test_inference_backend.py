@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import inference_backend
+from inference_backend import OnnxEmbedder, model_tag, resolve_backend, resolve_quantization
+
+
+def test_resolve_backend_rejects_unknown_backend():
+    assert resolve_backend("ONNX") == "onnx"
+    with pytest.raises(ValueError):
+        resolve_backend("tensorrt")
+
+
+def test_model_tag_separates_backends_and_quantization():
+    assert model_tag("all-MiniLM-L6-v2", "torch") == "all-MiniLM-L6-v2"
+    assert model_tag("all-MiniLM-L6-v2", "onnx", "none") == "all-MiniLM-L6-v2@onnx"
+    assert model_tag("all-MiniLM-L6-v2", "onnx", "avx2") == "all-MiniLM-L6-v2@onnx-int8-avx2"
+    # Farklı nicemleme hedeflerinin gömmeleri birbirinin yerine kullanılmaz
+    assert model_tag("all-MiniLM-L6-v2", "onnx", "avx512_vnni") != model_tag("all-MiniLM-L6-v2", "onnx", "avx2")
+
+
+def test_auto_quantization_follows_cpu(monkeypatch):
+    monkeypatch.setattr(inference_backend.platform, "machine", lambda: "x86_64")
+    monkeypatch.setattr(inference_backend, "_cpu_flags", lambda: {"avx2", "avx512f", "avx512_vnni"})
+    assert resolve_quantization("auto") == "avx512_vnni"
+    monkeypatch.setattr(inference_backend, "_cpu_flags", lambda: {"avx2"})
+    assert resolve_quantization("auto") == "avx2"
+    monkeypatch.setattr(inference_backend.platform, "machine", lambda: "aarch64")
+    assert resolve_quantization("auto") == "arm64"
+    with pytest.raises(ValueError):
+        resolve_quantization("avx9000")
+
+
+def test_switching_backend_marks_stored_embeddings_stale(embedder):
+    from vector_matcher import VectorMatcher
+
+    torch_matcher = VectorMatcher(index_type="flat", backend="torch")
+    candidate = {"_id": "c1", "text": "python developer"}
+    candidate["embedding"] = torch_matcher.embedding_record(candidate["text"])
+    onnx_matcher = VectorMatcher(index_type="flat", backend="onnx")
+
+    assert torch_matcher.has_current_embedding(candidate)
+    assert not onnx_matcher.has_current_embedding(candidate)
+
+
+class FakeTokenizer:
+    """
+    Her sözcüğü bir token sayar; dolgu token'ları maskede 0 olur
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        self.batches.append(list(texts))
+        lengths = [min(len(text.split()), max_length) for text in texts]
+        width = max(lengths)
+        mask = np.array([[1] * n + [0] * (width - n) for n in lengths], dtype="int64")
+        return {"input_ids": mask.copy(), "attention_mask": mask}
+
+
+class FakeOnnxModel:
+    """
+    Gizli durum olarak token konumunu döndürür; dolgu konumlarına büyük değer yazar
+    """
+
+    config = SimpleNamespace(hidden_size=2)
+
+    def __call__(self, input_ids, attention_mask):
+        positions = np.arange(input_ids.shape[1], dtype="float32")[None, :, None]
+        hidden = np.repeat(np.broadcast_to(positions, input_ids.shape + (1,)), 2, axis=2).copy()
+        hidden[attention_mask == 0] = 1000.0
+        return SimpleNamespace(last_hidden_state=hidden)
+
+
+def fake_embedder(batch_size: int = 2) -> OnnxEmbedder:
+    model = OnnxEmbedder.__new__(OnnxEmbedder)
+    model.tokenizer = FakeTokenizer()
+    model.model = FakeOnnxModel()
+    model.max_seq_length = 256
+    model.batch_size = batch_size
+    return model
+
+
+def test_onnx_encode_mean_pools_without_padding_and_keeps_input_order():
+    model = fake_embedder()
+
+    embeddings = model.encode(["a", "a b c d e", "a b c"])
+
+    # Konumların (0..n-1) ortalaması; dolgu token'ları ortalamaya girmez
+    np.testing.assert_allclose(embeddings[:, 0], [0.0, 2.0, 1.0])
+    # Benzer uzunluktaki metinler aynı gruba düşer
+    assert model.tokenizer.batches == [["a b c d e", "a b c"], ["a"]]
+
+
+def test_onnx_encode_normalizes_like_sentence_transformers():
+    model = fake_embedder()
+
+    single = model.encode("a b c", normalize_embeddings=True)
+
+    assert single.shape == (2,)
+    assert np.linalg.norm(single) == pytest.approx(1.0)
+
+
+def test_onnx_embeddings_match_torch_model():
+    pytest.importorskip("optimum.onnxruntime")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    texts = ["Senior Python developer with Django experience", "Registered nurse in a hospital ward"]
+
+    expected = sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2").encode(texts, normalize_embeddings=True)
+    actual = inference_backend.load_embedder("all-MiniLM-L6-v2", "onnx").encode(texts, normalize_embeddings=True)
+
+    assert (expected * actual).sum(axis=1).min() > 0.98
@@ -0,0 +1,111 @@
+import logging
+import time
+
+import pytest
+
+from instrumentation import Registry, SlowRequestProfiler, STAGE_ERRORS, STAGE_SECONDS, TraceIdFilter, instrumented
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram("test_seconds", "Test", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, stage="parse")
+
+    lines = registry.render().splitlines()
+
+    assert 'test_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="parse",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{stage="parse"} 4' in lines
+
+
+def test_callback_metric_is_read_at_render_time():
+    registry = Registry()
+    depth = {"value": 1}
+    registry.callback("test_depth", "Test", lambda: {("pending",): depth["value"]}, ["status"])
+    depth["value"] = 7
+
+    assert 'test_depth{status="pending"} 7' in registry.render().splitlines()
+
+
+def test_instrumented_generator_excludes_consumer_time():
+    @instrumented("test.generator")
+    def produce():
+        yield 1
+        yield 2
+
+    before = STAGE_SECONDS.count(stage="test.generator")
+    for _ in produce():
+        time.sleep(0.05)
+
+    assert STAGE_SECONDS.count(stage="test.generator") == before + 1
+    series = STAGE_SECONDS._series[("test.generator",)]
+    assert series[-2] < 0.05
+
+
+def test_instrumented_counts_errors():
+    @instrumented("test.failing")
+    def fail():
+        raise RuntimeError("hata")
+
+    before = STAGE_ERRORS.value(stage="test.failing")
+    with pytest.raises(RuntimeError):
+        fail()
+
+    assert STAGE_ERRORS.value(stage="test.failing") == before + 1
+
+
+def test_slow_request_profiler_writes_collapsed_stacks(tmp_path):
+    profiler = SlowRequestProfiler(threshold_ms=10, interval_ms=1, directory=str(tmp_path))
+    reports = []
+    profiler.add_hook(lambda trace_id, label, seconds, samples: reports.append(samples))
+
+    session = profiler.start()
+    # Aynı anda yalnızca bir istek profillenir
+    assert profiler.start() is None
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+    profiler.finish(session, "../trace", "GET /match", 0.1)
+
+    assert any("test_slow_request_profiler_writes_collapsed_stacks" in stack for stack in reports[0])
+    # İstemciden gelen izleme kimliği dizin dışına yazamaz
+    assert [path.name for path in tmp_path.iterdir()] == ["_trace.collapsed"]
+
+
+def test_metrics_endpoint_reports_requests_by_route_template(api):
+    main, client = api
+
+    response = client.get("/cv/missing-id/status", headers={"X-Request-ID": "req-42"})
+    client.get("/no/such/path")
+    metrics = client.get("/metrics")
+
+    assert response.headers["X-Trace-ID"] == "req-42"
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    lines = metrics.text.splitlines()
+    assert any(
+        line.startswith("talentmatch_http_request_seconds_count")
+        and 'route="/cv/{cv_id}/status"' in line and f'status="{response.status_code}"' in line
+        for line in lines
+    )
+    assert any('route="unmatched"' in line for line in lines)
+
+
+def test_logging_is_configured_by_startup_hook_not_import(api):
+    main, _ = api
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+
+    def has_trace_handler():
+        return any(isinstance(f, TraceIdFilter) for handler in root.handlers for f in handler.filters)
+
+    assert not has_trace_handler()
+    try:
+        main.setup_logging()
+        assert has_trace_handler()
+        assert main.app.router.on_startup[0] is main.setup_logging
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
@@ -0,0 +1,59 @@
+import pytest
+
+import keyword_extractor
+from keyword_extractor import KeywordExtractor, load_taxonomy
+
+TAXONOMY = {
+    "skills": {
+        "boundary": "word",
+        "terms": ["java", "javascript", "c++", "machine learning", "ai"],
+        "aliases": {"js": "javascript", "ml": "machine learning"},
+    },
+    "education": {"boundary": "none", "terms": ["üniversite", "lisans", "yüksek lisans"]},
+}
+
+TEXT = "Yazılım Mühendisi\nJavaScript ve Java, C++; ML ile ilgili\nBoğaziçi Üniversitesi yüksek lisans\nmaintain"
+
+
+@pytest.fixture(params=["ahocorasick", "regex"])
+def make_extractor(request, monkeypatch):
+    if request.param == "ahocorasick":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(keyword_extractor, "ahocorasick", None)
+    return KeywordExtractor
+
+
+def test_extracts_canonical_terms_with_boundaries(make_extractor):
+    matches = make_extractor(TAXONOMY).extract(TEXT)
+
+    # "ai" "maintain" içinde kelime sınırı olmadığı için eşleşmez; takma adlar kanonik ada çevrilir
+    assert matches.terms["skills"] == ["javascript", "java", "c++", "machine learning"]
+    # Eğitim terimleri kelime içinde de eşleşir; aynı konumda başlayan kısa ve uzun terimler bulunur
+    assert sorted(matches.terms["education"]) == ["lisans", "yüksek lisans", "üniversite"]
+    assert matches.line_hits == {"skills": [1], "education": [2]}
+    assert matches.lines[1].startswith("javascript")
+
+
+def test_both_matchers_agree_on_the_shipped_taxonomy(monkeypatch):
+    pytest.importorskip("ahocorasick")
+    taxonomy = load_taxonomy()
+    text = (
+        "Senior Python developer with Node.js, k8s and AWS experience.\n"
+        "Veri bilimi ve yapay zeka projeleri; CI/CD, Scrum.\n"
+        "İstanbul Teknik Üniversitesi, Bilgisayar Mühendisliği lisans"
+    )
+    automaton = KeywordExtractor(taxonomy).extract(text)
+    monkeypatch.setattr(keyword_extractor, "ahocorasick", None)
+    regex = KeywordExtractor(taxonomy).extract(text)
+
+    assert automaton.terms == regex.terms
+    assert automaton.line_hits == regex.line_hits
+    assert "kubernetes" in automaton.terms["skills"]
+
+
+def test_version_changes_with_taxonomy():
+    changed = {**TAXONOMY, "skills": {**TAXONOMY["skills"], "terms": TAXONOMY["skills"]["terms"] + ["rust"]}}
+
+    assert KeywordExtractor(TAXONOMY).version != KeywordExtractor(changed).version
+    assert KeywordExtractor(TAXONOMY).version == KeywordExtractor(dict(TAXONOMY)).version
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from lexical_index import BM25Index
+
+WORDS = "python java docker kubernetes react django flask spark sql aws linux golang rust kafka redis".split()
+
+
+def documents(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return {i: " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) for i in range(count)}
+
+
+def build(docs, **kwargs) -> BM25Index:
+    index = BM25Index(**kwargs)
+    for int_id, text in docs.items():
+        index.add(int_id, text)
+    return index
+
+
+def assert_same_results(index: BM25Index, reference: BM25Index):
+    for query in ("python docker", "rust kafka redis", "sql", "java spark aws linux"):
+        found = index.search(query, 20)
+        expected = reference.search(query, 20)
+        assert [int_id for int_id, _ in found] == [int_id for int_id, _ in expected]
+        assert [score for _, score in found] == pytest.approx([score for _, score in expected])
+
+
+def test_removed_documents_are_tombstoned_until_compaction():
+    docs = documents(50)
+    index = build(docs, compact_min=1000)
+    removed = list(range(0, 50, 3))
+    for int_id in removed:
+        index.remove(int_id)
+
+    # Posting listeleri taranmadı; silinen belgeler aramada ve df'de yine de görünmez
+    assert len(index.dead_terms) == len(removed)
+    assert_same_results(index, build({i: t for i, t in docs.items() if i not in removed}))
+
+    index.compact()
+    assert not index.dead_terms and not any(index.dead_counts)
+    assert sum(len(ids) for ids in index.postings_ids) == sum(
+        len(set(t.split())) for i, t in docs.items() if i not in removed
+    )
+
+
+def test_compaction_triggers_at_threshold():
+    index = build(documents(20), compact_min=4, compact_ratio=0.0)
+    for int_id in range(3):
+        index.remove(int_id)
+    assert len(index.dead_terms) == 3
+
+    index.remove(3)
+
+    assert not index.dead_terms
+    assert all(int_id >= 4 for ids in index.postings_ids for int_id in ids)
+
+
+def test_readding_tombstoned_id_replaces_old_postings():
+    docs = documents(30)
+    index = build(docs, compact_min=1000)
+    index.remove(5)
+    index.add(5, "haskell elixir")
+    index.add(7, "haskell ocaml")
+
+    docs[5], docs[7] = "haskell elixir", "haskell ocaml"
+    assert_same_results(index, build(docs))
+    assert [int_id for int_id, _ in index.search("elixir", 5)] == [5]
+    assert {int_id for int_id, _ in index.search("haskell", 5)} == {5, 7}
+
+
+def test_save_compacts_and_round_trips(tmp_path):
+    docs = documents(40)
+    index = build(docs, compact_min=1000)
+    for int_id in (1, 2, 3):
+        index.remove(int_id)
+    path = str(tmp_path / "bm25.npz")
+
+    index.save(path)
+    loaded = BM25Index.load(path)
+
+    assert not index.dead_terms
+    assert 1 not in loaded and 4 in loaded
+    assert_same_results(loaded, build({i: t for i, t in docs.items() if i not in (1, 2, 3)}))
+
+
+def test_common_terms_still_contribute_with_lower_weight():
+    docs = {i: "python developer" for i in range(15)}
+    docs.update({15: "java developer", 16: "golang developer"})
+    index = build(docs)
+
+    found = dict(index.search("python", 20))
+    assert set(found) == set(range(15))
+    # Sık geçen terim skora IDF ile düşük ağırlıkla katılır, nadir terim daha yüksek skor alır
+    assert index.search("golang", 1)[0][1] > max(found.values())
+    # Kesme yalnızca istenirse uygulanır
+    assert build(docs, max_df_ratio=0.5).search("python", 20) == []
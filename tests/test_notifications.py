@@ -0,0 +1,174 @@
+import smtplib
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from notifications import NotificationDispatcher, NotificationService
+
+
+class LocalSMTP(smtplib.SMTP):
+    """
+    Test sunucusu kimlik doğrulama desteklemediğinden oturum açmayı atlar
+    """
+
+    def login(self, user, password, **kwargs):
+        return None
+
+
+class StubSMS:
+    """
+    Twilio istemcisinin yerine geçer; gönderilen mesajları kaydeder, istenirse hata fırlatır
+    """
+
+    def __init__(self, fail: bool = False):
+        self.sent = []
+        self.fail = fail
+        self.messages = self
+
+    def create(self, body, from_, to):
+        if self.fail:
+            raise RuntimeError("SMS servisi yanıt vermiyor")
+        self.sent.append((to, body))
+
+
+@pytest.fixture
+def smtp_server():
+    pytest.importorskip("aiosmtpd")
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.handlers import Sink
+
+    class Inbox(Sink):
+        def __init__(self):
+            self.messages = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.messages.append(envelope)
+            return "250 OK"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield controller, inbox
+    controller.stop()
+
+
+@pytest.fixture
+def make_dispatcher(smtp_server, db, monkeypatch):
+    controller, _ = smtp_server
+    monkeypatch.setenv("SMTP_SERVER", controller.hostname)
+    monkeypatch.setenv("SMTP_PORT", str(controller.port))
+    monkeypatch.setenv("SMTP_USE_TLS", "false")
+    monkeypatch.delenv("SMTP_USERNAME", raising=False)
+    dispatchers = []
+
+    def make(sms=None, **kwargs):
+        service = NotificationService(smtp_factory=LocalSMTP, sms_client=sms or StubSMS())
+        service.smtp_username = "talentmatch@example.com"
+        dispatcher = NotificationDispatcher(
+            service,
+            lambda ids: {cid: {"email": f"{cid}@example.com", "phone": "+905550000000"} for cid in ids},
+            store=db, batch_wait=0.01, backoff_base=0.01, **kwargs
+        )
+        dispatchers.append(dispatcher)
+        return dispatcher
+
+    yield make
+    for dispatcher in dispatchers:
+        dispatcher.stop(timeout=2)
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert condition()
+
+
+def status(db, job_id, candidate_id):
+    return db.notifications.find_one({"job_id": job_id, "candidate_id": candidate_id})["status"]
+
+
+MATCH = {"match_percentage": 87.5, "missing_skills": ["docker"]}
+
+
+def test_sends_email_and_sms_then_marks_sent(make_dispatcher, smtp_server, db):
+    _, inbox = smtp_server
+    sms = StubSMS()
+    dispatcher = make_dispatcher(sms)
+
+    assert dispatcher.enqueue("j1", "c1", MATCH)
+    wait_for(lambda: dispatcher.depth == 0)
+
+    assert [message.rcpt_tos for message in inbox.messages] == [["c1@example.com"]]
+    assert sms.sent and "87.5" in sms.sent[0][1]
+    assert status(db, "j1", "c1") == "sent"
+    # Aynı çift ikinci kez bildirilmez; durum yalnızca veritabanında tutulur
+    assert not dispatcher.enqueue("j1", "c1", MATCH)
+    assert not make_dispatcher().enqueue("j1", "c1", MATCH)
+    assert len(inbox.messages) == 1
+
+
+def test_pending_claim_is_redelivered_after_lease_expires(make_dispatcher, smtp_server, db):
+    _, inbox = smtp_server
+    # Bildirimi alıp gönderemeden çöken bir süreci taklit et; tarihler milisaniye hassasiyetinde
+    # saklandığından kira geçmişe çekilir (aynı milisaniyede dolmuş sayılmaz)
+    assert db.claim_notification("j1", "c1", MATCH, lease_seconds=600)
+    db.notifications.update_one(
+        {"job_id": "j1", "candidate_id": "c1"}, {"$set": {"lease_until": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+    assert db.claim_notification("j1", "c2", MATCH, lease_seconds=600)
+
+    dispatcher = make_dispatcher()
+    dispatcher.start()
+    wait_for(lambda: status(db, "j1", "c1") == "sent")
+
+    assert dispatcher.stats["recovered"] == 1
+    assert [message.rcpt_tos for message in inbox.messages] == [["c1@example.com"]]
+    # Kirası süren kayıt başka bir süreç tarafından gönderilmekte sayılır
+    assert status(db, "j1", "c2") == "pending"
+    assert not dispatcher.enqueue("j1", "c2", MATCH)
+
+
+def test_exhausted_retries_mark_notification_failed(make_dispatcher, smtp_server, db):
+    _, inbox = smtp_server
+    dispatcher = make_dispatcher(StubSMS(fail=True), max_retries=2)
+
+    assert dispatcher.enqueue("j1", "c1", MATCH)
+    wait_for(lambda: dispatcher.depth == 0)
+
+    # E-posta bir kez gönderilir, yalnızca başarısız kanal yeniden denenir
+    assert len(inbox.messages) == 1
+    assert dispatcher.stats["retried"] == 2
+    assert dispatcher.stats["failed"] == 1
+    row = db.notifications.find_one({"job_id": "j1", "candidate_id": "c1"})
+    assert row["status"] == "failed" and "sms" in row["error"]
+    assert not dispatcher.enqueue("j1", "c1", MATCH)
+
+
+def test_stats_are_counted_under_lock_across_threads():
+    # Sık iş parçacığı geçişi kilitsiz sayaçlarda kayıp artışları görünür kılar
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    dispatcher = NotificationDispatcher(NotificationService(sms_client=StubSMS()), lambda ids: {}, batch_wait=0.01)
+    try:
+        threads = [
+            threading.Thread(target=lambda t=t: [dispatcher.enqueue(f"j{t}", f"c{i}", {}) for i in range(200)])
+            for t in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    dispatcher.stop()
+
+    assert dispatcher.stats["enqueued"] == 1600
+    assert dispatcher.depth == 0
@@ -0,0 +1,41 @@
+from vector_matcher import VectorMatcher
+
+
+def _store(db, matcher, text, skills):
+    embedding = matcher.embedding_record(text)
+    return db.store_cv({"text": text, "skills": skills, "status": "ready"}, b"%PDF", "cv.pdf", embedding)
+
+
+def _fetch(db):
+    return lambda cv_ids: db.get_cvs(cv_ids, ["embedding", "skills", "text"])
+
+
+def test_reconcile_adds_missing_and_removes_deleted(db, matcher, tmp_path):
+    kept = _store(db, matcher, "python developer", ["Python"])
+    deleted = _store(db, matcher, "java developer", ["Java"])
+    matcher.create_index(db.iter_candidates(["embedding", "skills", "text"]))
+    path = str(tmp_path / "index.faiss")
+    matcher.save_index(path)
+
+    # Anlık görüntüden sonra: bir aday silindi, biri eklendi (indeks kaydedilmeden)
+    db.delete_cv(deleted)
+    added_id = _store(db, matcher, "go developer", ["Go"])
+
+    restored = VectorMatcher(index_type="flat", backend="torch")
+    assert restored.load_index(path)
+    added, removed = restored.reconcile(db.iter_candidate_ids(restored.model_name), _fetch(db))
+
+    assert (added, removed) == (1, 1)
+    assert set(restored.candidate_vectors) == {kept, added_id}
+    assert restored.candidate_skills(added_id) == ["go"]
+    assert [m["candidate_id"] for m in restored.find_matches("go developer", k=1, mode="dense")] == [added_id]
+
+
+def test_reconcile_skips_candidates_with_stale_embeddings(db, matcher):
+    cv_id = _store(db, matcher, "python developer", ["Python"])
+    db.candidates.update_one({}, {"$set": {"text": "rewritten text"}})
+
+    added, removed = matcher.reconcile(db.iter_candidate_ids(matcher.model_name), _fetch(db))
+
+    assert (added, removed) == (0, 0)
+    assert cv_id not in matcher.candidate_vectors
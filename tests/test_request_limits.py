@@ -0,0 +1,72 @@
+import hashlib
+import io
+
+import pytest
+
+from uploads import UploadTooLargeError, hash_upload
+
+
+def multipart_chunks(size: int, chunk: int = 4096):
+    """
+    Content-Length başlığı olmadan (chunked) gönderilen çok parçalı yükleme gövdesi
+    """
+    yield (
+        b"--limit\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="cv.pdf"\r\n'
+        b"Content-Type: application/pdf\r\n\r\n"
+    )
+    for _ in range(size // chunk):
+        yield b"x" * chunk
+    yield b"\r\n--limit--\r\n"
+
+
+def test_rejects_declared_length_over_limit(api, monkeypatch):
+    main, client = api
+    monkeypatch.setitem(main.REQUEST_SIZE_LIMITS, "/upload-cv", 1024)
+
+    response = client.post("/upload-cv", files={"file": ("cv.pdf", b"x" * 4096, "application/pdf")})
+
+    assert response.status_code == 413
+
+
+def test_rejects_chunked_body_while_streaming(api, monkeypatch):
+    main, client = api
+    monkeypatch.setitem(main.REQUEST_SIZE_LIMITS, "/upload-cv", 64 * 1024)
+    read = []
+    original = main.hash_upload
+    monkeypatch.setattr(main, "hash_upload", lambda *args, **kwargs: read.append(1) or original(*args, **kwargs))
+
+    response = client.post(
+        "/upload-cv",
+        content=multipart_chunks(1024 * 1024),
+        headers={"Content-Type": "multipart/form-data; boundary=limit"},
+    )
+
+    assert response.status_code == 413
+    assert not read
+
+
+def test_small_chunked_body_reaches_handler(api, monkeypatch):
+    main, client = api
+    monkeypatch.setitem(main.REQUEST_SIZE_LIMITS, "/upload-cv", 64 * 1024)
+    read = []
+    original = main.hash_upload
+    monkeypatch.setattr(main, "hash_upload", lambda *args, **kwargs: read.append(1) or original(*args, **kwargs))
+
+    response = client.post(
+        "/upload-cv",
+        content=multipart_chunks(8 * 1024),
+        headers={"Content-Type": "multipart/form-data; boundary=limit"},
+    )
+
+    # Sınırın altındaki gövde işleyiciye ulaşır (sahte PDF içeriği orada reddedilir)
+    assert response.status_code != 413
+    assert read
+
+
+def test_hash_upload_streams_without_copy_and_rewinds():
+    source = io.BytesIO(b"x" * 5000)
+    assert hash_upload(source, max_bytes=8192, chunk_size=1024) == hashlib.sha256(b"x" * 5000).hexdigest()
+    assert source.tell() == 0
+    with pytest.raises(UploadTooLargeError):
+        hash_upload(source, max_bytes=4096, chunk_size=1024)
@@ -0,0 +1,84 @@
+JOBS = [
+    {"_id": "j1", "title": "Python developer", "query": "python django developer rest api", "job_skills": ["python", "django"]},
+    {"_id": "j2", "title": "Senior Python developer", "query": "python django developer rest api senior",
+     "required_skills": ["python", "kubernetes"]},
+    {"_id": "j3", "title": "Nurse", "query": "registered nurse hospital care"},
+    {"_id": "j4", "title": "Strict Python role", "query": "python django developer rest api", "min_match_percentage": 101},
+]
+
+
+def index_jobs(matcher, jobs=JOBS):
+    vectors = matcher.encode([job["query"] for job in jobs])
+    matcher.add_jobs([{**job, "vector": vector} for job, vector in zip(jobs, vectors)])
+
+
+def test_find_jobs_filters_by_required_skills_and_job_threshold(matcher):
+    index_jobs(matcher)
+    vector = matcher.encode(["python django developer rest api"])[0]
+
+    matches = matcher.find_jobs(vector, ["Python", "Django"], k=5)
+
+    assert [match["job_id"] for match in matches] == ["j1", "j3"]
+    assert matches[0]["match_percentage"] > matches[1]["match_percentage"]
+    assert matches[0]["missing_skills"] == []
+    # Gerekli beceri tamamlanınca ilan sonuçlara girer
+    assert "j2" in [match["job_id"] for match in matcher.find_jobs(vector, ["python", "django", "kubernetes"], k=5)]
+
+
+def test_removed_and_replaced_jobs_are_not_returned(matcher):
+    index_jobs(matcher)
+    vector = matcher.encode(["registered nurse hospital care"])[0]
+
+    assert matcher.remove_job("j3")
+    assert not matcher.remove_job("j3")
+    index_jobs(matcher, [{**JOBS[0], "title": "Ward nurse", "query": "registered nurse hospital care"}])
+
+    matches = matcher.find_jobs(vector, [], k=1)
+
+    assert [(match["job_id"], match["title"]) for match in matches] == [("j1", "Ward nurse")]
+
+
+def test_job_index_round_trips_and_resets_on_model_change(matcher, tmp_path):
+    index_jobs(matcher)
+    path = str(tmp_path / "jobs.faiss")
+    matcher.save_job_index(path)
+    vector = matcher.encode(["python django developer rest api"])[0]
+    expected = matcher.find_jobs(vector, ["python", "django"])
+
+    matcher.remove_job("j1")
+    assert matcher.load_job_index(path)
+    assert matcher.find_jobs(vector, ["python", "django"]) == expected
+
+    matcher.model_name = "another-model"
+    assert not matcher.load_job_index(path)
+    assert matcher.find_jobs(vector, ["python", "django"]) == []
+
+
+def test_candidate_jobs_endpoint(api):
+    main, client = api
+    index_jobs(main.vector_matcher)
+    text = "python django developer rest api"
+    cv_id = main.db.candidates.insert_one({
+        "text": text, "skills": ["Python", "Django"], "status": "ready",
+        "embedding": main.vector_matcher.embedding_record(text),
+    }).inserted_id
+
+    response = client.get(f"/cv/{cv_id}/jobs?k=1")
+
+    assert response.status_code == 200
+    assert [match["job_id"] for match in response.json()] == ["j1"]
+    assert client.get("/cv/000000000000000000000000/jobs").status_code == 404
+
+
+def test_find_jobs_widens_search_when_filters_drop_nearest_jobs(matcher):
+    restricted = [
+        {"_id": f"r{i}", "title": "Rust developer", "query": f"python django developer rest api {i}",
+         "required_skills": ["rust"]}
+        for i in range(10)
+    ]
+    index_jobs(matcher, restricted + [JOBS[2]])
+    vector = matcher.encode(["python django developer rest api"])[0]
+
+    # En yakın 3 ilan gerekli beceri nedeniyle elenir; arama indeks tükenene kadar genişletilir
+    assert [match["job_id"] for match in matcher.find_jobs(vector, ["python"], k=1)] == ["j3"]
+    assert matcher.find_jobs(vector, ["python"], k=1, min_match_percentage=99) == []
@@ -0,0 +1,54 @@
+import pytest
+
+
+SECTIONS = {"experience": "kubernetes terraform aws platform engineer", "skills": "python go"}
+
+
+def test_embedding_records_encode_documents_and_sections_in_one_call(matcher, embedder):
+    matcher.section_chunk_words = 3
+
+    records = matcher.embedding_records(["cv one", "cv two"], [SECTIONS, {}])
+
+    assert embedder.calls == 1
+    assert sorted(records[0]["sections"]) == ["experience#0", "experience#1", "skills#0"]
+    assert records[1]["sections"] == {}
+
+
+def test_section_vectors_are_indexed_and_collapse_to_one_match(matcher):
+    # Uzun, konu dışı belge metni bölüm vektörü sayesinde ilgili sorguda öne çıkar
+    noisy = "cooking gardening travel photography music " * 20 + SECTIONS["experience"]
+    record = matcher.embedding_record(noisy, sections=SECTIONS)
+    matcher.create_index([
+        {"_id": "c1", "text": noisy, "embedding": record},
+        {"_id": "c2", "text": "kubernetes administrator linux", "embedding": matcher.embedding_record("kubernetes administrator linux")},
+    ])
+
+    assert matcher.candidate_vectors["c1"] == ["c1", "c1#experience#0", "c1#skills#0"]
+    matches = matcher.find_matches("kubernetes terraform aws platform engineer", k=5, mode="dense")
+
+    assert [match["candidate_id"] for match in matches] == ["c1", "c2"]
+
+
+def test_aggregate_max_takes_best_section(matcher):
+    matcher.candidate_vectors = {"c1": ["c1", "c1#experience#0", "c1#education#0"]}
+    hits = [("c1#experience#0", 0.9), ("c1", 0.4), ("c1#education#0", 0.1)]
+
+    assert matcher._aggregate(hits, None) == [("c1", 0.9)]
+
+
+def test_aggregate_weighted_uses_section_weights_and_floor(matcher):
+    matcher.match_aggregation = "weighted"
+    matcher.section_weights = {"document": 1.0, "experience": 2.0, "education": 1.0}
+    matcher.candidate_vectors = {
+        "c1": ["c1", "c1#experience#0", "c1#education#0"],
+        "c2": ["c2"],
+    }
+    # c1'in eğitim bölümü getirilmedi; sorgunun en düşük skoru (0.2) kullanılır
+    hits = [("c1#experience#0", 0.9), ("c1", 0.4), ("c2", 0.5), ("c2", 0.2)]
+
+    scores = dict(matcher._aggregate(hits, None))
+
+    assert scores["c1"] == pytest.approx((0.4 + 2 * 0.9 + 0.2) / 4)
+    assert scores["c2"] == pytest.approx(0.5)
+    # Eşik verildiğinde ağırlıklı skoru eşiğin altında kalan adaylar elenir
+    assert [candidate for candidate, _ in matcher._aggregate(hits, 0.55)] == ["c1"]
@@ -0,0 +1,45 @@
+import numpy as np
+
+from skill_index import ids_to_bitmap
+from vector_matcher import VectorIndex
+
+
+def test_search_limits_results_to_allowed_bytes():
+    index = VectorIndex(8, "flat")
+    vectors = np.random.default_rng(0).normal(size=(100, 8)).astype("float32")
+    index.add([str(i) for i in range(100)], vectors)
+    allowed = ids_to_bitmap([3])
+    assert len(allowed) == 1
+
+    hits = index.search(vectors[:5], 10, allowed=allowed)
+
+    assert [[key for key, _ in row] for row in hits] == [["3"]] * 5
+
+
+def test_required_skills_exclude_ids_past_shortest_posting(matcher):
+    # "docker" yalnızca ilk adayda geçer; "python" listesi kimlik 1024'ün ötesine büyür
+    candidates = [{"_id": "c0", "text": "python docker developer", "skills": ["Python", "Docker"]}]
+    candidates += [
+        {"_id": f"c{i}", "text": f"python developer number{i}", "skills": ["Python"]}
+        for i in range(1, 1100)
+    ]
+    matcher.create_index(candidates)
+    assert matcher.index.key_to_id["c1099"] > 1024
+
+    matches = matcher.find_matches(
+        "python developer number1099", k=5, required_skills=["python", "docker"], mode="dense"
+    )
+
+    assert [match["candidate_id"] for match in matches] == ["c0"]
+
+
+def test_hybrid_fusion_filters_lexical_only_candidates(matcher):
+    candidates = [
+        {"_id": f"c{i}", "text": f"backend developer token{i}", "skills": ["Go"]}
+        for i in range(1100)
+    ]
+    matcher.create_index(candidates)
+
+    matches = matcher.find_matches("token1099", k=3, keywords=["token1099"], mode="hybrid")
+
+    assert matches[0]["candidate_id"] == "c1099"
@@ -0,0 +1,81 @@
+import numpy as np
+
+from skill_index import SkillIndex, ids_to_bitmap
+
+
+def test_eligible_intersects_sparse_postings():
+    index = SkillIndex()
+    index.set(5, ["Python", "Docker"])
+    index.set(1_000_000, ["python"])
+    index.set(70, ["python ", "docker", "AWS"])
+
+    assert index.eligible([]) is None
+    assert index.eligible(["python"]).tolist() == [5, 70, 1_000_000]
+    assert index.eligible(["Docker", "python"]).tolist() == [5, 70]
+    assert index.eligible(["kotlin"]).tolist() == []
+    # Posting listeleri yalnızca kimlikleri tutar; en büyük kimliğe göre boyutlanmaz
+    assert index.postings[index.ids["python"]].tolist() == [5, 70, 1_000_000]
+
+
+def test_remove_and_reset_keep_postings_sorted():
+    index = SkillIndex()
+    for int_id in (9, 3, 7):
+        index.set(int_id, ["go"])
+    index.set(3, ["rust"])
+    index.remove(9)
+
+    assert index.eligible(["go"]).tolist() == [7]
+    assert index.eligible(["rust"]).tolist() == [3]
+    assert index.missing(7, ["Go", "Rust"]) == ["rust"]
+
+
+def test_round_trip_through_dict():
+    index = SkillIndex()
+    index.set(2, ["sql", "python"])
+    index.set(4, ["sql"])
+
+    restored = SkillIndex.from_dict(index.to_dict())
+
+    assert restored.eligible(["sql"]).tolist() == [2, 4]
+    assert restored.get(2) == index.get(2)
+
+
+def test_ids_to_bitmap_is_little_endian_and_minimal():
+    bitmap = ids_to_bitmap(np.array([0, 9]))
+
+    assert bitmap.tolist() == [0b1, 0b10]
+    assert ids_to_bitmap([]).tolist() == []
+
+
+def test_skills_stored_once_per_candidate(matcher):
+    record = matcher.embedding_records(
+        ["python developer with docker"],
+        [{"experience": "built python services", "skills": "python docker"}],
+    )[0]
+    matcher.add_candidates([
+        {"_id": "a", "embedding": record, "skills": ["Python", "Docker"]},
+        {"_id": "b", "text": "java developer", "skills": ["Java"]},
+    ])
+
+    assert len(matcher.candidate_vectors["a"]) == 3
+    assert sorted(matcher.skills.rows) == sorted(matcher.index.key_to_id[key] for key in ("a", "b"))
+    allowed = matcher._vector_ids(matcher.skills.eligible(["python"]))
+    assert sorted(allowed.tolist()) == sorted(matcher.index.key_to_id[key] for key in matcher.candidate_vectors["a"])
+
+    matcher.remove_candidate("a")
+    assert matcher.skills.eligible(["python"]).tolist() == []
+
+
+def test_load_index_keeps_document_rows_only(matcher, tmp_path):
+    record = matcher.embedding_records(["python developer"], [{"experience": "python services"}])[0]
+    matcher.add_candidates([{"_id": "a", "embedding": record, "skills": ["Python"]}])
+    path = str(tmp_path / "index.faiss")
+    matcher.save_index(path)
+
+    from vector_matcher import VectorMatcher
+
+    restored = VectorMatcher(index_type="flat", backend="torch")
+    assert restored.load_index(path)
+    assert list(restored.skills.rows) == [restored.index.key_to_id["a"]]
+    matches = restored.find_matches("python developer", required_skills=["python"], mode="dense")
+    assert [match["candidate_id"] for match in matches] == ["a"]
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from summarizer import Summarizer
+
+
+class FakePipeline:
+    """
+    Özetleme modelinin yerine geçer; her çağrıdaki parçaları kaydeder
+    """
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+        self.tokenizer = None
+
+    def __call__(self, chunks, **kwargs):
+        self.calls.append(list(chunks))
+        if self.fail:
+            raise RuntimeError("model hatası")
+        return [{"summary_text": chunk.upper()} for chunk in chunks]
+
+
+def make_summarizer(pipeline, **kwargs) -> Summarizer:
+    instance = Summarizer(backend="torch", **kwargs)
+    instance._pipeline = pipeline
+    return instance
+
+
+def test_concurrent_requests_share_one_model_batch():
+    pipeline = FakePipeline()
+    instance = make_summarizer(pipeline, max_batch_size=16, max_wait_ms=200)
+    results = {}
+    start = threading.Barrier(4)
+
+    def request(i):
+        start.wait()
+        results[i] = instance.summarize_chunks([f"cv{i} part a", f"cv{i} part b"])
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(pipeline.calls) == 1 and len(pipeline.calls[0]) == 8
+    assert results == {i: [f"CV{i} PART A", f"CV{i} PART B"] for i in range(4)}
+
+
+def test_batch_is_capped_at_max_batch_size():
+    pipeline = FakePipeline()
+    instance = make_summarizer(pipeline, max_batch_size=2, max_wait_ms=50)
+
+    assert instance.summarize_chunks(["a", "b"]) == ["A", "B"]
+    assert instance.summarize_chunks(["c"]) == ["C"]
+    assert all(len(call) <= 2 for call in pipeline.calls)
+
+
+def test_model_errors_reach_every_waiting_request():
+    instance = make_summarizer(FakePipeline(fail=True), max_wait_ms=1)
+
+    with pytest.raises(RuntimeError, match="model hatası"):
+        instance.summarize_chunks(["a"])
+    # İşçi iş parçacığı hatadan sonra çalışmaya devam eder
+    instance._pipeline = FakePipeline()
+    assert instance.summarize_chunks(["b"]) == ["B"]
+
+
+def test_generate_summaries_batches_english_texts_only(monkeypatch):
+    pytest.importorskip("langdetect")
+    import cv_parser
+
+    class Chunker:
+        calls = []
+
+        def chunk(self, text):
+            return text.split(". ")
+
+        def summarize_chunks(self, chunks):
+            self.calls.append(chunks)
+            return [chunk[:10] for chunk in chunks]
+
+    chunker = Chunker()
+    monkeypatch.setattr(cv_parser, "get_summarizer", lambda: chunker)
+    english = "Experienced backend engineer building payment systems. Led a team of five developers"
+    turkish = "Deneyimli yazılım mühendisi, ödeme sistemleri geliştirdi ve beş kişilik ekibe liderlik etti"
+
+    summaries = cv_parser.generate_summaries([english, turkish, english])
+
+    assert len(chunker.calls) == 1 and len(chunker.calls[0]) == 4
+    assert summaries[0] == summaries[2] == "Experience Led a team"
+    assert summaries[1] == cv_parser.NON_ENGLISH_SUMMARY
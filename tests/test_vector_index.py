@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from vector_matcher import VectorIndex
+
+
+def _vectors(n, dimension=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dimension)).astype("float32")
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_min_score_search_is_bounded_by_k(index_type):
+    vectors = _vectors(500)
+    index = VectorIndex(16, index_type)
+    index.add([str(i) for i in range(500)], vectors)
+
+    hits = index.search(vectors[:3], 10, min_score=-1.0)
+
+    assert [len(row) for row in hits] == [10, 10, 10]
+
+
+def test_min_score_filters_top_k_like_exact_scan():
+    vectors = _vectors(200)
+    index = VectorIndex(16, "flat")
+    index.add([str(i) for i in range(200)], vectors)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized[:1] @ normalized.T
+
+    hits = index.search(vectors[:1], 50, min_score=0.2)[0]
+
+    expected = [str(i) for i in np.argsort(-scores[0]) if scores[0, i] >= 0.2][:50]
+    assert [key for key, _ in hits] == expected
+    assert all(score >= 0.2 for _, score in hits)
+
+
+def _clustered(n, dimension=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension))
+    return (centers[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dimension))).astype("float32")
+
+
+def test_approximate_modes_keep_recall_against_flat():
+    from vector_matcher import recall_report
+
+    vectors = _clustered(3000)
+    configs = {
+        "ivf_flat": {"index_type": "ivf_flat", "nlist": 32, "nprobe": 8},
+        "ivf_pq": {"index_type": "ivf_pq", "nlist": 32, "nprobe": 8, "pq_m": 16, "pq_nbits": 6},
+        "hnsw": {"index_type": "hnsw", "ef_search": 64},
+    }
+
+    report = {row["name"]: row for row in recall_report(vectors, vectors[:50], k=10, configs=configs)}
+
+    assert report["ivf_flat"]["recall_at_k"] >= 0.9
+    assert report["hnsw"]["recall_at_k"] >= 0.9
+    assert report["ivf_pq"]["recall_at_k"] >= 0.5
+    assert report["ivf_pq"]["memory_bytes"] < report["ivf_flat"]["memory_bytes"]
+
+
+def test_ivf_buffers_until_trained_then_moves_vectors():
+    vectors = _clustered(400)
+    index = VectorIndex(32, "ivf_flat", nlist=4)
+    keys = [str(i) for i in range(400)]
+
+    index.add(keys[:100], vectors[:100])
+    assert not index.index.is_trained and index.buffer.ntotal == 100
+    assert index.search(vectors[:1], 1)[0][0][0] == "0"
+
+    index.add(keys[100:], vectors[100:])
+    assert index.index.is_trained and index.buffer.ntotal == 0 and index.index.ntotal == 400
+    assert index.search(vectors[5:6], 1, nprobe=4)[0][0][0] == "5"
+
+
+def test_hnsw_removal_tombstones_and_survives_save(tmp_path):
+    vectors = _vectors(300)
+    index = VectorIndex(16, "hnsw")
+    index.add([str(i) for i in range(300)], vectors)
+
+    index.remove(["0", "1"])
+    assert index.tombstones == {0, 1}
+    assert "0" not in [key for key, _ in index.search(vectors[:1], 5)[0]]
+
+    path = str(tmp_path / "hnsw.faiss")
+    index.save(path)
+    loaded = VectorIndex(16, "hnsw")
+    assert loaded.load(path) == {}
+    assert loaded.tombstones == {0, 1}
+    assert [key for key, _ in loaded.search(vectors[2:3], 1)[0]] == ["2"]
+    # Farklı indeks türüyle kaydedilmiş dosya yüklenmez
+    assert VectorIndex(16, "flat").load(path) is None
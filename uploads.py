@@ -0,0 +1,52 @@
+import hashlib
+import os
+from typing import BinaryIO
+
+# Tek dosya yüklemelerinin üst sınırı ve okuma parçası boyutu
+UPLOAD_MAX_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "20")) * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
+
+
+class UploadTooLargeError(ValueError):
+    def __init__(self, max_bytes: int):
+        """
+        Yüklenen dosya boyut sınırını aştığında fırlatılır
+        """
+        super().__init__(f"Dosya boyutu sınırı aşıldı ({max_bytes / (1024 * 1024):.1f} MB)")
+        self.max_bytes = max_bytes
+
+
+def hash_upload(
+    source: BinaryIO,
+    max_bytes: int = UPLOAD_MAX_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> str:
+    """
+    Yüklenen dosyanın SHA-256 özetini kopyalamadan parça parça hesapla ve dosyayı başa sar.
+    Starlette yüklemeyi zaten geçici dosyada biriktirir; bellekte en fazla bir parça tutulur.
+    Sınır aşılırsa UploadTooLargeError fırlatılır.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        digest.update(chunk)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def read_upload(source: BinaryIO) -> bytes:
+    """
+    Yüklenen dosyanın içeriğini baştan oku ve dosyayı başa sar (süreç havuzuna gönderilecek baytlar;
+    boyutu istek sınırıyla zaten kısıtlıdır)
+    """
+    source.seek(0)
+    content = source.read()
+    source.seek(0)
+    return content
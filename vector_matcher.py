@@ -1,78 +1,1111 @@
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Tuple
+from typing import Callable, Iterable, List, Dict, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import itertools
 import json
-import re
+import os
+import threading
+import time
+
+from inference_backend import load_embedder, model_tag, resolve_backend
+from instrumentation import instrumented
+from lexical_index import BM25Index
+from skill_index import SkillIndex, ids_to_bitmap, normalize_skill
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+MATCH_MODES = ("hybrid", "dense")
+
+
+class VectorIndex:
+    def __init__(
+        self,
+        dimension: int,
+        index_type: str = "flat",
+        nlist: int = 256,
+        pq_m: int = 48,
+        pq_nbits: int = 8,
+        hnsw_m: int = 32,
+        ef_construction: int = 80,
+        nprobe: int = 8,
+        ef_search: int = 64,
+        metric: str = "ip",
+    ):
+        """
+        Kalıcı aday kimliği eşlemesine sahip artımlı FAISS indeksini başlat.
+        index_type: "flat" (tam tarama), "ivf_flat", "ivf_pq" (nicemlenmiş) veya "hnsw"
+        metric: "ip" (normalize vektörlerle kosinüs benzerliği) veya "l2"
+        """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Desteklenmeyen indeks türü: {index_type}. Seçenekler: {', '.join(INDEX_TYPES)}")
+        if metric not in ("ip", "l2"):
+            raise ValueError(f"Desteklenmeyen metrik: {metric}")
+        if index_type == "ivf_pq" and dimension % pq_m:
+            raise ValueError(f"pq_m ({pq_m}) vektör boyutunu ({dimension}) tam bölmelidir")
+        self.dimension = dimension
+        self.index_type = index_type
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.metric = faiss.METRIC_INNER_PRODUCT if metric == "ip" else faiss.METRIC_L2
+        self.lock = threading.RLock()
+        self.reset()
+
+    @property
+    def is_ivf(self) -> bool:
+        return self.index_type in ("ivf_flat", "ivf_pq")
+
+    @property
+    def train_size(self) -> int:
+        """
+        IVF eğitimi için biriktirilecek vektör sayısı (küme başına ~39 nokta)
+        """
+        return self.nlist * 39
+
+    def _new_index(self):
+        """
+        Yapılandırmaya göre kimlik destekli FAISS indeksi oluştur
+        """
+        if self.index_type == "flat":
+            return faiss.IndexIDMap(faiss.IndexFlat(self.dimension, self.metric))
+        if self.index_type == "hnsw":
+            hnsw = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, self.metric)
+            hnsw.hnsw.efConstruction = self.ef_construction
+            return faiss.IndexIDMap(hnsw)
+        quantizer = faiss.IndexFlat(self.dimension, self.metric)
+        if self.index_type == "ivf_flat":
+            return faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, self.metric)
+        return faiss.IndexIVFPQ(quantizer, self.dimension, self.nlist, self.pq_m, self.pq_nbits, self.metric)
+
+    def _new_buffer(self):
+        # IVF eğitilene kadar vektörler tam taramalı bir ara indekste bekler
+        return faiss.IndexIDMap(faiss.IndexFlat(self.dimension, self.metric)) if self.is_ivf else None
+
+    def reset(self):
+        """
+        İndeksi ve kimlik eşlemesini boşalt
+        """
+        with self.lock:
+            self.index = self._new_index()
+            self.buffer = self._new_buffer()
+            self.tombstones = set()
+            self.id_to_key: Dict[int, str] = {}
+            self.key_to_id: Dict[str, int] = {}
+            self.next_id = 0
+            self.pending_changes = 0
+
+    def __len__(self) -> int:
+        return len(self.id_to_key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_to_id
+
+    def train(self, vectors: np.ndarray):
+        """
+        IVF kaba nicemleyicisini (ve PQ kod kitabını) verilen gömmelerle eğit,
+        ara indekste bekleyen vektörleri ana indekse taşı
+        """
+        if not self.is_ivf:
+            return
+        vectors = self._prepare(vectors)
+        with self.lock:
+            if self.index.ntotal:
+                raise ValueError("Dolu bir IVF indeksi yeniden eğitilemez; önce reset() çağırın")
+            self.index.train(vectors)
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        if self.buffer is None or not self.buffer.ntotal:
+            return
+        ids = faiss.vector_to_array(self.buffer.id_map).astype("int64")
+        vectors = self.buffer.index.reconstruct_n(0, self.buffer.ntotal)
+        self.index.add_with_ids(vectors, ids)
+        self.buffer.reset()
+
+    def _maybe_train(self):
+        """
+        Ara indekste yeterli vektör biriktiyse IVF'yi bunlarla eğit
+        """
+        if self.buffer is not None and not self.index.is_trained and self.buffer.ntotal >= self.train_size:
+            self.index.train(self.buffer.index.reconstruct_n(0, self.buffer.ntotal))
+            self._flush_buffer()
+
+    def add(self, keys: List[str], vectors: np.ndarray) -> List[int]:
+        """
+        Vektörleri kararlı int64 kimlikleriyle indekse ekle (aynı anahtar varsa değiştir)
+        """
+        if not keys:
+            return []
+        vectors = self._prepare(vectors)
+        with self.lock:
+            self.remove([key for key in keys if key in self.key_to_id])
+            ids = np.arange(self.next_id, self.next_id + len(keys), dtype="int64")
+            self.next_id += len(keys)
+            target = self.index if self.index.is_trained else self.buffer
+            target.add_with_ids(vectors, ids)
+            for key, int_id in zip(keys, ids.tolist()):
+                self.id_to_key[int_id] = key
+                self.key_to_id[key] = int_id
+            self.pending_changes += len(keys)
+            self._maybe_train()
+            return ids.tolist()
+
+    def remove(self, keys: List[str]) -> int:
+        """
+        Anahtarları indeksten sil, silinen vektör sayısını döndür
+        """
+        with self.lock:
+            ids = [self.key_to_id.pop(key) for key in keys if key in self.key_to_id]
+            if not ids:
+                return 0
+            for int_id in ids:
+                del self.id_to_key[int_id]
+            self.pending_changes += len(ids)
+            if self.index_type == "hnsw":
+                # HNSW silmeyi desteklemez; vektörler mezar taşı olarak işaretlenip aramada elenir
+                self.tombstones.update(ids)
+                self._maybe_compact()
+                return len(ids)
+            id_array = np.array(ids, dtype="int64")
+            removed = self.index.remove_ids(id_array)
+            if self.buffer is not None:
+                removed += self.buffer.remove_ids(id_array)
+            return removed
+
+    def _maybe_compact(self):
+        """
+        Mezar taşları çoğaldığında HNSW grafiğini yalnızca canlı vektörlerle yeniden kur
+        """
+        if len(self.tombstones) < max(1000, self.index.ntotal // 5):
+            return
+        ids = faiss.vector_to_array(self.index.id_map).astype("int64")
+        vectors = self.index.index.reconstruct_n(0, self.index.ntotal)
+        live = ~np.isin(ids, np.fromiter(self.tombstones, dtype="int64"))
+        self.index = self._new_index()
+        self.index.add_with_ids(vectors[live], ids[live])
+        self.tombstones = set()
+
+    def _search_params(self, nprobe: Optional[int], ef_search: Optional[int], k: int, selector=None):
+        """
+        Sorgu başına arama parametreleri (nprobe / efSearch ve kimlik seçici)
+        """
+        if self.is_ivf:
+            params = faiss.SearchParametersIVF()
+            params.nprobe = min(nprobe or self.nprobe, self.nlist)
+        elif self.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW()
+            params.efSearch = max(ef_search or self.ef_search, k)
+        elif selector is not None:
+            params = faiss.SearchParameters()
+        else:
+            return None
+        if selector is not None:
+            params.sel = selector
+        return params
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Vektörleri float32 kopyasına çevir; iç çarpım metriğinde kosinüs için L2 normalize et
+        """
+        vectors = np.array(vectors, dtype="float32").reshape(-1, self.dimension)
+        if self.metric == faiss.METRIC_INNER_PRODUCT:
+            faiss.normalize_L2(vectors)
+        return vectors
+
+    def _passes(self, score: float, min_score: Optional[float]) -> bool:
+        if min_score is None:
+            return True
+        return score >= min_score if self.metric == faiss.METRIC_INNER_PRODUCT else score <= min_score
+
+    def _query(self, index, vectors: np.ndarray, k: int, params, min_score: Optional[float]) -> List[List[Tuple[int, float]]]:
+        """
+        Tek bir FAISS indeksini en fazla k sonuçla sorgula; eşik verilmişse sonuçlar ardından süzülür.
+        Aralık araması eşiği geçen her vektörü (düşük eşikte tüm indeksi) döndürebildiği için kullanılmaz;
+        sıralı ilk k sonucun eşikle süzülmesi aralık aramasının ilk k sonucuyla aynıdır.
+        """
+        scores, ids = index.search(vectors, k, params=params)
+        return [
+            [(int_id, score) for int_id, score in zip(row_ids, row_scores) if self._passes(score, min_score)]
+            for row_ids, row_scores in zip(ids.tolist(), scores.tolist())
+        ]
+
+    @instrumented("faiss_search")
+    def search(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        min_score: Optional[float] = None,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Her sorgu vektörü için en iyi k (anahtar, skor) listesini döndür.
+        İç çarpım metriğinde skor kosinüs benzerliğidir; min_score eşiğinin altındaki sonuçlar elenir.
+        allowed verilirse (int kimlik bit dizisi) arama yalnızca bu adaylarla sınırlanır.
+        """
+        vectors = self._prepare(vectors)
+        results: List[List[Tuple[int, float]]] = [[] for _ in range(len(vectors))]
+        selector = None
+        if allowed is not None:
+            if not allowed.any():
+                return [[] for _ in range(len(vectors))]
+            allowed = np.ascontiguousarray(allowed, dtype=np.uint8)
+            # IDSelectorBitmap bayt sayısını bekler; bit sayısı verilirse dizinin sonundan öteye okunur
+            selector = faiss.IDSelectorBitmap(len(allowed), faiss.swig_ptr(allowed))
+        with self.lock:
+            if self.index.ntotal:
+                fetch = min(k + len(self.tombstones), self.index.ntotal)
+                params = self._search_params(nprobe, ef_search, fetch, selector)
+                for row, hits in enumerate(self._query(self.index, vectors, fetch, params, min_score)):
+                    results[row].extend(hits)
+            if self.buffer is not None and self.buffer.ntotal:
+                # Ara indeks düz bir indekstir; yalnızca kimlik seçici geçirilir
+                params = None
+                if selector is not None:
+                    params = faiss.SearchParameters()
+                    params.sel = selector
+                for row, hits in enumerate(self._query(self.buffer, vectors, min(k, self.buffer.ntotal), params, min_score)):
+                    results[row].extend(hits)
+            reverse = self.metric == faiss.METRIC_INNER_PRODUCT
+            return [
+                [
+                    (self.id_to_key[int_id], score)
+                    for int_id, score in sorted(
+                        (hit for hit in row if hit[0] in self.id_to_key),
+                        key=lambda hit: hit[1],
+                        reverse=reverse,
+                    )[:k]
+                ]
+                for row in results
+            ]
+
+    def save(self, path: str, metadata: Optional[Dict] = None):
+        """
+        İndeksi ve yanındaki kimlik eşleme dosyasını diske atomik olarak yaz
+        """
+        with self.lock:
+            faiss.write_index(self.index, path + ".tmp")
+            if self.buffer is not None and self.buffer.ntotal:
+                faiss.write_index(self.buffer, _buffer_path(path) + ".tmp")
+            sidecar = {
+                "dimension": self.dimension,
+                "index_type": self.index_type,
+                "metric": int(self.metric),
+                "next_id": self.next_id,
+                "ids": {str(int_id): key for int_id, key in self.id_to_key.items()},
+                "tombstones": sorted(self.tombstones),
+                "metadata": metadata or {},
+            }
+            with open(_sidecar_path(path) + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(sidecar, f)
+            os.replace(path + ".tmp", path)
+            if os.path.exists(_buffer_path(path) + ".tmp"):
+                os.replace(_buffer_path(path) + ".tmp", _buffer_path(path))
+            elif os.path.exists(_buffer_path(path)):
+                os.remove(_buffer_path(path))
+            os.replace(_sidecar_path(path) + ".tmp", _sidecar_path(path))
+            self.pending_changes = 0
+
+    def load(self, path: str) -> Optional[Dict]:
+        """
+        İndeksi ve kimlik eşlemesini diskten yükle; dosyalar yoksa veya
+        yapılandırma (boyut, indeks türü, metrik) uyuşmuyorsa None döndür
+        """
+        if not (os.path.exists(path) and os.path.exists(_sidecar_path(path))):
+            return None
+        with open(_sidecar_path(path), encoding="utf-8") as f:
+            sidecar = json.load(f)
+        if (
+            sidecar.get("dimension") != self.dimension
+            or sidecar.get("index_type", "flat") != self.index_type
+            or sidecar.get("metric", faiss.METRIC_L2) != self.metric
+        ):
+            return None
+        index = faiss.read_index(path)
+        buffer = faiss.read_index(_buffer_path(path)) if os.path.exists(_buffer_path(path)) else self._new_buffer()
+        with self.lock:
+            self.index = index
+            self.buffer = buffer
+            self.tombstones = set(sidecar.get("tombstones", []))
+            self.id_to_key = {int(int_id): key for int_id, key in sidecar["ids"].items()}
+            self.key_to_id = {key: int_id for int_id, key in self.id_to_key.items()}
+            self.next_id = sidecar["next_id"]
+            self.pending_changes = 0
+        return sidecar.get("metadata", {})
+
+    def memory_bytes(self) -> int:
+        """
+        Serileştirilmiş indeksin (ve ara indeksin) bayt cinsinden boyutu
+        """
+        with self.lock:
+            size = faiss.serialize_index(self.index).nbytes
+            if self.buffer is not None and self.buffer.ntotal:
+                size += faiss.serialize_index(self.buffer).nbytes
+            return int(size)
+
+
+def recall_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    configs: Optional[Dict[str, Dict]] = None,
+) -> List[Dict]:
+    """
+    Farklı indeks modlarını tam taramalı (flat) temele karşı recall@k,
+    kurulum süresi, sorgu gecikmesi ve bellek açısından karşılaştır
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    dimension = vectors.shape[1]
+    keys = [str(i) for i in range(len(vectors))]
+    if configs is None:
+        nlist = max(1, min(1024, int(4 * np.sqrt(len(vectors)))))
+        configs = {
+            "flat": {"index_type": "flat"},
+            "ivf_flat": {"index_type": "ivf_flat", "nlist": nlist, "nprobe": 16},
+            "ivf_pq": {"index_type": "ivf_pq", "nlist": nlist, "nprobe": 16, "pq_m": _largest_divisor(dimension, 48)},
+            "hnsw": {"index_type": "hnsw", "ef_search": 64},
+        }
+
+    baseline = VectorIndex(dimension, "flat")
+    baseline.add(keys, vectors)
+    exact = [{key for key, _ in row} for row in baseline.search(queries, k)]
+
+    report = []
+    for name, options in configs.items():
+        index = VectorIndex(dimension, **options)
+        started = time.perf_counter()
+        index.train(vectors)
+        index.add(keys, vectors)
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = index.search(queries, k)
+        query_ms = (time.perf_counter() - started) * 1000 / max(1, len(queries))
+
+        recall = np.mean([
+            len(exact_row & {key for key, _ in row}) / max(1, len(exact_row))
+            for exact_row, row in zip(exact, found)
+        ])
+        report.append({
+            "name": name,
+            **options,
+            "recall_at_k": round(float(recall), 4),
+            "build_seconds": round(build_seconds, 3),
+            "query_ms": round(query_ms, 3),
+            "memory_bytes": index.memory_bytes(),
+        })
+    return report
+
+
+def _largest_divisor(n: int, limit: int) -> int:
+    return max(d for d in range(1, limit + 1) if n % d == 0)
+
+
+def _sidecar_path(path: str) -> str:
+    return path + ".ids.json"
+
+
+def _buffer_path(path: str) -> str:
+    return path + ".buffer"
+
+
+def _lexical_path(path: str) -> str:
+    return path + ".lexical.npz"
+
+
+def _index_options_from_env() -> Dict:
+    """
+    INDEX_NLIST, INDEX_PQ_M, INDEX_HNSW_M, INDEX_NPROBE, INDEX_EF_SEARCH ayarlarını oku
+    """
+    names = {
+        "INDEX_NLIST": "nlist",
+        "INDEX_PQ_M": "pq_m",
+        "INDEX_HNSW_M": "hnsw_m",
+        "INDEX_NPROBE": "nprobe",
+        "INDEX_EF_SEARCH": "ef_search",
+    }
+    return {option: int(os.environ[env]) for env, option in names.items() if os.getenv(env)}
+
+
+def content_hash(text: str) -> str:
+    """
+    Gömme vektörünün hangi metinden üretildiğini gösteren SHA-256 özeti
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def candidate_key(candidate: Dict) -> str:
+    """
+    Aday belgesinin kalıcı anahtarını (Mongo _id) döndür
+    """
+    return str(candidate["_id"] if "_id" in candidate else candidate["id"])
+
+
+def section_owner(key: str) -> str:
+    """
+    İndeks anahtarının ait olduğu aday kimliği ("<aday>" veya "<aday>#<bölüm>#<parça>")
+    """
+    return key.split("#", 1)[0]
+
+
+def section_name(key: str) -> str:
+    """
+    İndeks anahtarının bölüm adı; belgenin tamamının vektörü için "document"
+    """
+    parts = key.split("#")
+    return parts[1] if len(parts) > 1 else "document"
+
+
+def chunk_words(text: str, words: int, max_chunks: int) -> List[str]:
+    """
+    Metni model sınırına sığacak kelime gruplarına böl (en fazla max_chunks parça)
+    """
+    tokens = text.split()
+    return [" ".join(tokens[i:i + words]) for i in range(0, len(tokens), words)][:max_chunks]
+
+
+def _section_weights_from_env() -> Dict[str, float]:
+    """
+    SECTION_WEIGHTS="document:1,experience:1.5,..." ayarını oku
+    """
+    weights = {"document": 1.0, "experience": 1.5, "skills": 1.0, "education": 0.5, "summary": 1.0}
+    for item in filter(None, os.getenv("SECTION_WEIGHTS", "").split(",")):
+        name, _, weight = item.partition(":")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def job_query(job: Dict) -> str:
+    """
+    İş ilanının eşleştirmede kodlanan sorgu metni (başlık, açıklama ve gereksinimler)
+    """
+    return f"{job['title']} {job['description']} {' '.join(job['requirements'])}"
+
 
 class VectorMatcher:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        index_type: Optional[str] = None,
+        backend: Optional[str] = None,
+        **index_options
+    ):
         """
-        Vektör eşleştiriciyi bir sentence transformer modeli ile başlat
+        Vektör eşleştiriciyi bir sentence transformer modeli ile başlat.
+        İndeks türü ve ayarları verilmezse INDEX_* ortam değişkenlerinden okunur; çıkarım arka ucu
+        verilmezse INFERENCE_BACKEND ("torch" veya nicemlenmiş "onnx") kullanılır.
         """
-        self.model = SentenceTransformer(model_name)
-        self.index = None
-        self.candidates = []
+        self.backend = resolve_backend(backend)
+        # Gömme kayıtlarında ve indeks anlık görüntüsünde saklanan model kimliği (arka ucu da içerir)
+        self.model_name = model_tag(model_name, self.backend)
+        self.model = load_embedder(model_name, self.backend)
         self.dimension = self.model.get_sentence_embedding_dimension()
-        
-    def create_index(self, candidates: List[Dict]):
-        """
-        Aday belgelerinden FAISS indeksi oluştur
-        """
-        self.candidates = candidates
-        texts = [candidate["text"] for candidate in candidates]
-        embeddings = self.model.encode(texts)
-        
-        # FAISS indeksini başlat
-        self.index = faiss.IndexFlatL2(self.dimension)
-        self.index.add(np.array(embeddings).astype('float32'))
-        
-    def find_matches(self, query: str, k: int = 5) -> List[Dict]:
-        """
-        Bir sorgu için k en benzer adayı bul
-        """
-        if not self.index:
-            raise ValueError("İndeks oluşturulmamış. Önce create_index'i çağırın.")
-            
-        # Sorguyu kodla
-        query_vector = self.model.encode([query])[0]
-        
-        # FAISS indeksinde ara
-        distances, indices = self.index.search(
-            np.array([query_vector]).astype('float32'), k
+        self.index = VectorIndex(
+            self.dimension,
+            index_type or os.getenv("INDEX_TYPE", "flat"),
+            **{**_index_options_from_env(), **index_options}
+        )
+        # Tam aday belgeleri yerine yalnızca int kimliğe bağlı beceri tablosu tutulur
+        self.skills = SkillIndex()
+        # Aday -> ilan eşleştirmesi için ilan sorgu gömmelerinin ayrı indeksi ve ilan başına
+        # eşleştirme bilgisi (başlık, eşik, gerekli/tercih edilen/tüm beceriler)
+        self.jobs = VectorIndex(
+            self.dimension,
+            os.getenv("JOB_INDEX_TYPE", "flat"),
+            **_index_options_from_env()
         )
-        
-        # Sonuçları hazırla
+        self.job_info: Dict[str, Dict] = {}
+        # Kosinüs benzerliğinin %0 ve %100'e karşılık gelen değerleri. Varsayılanlar all-MiniLM-L6-v2 ile
+        # birkaç örnek CV/ilan çifti üzerinde elle seçilmiş başlangıç değerleridir, ölçülmüş değildir;
+        # model, dil veya birleştirme yöntemi değişince benchmarks/calibrate_scores.py ile etiketli
+        # çiftlerden yeniden türetilmelidir
+        self.score_floor = float(os.getenv("MATCH_SCORE_FLOOR", "0.15"))
+        self.score_ceiling = float(os.getenv("MATCH_SCORE_CEILING", "0.75"))
+        # Tüm tercih edilen becerilere sahip adaya eklenecek yüzde puanı
+        self.preferred_skill_boost = float(os.getenv("PREFERRED_SKILL_BOOST", "10"))
+        # Bölüm gömmeleri: her CV belgenin tamamına ek olarak deneyim/eğitim/beceri/özet bölümleriyle
+        # (model sınırına sığacak parçalar halinde) aynı indekse eklenir; aday skoru bölüm skorlarının
+        # en yükseği (max) ya da bölüm ağırlıklı ortalamasıdır (weighted)
+        self.section_embeddings = os.getenv("SECTION_EMBEDDINGS", "true").lower() == "true"
+        self.section_chunk_words = int(os.getenv("SECTION_CHUNK_WORDS", "150"))
+        self.section_max_chunks = int(os.getenv("SECTION_MAX_CHUNKS", "3"))
+        self.match_aggregation = os.getenv("MATCH_AGGREGATION", "max")
+        if self.match_aggregation not in ("max", "weighted"):
+            raise ValueError(f"Desteklenmeyen eşleşme birleştirme yöntemi: {self.match_aggregation}")
+        self.section_weights = _section_weights_from_env()
+        # Aday -> indeksteki vektör anahtarları (belge + bölüm parçaları). Bir adayın vektörleri tek
+        # çağrıyla eklendiğinden kimlikleri belge vektörünün kimliğinden başlayan ardışık bir aralıktır;
+        # vector_counts belge kimliği -> aralık uzunluğu (beceri filtresi aday kimliklerini buna göre açar)
+        self.candidate_vectors: Dict[str, List[str]] = {}
+        self.vector_counts = np.zeros(1024, dtype=np.uint16)
+        # CV metni ve beceriler üzerinde BM25 ters indeksi (belge vektörünün int kimliğiyle). "hybrid"
+        # modda anahtar kelime araması FAISS aramasıyla paralel çalışır ve sonuçlar karşılıklı sıra
+        # füzyonuyla (RRF) birleştirilir; "dense" (varsayılan) yalnızca vektör aramasıdır. Hibrit mod
+        # ilan ya da sorgu başına seçilebilir
+        self.lexical = BM25Index()
+        self.match_mode = os.getenv("MATCH_MODE", "dense")
+        if self.match_mode not in MATCH_MODES:
+            raise ValueError(f"Desteklenmeyen eşleştirme modu: {self.match_mode}. Seçenekler: {', '.join(MATCH_MODES)}")
+        self.rrf_k = int(os.getenv("RRF_K", "60"))
+        self._lexical_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lexical")
+
+    def similarity_to_percentage(self, similarity: float) -> float:
+        """
+        Kosinüs benzerliğini kalibre edilmiş [0, 100] eşleşme yüzdesine çevir
+        """
+        scaled = (similarity - self.score_floor) / (self.score_ceiling - self.score_floor)
+        return 100 * min(1.0, max(0.0, scaled))
+
+    def percentage_to_similarity(self, percentage: float) -> float:
+        """
+        Eşleşme yüzdesi eşiğini indeks sorgusunda kullanılacak kosinüs eşiğine çevir
+        """
+        return self.score_floor + (percentage / 100) * (self.score_ceiling - self.score_floor)
+
+    @instrumented("embedding")
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Metinleri toplu olarak float32 gömme vektörlerine dönüştür
+        """
+        embeddings = self.model.encode(texts, normalize_embeddings=True)
+        return np.asarray(embeddings, dtype="float32").reshape(len(texts), self.dimension)
+
+    def embedding_record(
+        self, text: str, vector: Optional[np.ndarray] = None, sections: Optional[Dict[str, str]] = None
+    ) -> Dict:
+        """
+        Aday belgesiyle birlikte saklanacak gömme kaydını oluştur
+        """
+        if sections is None and vector is not None:
+            return self._record(text, vector, None)
+        return self.embedding_records([text], None if sections is None else [sections], vector)[0]
+
+    def embedding_records(
+        self,
+        texts: List[str],
+        sections: Optional[List[Dict[str, str]]] = None,
+        vector: Optional[np.ndarray] = None,
+    ) -> List[Dict]:
+        """
+        Birden çok CV'nin belge ve bölüm gömmelerini tek toplu kodlama çağrısıyla hesapla.
+        sections verilirse (split_sections çıktıları) her bölüm parçası kayıtta "sections" altında saklanır.
+        """
+        chunks: List[List[Tuple[str, str]]] = [[] for _ in texts]
+        if sections is not None and self.section_embeddings:
+            chunks = [self.section_chunks(parts) for parts in sections]
+        batch = [] if vector is not None else list(texts)
+        batch += [chunk for row in chunks for _, chunk in row]
+        encoded = self.encode(batch) if batch else np.zeros((0, self.dimension), dtype="float32")
+        position = 0 if vector is not None else len(texts)
+        records = []
+        for i, text in enumerate(texts):
+            section_vectors = None
+            if sections is not None and self.section_embeddings:
+                section_vectors = {}
+                for key, _ in chunks[i]:
+                    section_vectors[key] = encoded[position]
+                    position += 1
+            records.append(self._record(text, vector if vector is not None else encoded[i], section_vectors))
+        return records
+
+    def _record(self, text: str, vector: np.ndarray, section_vectors: Optional[Dict[str, np.ndarray]]) -> Dict:
+        record = {
+            "vector": [float(x) for x in vector],
+            "model": self.model_name,
+            "dimension": self.dimension,
+            "content_hash": content_hash(text),
+        }
+        if section_vectors is not None:
+            record["sections"] = {key: [float(x) for x in value] for key, value in section_vectors.items()}
+        return record
+
+    def section_chunks(self, sections: Dict[str, str]) -> List[Tuple[str, str]]:
+        """
+        Bölüm metinlerini ("<bölüm>#<parça>", metin) çiftlerine böl
+        """
+        return [
+            (f"{name}#{i}", chunk)
+            for name, text in sections.items()
+            for i, chunk in enumerate(chunk_words(text, self.section_chunk_words, self.section_max_chunks))
+        ]
+
+    def has_current_embedding(self, candidate: Dict) -> bool:
+        """
+        Adayın kayıtlı gömmesi yapılandırılmış model ve güncel metinle üretilmiş mi
+        """
+        embedding = candidate.get("embedding")
+        if not embedding:
+            return False
+        if embedding.get("model") != self.model_name or embedding.get("dimension") != self.dimension:
+            return False
+        return "text" not in candidate or embedding.get("content_hash") == content_hash(candidate["text"])
+
+    def create_index(self, candidates: Iterable[Dict], batch_size: int = 1000):
+        """
+        Aday belgelerinden (liste ya da imleç) FAISS indeksini sıfırdan, parça parça oluştur
+        """
+        self.index.reset()
+        self.skills = SkillIndex()
+        self.candidate_vectors = {}
+        self.vector_counts = np.zeros(1024, dtype=np.uint16)
+        self.lexical = BM25Index()
+        candidates = iter(candidates)
+        while True:
+            batch = list(itertools.islice(candidates, batch_size))
+            if not batch:
+                break
+            self.add_candidates(batch)
+
+    def add_candidates(self, candidates: List[Dict]):
+        """
+        Adayları mevcut indekse artımlı olarak ekle; kayıtlı gömmeleri yeniden kullan.
+        "text" içeren adaylar BM25 indeksine de eklenir.
+        """
+        if not candidates:
+            return
+        keys = [candidate_key(candidate) for candidate in candidates]
+        embeddings = np.zeros((len(candidates), self.dimension), dtype="float32")
+        stale = []
+        for i, candidate in enumerate(candidates):
+            if self.has_current_embedding(candidate):
+                embeddings[i] = candidate["embedding"]["vector"]
+            else:
+                stale.append(i)
+        if stale:
+            embeddings[stale] = self.encode([candidates[i]["text"] for i in stale])
+
+        # Belge vektörünün yanına kayıtlı bölüm vektörlerini "<aday>#<bölüm>#<parça>" anahtarlarıyla ekle
+        vector_keys: Dict[str, List[str]] = {}
+        all_keys: List[str] = []
+        rows: List[np.ndarray] = []
+        for i, (key, candidate) in enumerate(zip(keys, candidates)):
+            section_vectors = {}
+            if self.section_embeddings and i not in stale:
+                section_vectors = candidate["embedding"].get("sections") or {}
+            vector_keys[key] = [key] + [f"{key}#{name}" for name in section_vectors]
+            all_keys.extend(vector_keys[key])
+            rows.append(embeddings[i:i + 1])
+            if section_vectors:
+                rows.append(np.asarray(list(section_vectors.values()), dtype="float32").reshape(-1, self.dimension))
+
+        with self.index.lock:
+            for key in keys:
+                self._remove_vectors(key)
+            self.index.add(all_keys, np.concatenate(rows))
+            self.candidate_vectors.update(vector_keys)
+            for key, candidate in zip(keys, candidates):
+                # Beceriler aday başına bir kez, belge vektörünün kimliğiyle tutulur
+                int_id = self.index.key_to_id[key]
+                self._set_vector_count(int_id, len(vector_keys[key]))
+                self.skills.set(int_id, candidate.get("skills", []))
+                if candidate.get("text"):
+                    self.lexical.add(int_id, candidate["text"], candidate.get("skills", []))
+
+    def _set_vector_count(self, int_id: int, count: int):
+        if int_id >= len(self.vector_counts):
+            grown = np.zeros(max(len(self.vector_counts) * 2, int_id + 1), dtype=np.uint16)
+            grown[:len(self.vector_counts)] = self.vector_counts
+            self.vector_counts = grown
+        self.vector_counts[int_id] = count
+
+    def _vector_ids(self, doc_ids: np.ndarray) -> np.ndarray:
+        """
+        Aday (belge vektörü) kimliklerini adayların tüm vektör kimliklerine aç
+        """
+        counts = self.vector_counts[doc_ids].astype(np.int64)
+        starts = np.repeat(doc_ids - (np.cumsum(counts) - counts), counts)
+        return starts + np.arange(int(counts.sum()))
+
+    def index_lexical(self, candidates: Iterable[Dict]) -> int:
+        """
+        Vektör indeksindeki adayların metnini (ve becerilerini) BM25 indeksine ekle; ör. diskten
+        yüklenen indeksin BM25 dosyası yoksa. Eklenen aday sayısını döndürür.
+        """
+        added = 0
+        for candidate in candidates:
+            if not candidate.get("text"):
+                continue
+            with self.index.lock:
+                int_id = self.index.key_to_id.get(candidate_key(candidate))
+                if int_id is None or int_id in self.lexical:
+                    continue
+                self.lexical.add(int_id, candidate["text"], candidate.get("skills", []))
+            added += 1
+        return added
+
+    def reconcile(
+        self,
+        candidate_ids: Iterable[str],
+        fetch: Callable[[List[str]], Dict[str, Dict]],
+        batch_size: int = 1000,
+    ) -> Tuple[int, int]:
+        """
+        Diskten yüklenen indeksi veritabanındaki güncel aday kümesiyle uzlaştır: kümede olmayan adayları
+        indeksten çıkar, indekste olmayanları fetch ile (kimlik -> embedding/skills/text içeren belge)
+        parça parça alıp ekle. Anlık görüntüden sonra yazılıp kaydedilmeden kalan değişiklikleri kapatır.
+        (eklenen, çıkarılan) sayılarını döndürür.
+        """
+        current = set(map(str, candidate_ids))
+        with self.index.lock:
+            extra = [candidate_id for candidate_id in self.candidate_vectors if candidate_id not in current]
+            for candidate_id in extra:
+                self._remove_vectors(candidate_id)
+            missing = [candidate_id for candidate_id in current if candidate_id not in self.candidate_vectors]
+        added = 0
+        for start in range(0, len(missing), batch_size):
+            candidates = [
+                candidate for candidate in fetch(missing[start:start + batch_size]).values()
+                if self.has_current_embedding(candidate)
+            ]
+            self.add_candidates(candidates)
+            added += len(candidates)
+        return added, len(extra)
+
+    def add_candidate(self, candidate: Dict):
+        """
+        Tek bir adayı indekse ekle
+        """
+        self.add_candidates([candidate])
+
+    def remove_candidate(self, candidate_id: str) -> bool:
+        """
+        Adayı indeksten çıkar
+        """
+        with self.index.lock:
+            return self._remove_vectors(candidate_id) > 0
+
+    def _remove_vectors(self, candidate_id: str) -> int:
+        """
+        Adayın belge ve bölüm vektörlerini indeksten, beceri tablosundan ve BM25 indeksinden çıkar
+        """
+        keys = self.candidate_vectors.pop(candidate_id, None) or [candidate_id]
+        if candidate_id in self.index:
+            int_id = self.index.key_to_id[candidate_id]
+            self.lexical.remove(int_id)
+            self.skills.remove(int_id)
+            self.vector_counts[int_id] = 0
+        return self.index.remove(keys)
+
+    def add_jobs(self, jobs: List[Dict]):
+        """
+        İlanları ilan indeksine ekle (varsa değiştir). Her kayıt "_id", "vector" ve
+        eşleştirme bilgisini (title, company, min_match_percentage, required_skills,
+        preferred_skills, job_skills) içerir.
+        """
+        if not jobs:
+            return
+        keys = [str(job["_id"]) for job in jobs]
+        vectors = np.asarray([job["vector"] for job in jobs], dtype="float32").reshape(len(jobs), self.dimension)
+        with self.jobs.lock:
+            self.jobs.add(keys, vectors)
+            for key, job in zip(keys, jobs):
+                self.job_info[key] = {
+                    "title": job.get("title", ""),
+                    "company": job.get("company", ""),
+                    "min_match_percentage": job.get("min_match_percentage"),
+                    "required_skills": sorted(set(map(normalize_skill, job.get("required_skills") or []))),
+                    "preferred_skills": sorted(set(map(normalize_skill, job.get("preferred_skills") or []))),
+                    "job_skills": list(dict.fromkeys(map(normalize_skill, job.get("job_skills") or []))),
+                }
+
+    def remove_job(self, job_id: str) -> bool:
+        """
+        İlanı ilan indeksinden çıkar
+        """
+        with self.jobs.lock:
+            self.job_info.pop(job_id, None)
+            return self.jobs.remove([job_id]) > 0
+
+    def find_jobs(
+        self,
+        vector: List[float],
+        candidate_skills: List[str],
+        k: int = 5,
+        min_match_percentage: Optional[float] = None,
+    ) -> List[Dict]:
+        """
+        Bir adayın gömmesine en uygun k ilanı bul. İlanın kendi eşiğinin altında kalan veya
+        adayın sahip olmadığı gerekli beceriyi isteyen ilanlar elenir. Eşik ve beceri koşulları ilan
+        başına olduğundan önce k * 3 ilan getirilip süzülür; k sonuç çıkmazsa arama, k sonuç bulunana
+        ya da ilan indeksi tükenene kadar genişletilir.
+        """
+        skills = set(map(normalize_skill, candidate_skills))
+        min_score = None
+        if min_match_percentage is not None and min_match_percentage > 0:
+            min_score = self.percentage_to_similarity(min_match_percentage)
+        query = np.asarray([vector], dtype="float32").reshape(1, self.dimension)
+        fetch = k * 3
+        while True:
+            with self.jobs.lock:
+                hits = self.jobs.search(query, fetch, min_score=min_score)[0]
+                infos = [self.job_info.get(job_id, {}) for job_id, _ in hits]
+                total = len(self.jobs)
+            results = self._job_results(hits, infos, skills)
+            if len(results) >= k or len(hits) < fetch or fetch >= total:
+                break
+            fetch *= 4
+
+        results.sort(key=lambda match: match["match_percentage"], reverse=True)
+        return results[:k]
+
+    def _job_results(self, hits: List[Tuple[str, float]], infos: List[Dict], skills: set) -> List[Dict]:
+        """
+        İlan isabetlerini adayın becerileri ve ilanların eşikleriyle süzüp sonuç sözlüklerine dönüştür
+        """
         results = []
-        for distance, idx in zip(distances[0], indices[0]):
-            if idx < len(self.candidates):
-                candidate = self.candidates[idx]
-                match_percentage = 100 * (1 - distance / 2)  # Mesafeyi yüzdeye çevir
-                
-                # Eksik becerileri bul
-                missing_skills = self._find_missing_skills(
-                    query, candidate.get("skills", [])
-                )
-                
-                results.append({
-                    "candidate_id": candidate["id"],
-                    "match_percentage": round(match_percentage, 2),
-                    "missing_skills": missing_skills,
-                    "explanation": self._generate_explanation(
-                        match_percentage, missing_skills
-                    )
-                })
-                
+        for (job_id, similarity), info in zip(hits, infos):
+            if not skills.issuperset(info.get("required_skills", [])):
+                continue
+            match_percentage = self.similarity_to_percentage(similarity)
+            preferred = info.get("preferred_skills", [])
+            if preferred:
+                matched = len(skills.intersection(preferred))
+                match_percentage = min(100.0, match_percentage + self.preferred_skill_boost * matched / len(preferred))
+            match_percentage = round(match_percentage, 2)
+            if match_percentage < (info.get("min_match_percentage") or 0):
+                continue
+            missing_skills = [skill for skill in info.get("job_skills", []) if skill not in skills]
+            results.append({
+                "job_id": job_id,
+                "title": info.get("title", ""),
+                "company": info.get("company", ""),
+                "match_percentage": match_percentage,
+                "missing_skills": missing_skills,
+                "explanation": self._generate_explanation(match_percentage, missing_skills),
+            })
         return results
-    
-    def _find_missing_skills(self, query: str, candidate_skills: List[str]) -> List[str]:
+
+    def candidate_skills(self, candidate_id: str) -> List[str]:
+        """
+        İndeksteki adayın becerilerini beceri tablosundan al
+        """
+        int_id = self.index.key_to_id.get(candidate_id)
+        return self.skills.get(int_id) if int_id is not None else []
+
+    def find_matches(
+        self,
+        query: str,
+        k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        min_match_percentage: Optional[float] = None,
+        required_skills: Optional[List[str]] = None,
+        preferred_skills: Optional[List[str]] = None,
+        job_skills: Optional[List[str]] = None,
+        query_vector: Optional[List[float]] = None,
+        keywords: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Bir sorgu için k en benzer adayı bul (nprobe/ef_search yaklaşık indekslerde sorgu başına ayar).
+        min_match_percentage verilirse eşiğin altındaki adaylar indeks sorgusunda elenir.
+        required_skills aramayı bu becerilerin tümüne sahip adaylarla sınırlar, preferred_skills
+        skoru artırır; eksik beceriler ilanın normalize beceri kümesine (job_skills) göre hesaplanır.
+        query_vector verilirse (ör. ilanla birlikte saklanan gömme) sorgu yeniden kodlanmaz.
+        mode "hybrid" ise (varsayılan MATCH_MODE, "dense") keywords (yoksa query) BM25 ile de aranır;
+        sonuçlar füzyon skoruna (fusion_score) göre sıralanır.
+        """
+        return self.find_matches_batch([{
+            "query": query,
+            "vector": query_vector,
+            "min_match_percentage": min_match_percentage,
+            "required_skills": required_skills,
+            "preferred_skills": preferred_skills,
+            "job_skills": job_skills,
+            "keywords": keywords,
+            "mode": mode,
+        }], k, nprobe, ef_search)[0]
+
+    def find_matches_batch(
+        self,
+        queries: List[Dict],
+        k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Dict]]:
+        """
+        Birden çok ilan sorgusunu tek geçişte eşleştir. Her sorgu "query" veya "vector" ile
+        find_matches parametrelerini (min_match_percentage, required_skills, preferred_skills,
+        job_skills, keywords, mode) içerir. Vektörü olmayan sorgular tek toplu çağrıyla kodlanır; aynı eşik ve
+        gerekli beceri kümesini paylaşan sorgular tek bir FAISS search çağrısında aranır.
+        Hibrit sorgularda BM25 araması FAISS aramasıyla paralel yürür ve iki sıralama RRF ile birleştirilir.
+        """
+        if not queries:
+            return []
+        vectors = np.zeros((len(queries), self.dimension), dtype="float32")
+        missing = []
+        for i, query in enumerate(queries):
+            if query.get("vector") is not None:
+                vectors[i] = query["vector"]
+            else:
+                missing.append(i)
+        if missing:
+            vectors[missing] = self.encode([queries[i]["query"] for i in missing])
+
+        # Arama parametreleri aynı olan sorguları grupla
+        groups: Dict[Tuple, List[int]] = {}
+        lexical_queries: Dict[int, str] = {}
+        for i, query in enumerate(queries):
+            min_match_percentage = query.get("min_match_percentage")
+            min_score = None
+            if min_match_percentage is not None and min_match_percentage > 0:
+                min_score = self.percentage_to_similarity(min_match_percentage)
+            required = tuple(sorted(set(map(normalize_skill, query.get("required_skills") or []))))
+            mode = query.get("mode") or self.match_mode
+            if mode not in MATCH_MODES:
+                raise ValueError(f"Desteklenmeyen eşleştirme modu: {mode}. Seçenekler: {', '.join(MATCH_MODES)}")
+            if mode == "hybrid" and len(self.lexical):
+                text = " ".join(query.get("keywords") or []) or query.get("query") or ""
+                if text.strip():
+                    lexical_queries[i] = text
+            # Tercih edilen beceriler ve füzyon sıralamayı değiştirebileceği için fazladan aday getir
+            fetch = k * 3 if query.get("preferred_skills") or i in lexical_queries else k
+            groups.setdefault((min_score, required, fetch), []).append(i)
+
+        hits: List[List[Tuple[str, float]]] = [[] for _ in queries]
+        int_ids: List[List[Optional[int]]] = [[] for _ in queries]
+        fusion: Dict[int, Dict[str, float]] = {}
+        with self.index.lock:
+            # Aday başına birden çok vektör olduğundan, k farklı aday için ortalama vektör sayısı kadar fazla getir
+            fan_out = min(16, -(-len(self.index) // max(1, len(self.candidate_vectors))))
+            for (min_score, required, fetch), members in groups.items():
+                # Beceri filtresi aday kimlikleri döndürür: BM25 bunlarla, FAISS adayların tüm vektörleriyle sınırlanır
+                eligible = self.skills.eligible(required)
+                allowed = lexical_allowed = None
+                if eligible is not None:
+                    lexical_allowed = ids_to_bitmap(eligible)
+                    allowed = ids_to_bitmap(self._vector_ids(eligible))
+                # BM25 kendi kilidini kullanır; FAISS araması sürerken ayrı iş parçacığında çalışır
+                lexical = {
+                    i: self._lexical_pool.submit(self.lexical.search, lexical_queries[i], fetch, lexical_allowed)
+                    for i in members if i in lexical_queries
+                }
+                results = self.index.search(vectors[members], fetch * fan_out, nprobe, ef_search, min_score, allowed)
+                for i, query_hits in zip(members, results):
+                    hits[i] = self._aggregate(query_hits, min_score)
+                    if i in lexical:
+                        hits[i], fusion[i] = self._fuse(
+                            hits[i], lexical[i].result(), vectors[i], min_score, nprobe, ef_search
+                        )
+                    int_ids[i] = [self.index.key_to_id.get(candidate_id) for candidate_id, _ in hits[i]]
+
+        return [
+            self._rank(hits[i], int_ids[i], query, k, fusion.get(i))
+            for i, query in enumerate(queries)
+        ]
+
+    def _fuse(
+        self,
+        dense: List[Tuple[str, float]],
+        lexical: List[Tuple[int, float]],
+        vector: np.ndarray,
+        min_score: Optional[float],
+        nprobe: Optional[int],
+        ef_search: Optional[int],
+    ) -> Tuple[List[Tuple[str, float]], Dict[str, float]]:
+        """
+        Vektör ve BM25 sıralamalarını karşılıklı sıra füzyonuyla (sum 1 / (rrf_k + sıra)) birleştir.
+        Yalnızca BM25'in bulduğu adayların benzerliği, aramayı bu adayların vektörleriyle sınırlayan
+        ikinci bir FAISS sorgusuyla alınır; eşiğin altında kalanlar elenir. Füzyon sırasıyla (aday, benzerlik)
+        çiftleri ve aday -> füzyon skoru eşlemesi döner. index.lock tutulurken çağrılır.
         """
-        Sorguda belirtilen ancak adayın becerilerinde olmayan becerileri bul
+        similarity = dict(dense)
+        fused: Dict[str, float] = {}
+        for rank, (candidate_id, _) in enumerate(dense, 1):
+            fused[candidate_id] = 1 / (self.rrf_k + rank)
+        ranked = [self.index.id_to_key[int_id] for int_id, _ in lexical if int_id in self.index.id_to_key]
+        lexical_only = [candidate_id for candidate_id in ranked if candidate_id not in similarity]
+        if lexical_only:
+            keys = [key for candidate_id in lexical_only for key in self.candidate_vectors.get(candidate_id, [candidate_id])]
+            bitmap = ids_to_bitmap(self.index.key_to_id[key] for key in keys)
+            found = self.index.search(vector[None, :], len(keys), nprobe, ef_search, min_score, bitmap)[0]
+            similarity.update(self._aggregate(found, min_score))
+        for rank, candidate_id in enumerate(ranked, 1):
+            if candidate_id in similarity:
+                fused[candidate_id] = fused.get(candidate_id, 0.0) + 1 / (self.rrf_k + rank)
+        order = sorted(fused, key=lambda candidate_id: fused[candidate_id], reverse=True)
+        return [(candidate_id, similarity[candidate_id]) for candidate_id in order], fused
+
+    def _aggregate(self, hits: List[Tuple[str, float]], min_score: Optional[float]) -> List[Tuple[str, float]]:
         """
-        query_skills = set(re.findall(r'\b\w+\b', query.lower()))
-        candidate_skills = set(skill.lower() for skill in candidate_skills)
-        return list(query_skills - candidate_skills)
-    
+        Vektör isabetlerini aday skorlarına indir. "max": adayın en benzer bölümü; "weighted": adayın
+        bölümlerinin ağırlıklı ortalaması (getirilmeyen bölümler için sorgunun en düşük skoru kullanılır)
+        """
+        best: Dict[str, Dict[str, float]] = {}
+        for key, score in hits:
+            sections = best.setdefault(section_owner(key), {})
+            name = section_name(key)
+            sections[name] = max(score, sections.get(name, score))
+
+        if self.match_aggregation == "max":
+            scores = {candidate_id: max(sections.values()) for candidate_id, sections in best.items()}
+        else:
+            floor = min_score if min_score is not None else min((score for _, score in hits), default=0.0)
+            scores = {}
+            for candidate_id, sections in best.items():
+                names = {section_name(key) for key in self.candidate_vectors.get(candidate_id, [candidate_id])}
+                total = sum(self.section_weights.get(name, 1.0) for name in names)
+                weighted = sum(self.section_weights.get(name, 1.0) * sections.get(name, floor) for name in names)
+                score = weighted / total if total else max(sections.values())
+                if min_score is None or score >= min_score:
+                    scores[candidate_id] = score
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def _rank(
+        self,
+        hits: List[Tuple[str, float]],
+        int_ids: List[Optional[int]],
+        query: Dict,
+        k: int,
+        fusion: Optional[Dict[str, float]] = None,
+    ) -> List[Dict]:
+        """
+        Arama sonuçlarını puanla, tercih edilen becerilerle artır ve eksik becerileri ekle. Sonuçlar
+        match_percentage'a göre sıralanır; fusion verilirse (hibrit arama) füzyon skoru fusion_score
+        olarak eklenir ve sıralama ona göre yapılır.
+        """
+        required_skills = query.get("required_skills") or []
+        preferred_skills = query.get("preferred_skills") or []
+        job_skills = query.get("job_skills")
+        if job_skills is None:
+            job_skills = required_skills + preferred_skills
+
+        preferred_ids = self.skills.skill_ids(preferred_skills)
+        results = []
+        for (candidate_id, similarity), int_id in zip(hits, int_ids):
+            match_percentage = self.similarity_to_percentage(similarity)
+            if preferred_ids:
+                matched = self.skills.overlap(int_id, preferred_ids)
+                match_percentage = min(100.0, match_percentage + self.preferred_skill_boost * matched / len(preferred_skills))
+            match_percentage = round(match_percentage, 2)
+
+            # Eksik becerileri bul
+            missing_skills = self.skills.missing(int_id, job_skills)
+
+            result = {
+                "candidate_id": candidate_id,
+                "match_percentage": match_percentage,
+                "missing_skills": missing_skills,
+                "explanation": self._generate_explanation(
+                    match_percentage, missing_skills
+                )
+            }
+            if fusion is not None:
+                result["fusion_score"] = round(fusion[candidate_id], 6)
+            results.append(result)
+
+        key = "fusion_score" if fusion is not None else "match_percentage"
+        results.sort(key=lambda match: match[key], reverse=True)
+        return results[:k]
+
     def _generate_explanation(self, match_percentage: float, missing_skills: List[str]) -> str:
         """
         Eşleşme için açıklama oluştur
@@ -81,16 +1114,73 @@ class VectorMatcher:
         if missing_skills:
             explanation += f"\nEksik beceriler: {', '.join(missing_skills)}"
         return explanation
-    
+
     def save_index(self, path: str):
         """
-        FAISS indeksini diske kaydet
+        FAISS indeksini, aday kimlik eşlemesini ve BM25 indeksini diske kaydet
+        """
+        with self.index.lock:
+            self.index.save(path, {"model": self.model_name, "skills": self.skills.to_dict()})
+            self.lexical.save(_lexical_path(path))
+
+    def load_index(self, path: str) -> bool:
+        """
+        FAISS indeksini ve aday kimlik eşlemesini diskten yükle. BM25 indeksi yoksa ya da vektör
+        indeksiyle uyuşmuyorsa boş başlatılır; eksik adaylar index_lexical ile tamamlanabilir.
+        """
+        metadata = self.index.load(path)
+        if metadata is None or metadata.get("model") != self.model_name:
+            self.index.reset()
+            self.lexical = BM25Index()
+            return False
+        self.candidate_vectors = {}
+        for key in self.index.key_to_id:
+            self.candidate_vectors.setdefault(section_owner(key), []).append(key)
+        self.vector_counts = np.zeros(1024, dtype=np.uint16)
+        for candidate_id, keys in self.candidate_vectors.items():
+            int_ids = sorted(self.index.key_to_id[key] for key in keys)
+            doc_id = self.index.key_to_id.get(candidate_id)
+            if doc_id != int_ids[0] or int_ids[-1] - doc_id + 1 != len(int_ids):
+                # Beceri filtresi ardışık kimlik aralıklarına dayanır; uymayan anlık görüntü yeniden kurulur
+                self.index.reset()
+                self.candidate_vectors = {}
+                self.lexical = BM25Index()
+                return False
+            self._set_vector_count(doc_id, len(int_ids))
+        # Eski anlık görüntülerde beceriler bölüm vektörleri için de tutuluyordu; yalnızca belge kimlikleri kalır
+        skills = dict(metadata.get("skills", {}))
+        skills["rows"] = {
+            int_id: row for int_id, row in skills.get("rows", {}).items()
+            if int(int_id) < len(self.vector_counts) and self.vector_counts[int(int_id)]
+        }
+        self.skills = SkillIndex.from_dict(skills)
+        lexical = BM25Index.load(_lexical_path(path))
+        if lexical is None or any(int_id not in self.index.id_to_key for int_id in lexical.doc_terms):
+            lexical = BM25Index()
+        self.lexical = lexical
+        return True
+
+    def lexical_coverage(self) -> float:
         """
-        if self.index:
-            faiss.write_index(self.index, path)
-            
-    def load_index(self, path: str):
+        BM25 indeksinde bulunan adayların vektör indeksindeki adaylara oranı
+        """
+        return len(self.lexical) / len(self.candidate_vectors) if self.candidate_vectors else 1.0
+
+    def save_job_index(self, path: str):
+        """
+        İlan indeksini ve ilan eşleştirme bilgisini diske kaydet
+        """
+        with self.jobs.lock:
+            self.jobs.save(path, {"model": self.model_name, "jobs": self.job_info})
+
+    def load_job_index(self, path: str) -> bool:
         """
-        FAISS indeksini diskten yükle
+        İlan indeksini diskten yükle; model uyuşmuyorsa sıfırla
         """
-        self.index = faiss.read_index(path) 
\ No newline at end of file
+        metadata = self.jobs.load(path)
+        if metadata is None or metadata.get("model") != self.model_name:
+            self.jobs.reset()
+            self.job_info = {}
+            return False
+        self.job_info = metadata.get("jobs", {})
+        return True